@@ -0,0 +1,296 @@
+"""
+Optional ASGI entry point:  uvicorn asgi:app --workers 4
+
+The hot read endpoints (/get-board-lists, /get-boards, /get-projects) and the
+board event stream are served natively on asyncio with an async Postgres pool,
+so a slow query or an open stream does not hold a worker thread. Every other
+route is handed to the regular Flask app unchanged.
+
+Needs psycopg[binary], psycopg-pool, asgiref and uvicorn on top of
+requirements.txt. `python main.py` / gunicorn keep working without them.
+"""
+from asgiref.wsgi import WsgiToAsgi
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+import asyncio, json, os, re
+import psycopg
+
+from main import app as flask_app
+from database.aio import async_board_events, close_async_pool, run_plan_async
+from database.board_list import board_lists_plan
+from database.boards import board_in_project, boards_for_project_plan
+from database.events import SSE_HEARTBEAT_SECONDS
+from database.get_roles import get_role_id
+from database.get_user_role_name import get_user_role_name_db
+from database.projects import projects_for_user_plan
+from database.versions import (
+    board_version_plan,
+    project_boards_version_plan,
+    user_projects_version_plan,
+)
+from routes.board_events import _sse
+from utils.compression import cached_compressed, choose_encoding, compress_and_cache, compressible, weak_etag
+from utils.etag import if_none_match, make_etag
+from utils.jwt_helper import verify_jwt_token
+from utils.role_cache import cache_role, get_cached_role, role_generation
+
+wsgi_app = WsgiToAsgi(flask_app)
+allowed_origins = set(os.getenv("ALLOWED_ORIGINS", "").split(","))
+
+BOARD_EVENT_ROLES = ["project_owner", "project_admin", "project_member", "board_admin", "board_member"]
+BOARD_EVENTS_PATH = re.compile(r"^/boards/(\d+)/events$")
+
+
+class Request:
+    def __init__(self, scope, body: bytes = b""):
+        self.scope = scope
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self.args = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        self.body = body
+        cookie = SimpleCookie()
+        cookie.load(self.headers.get("cookie", ""))
+        self.cookies = {k: morsel.value for k, morsel in cookie.items()}
+        self.decoded_token = None
+
+    def get_json(self):
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+
+def _cors_headers(request: Request) -> list:
+    origin = request.headers.get("origin")
+    if not origin or origin not in allowed_origins:
+        return []
+    return [
+        (b"access-control-allow-origin", origin.encode()),
+        (b"access-control-allow-credentials", b"true"),
+        (b"access-control-expose-headers", b"ETag"),
+        (b"vary", b"Origin"),
+    ]
+
+
+async def _respond(send, request: Request, payload, status: int, etag: str = None, body: bytes = None,
+                   encoding: str = None):
+    """Send a JSON response, compressed like utils.compression does for Flask."""
+    headers = _cors_headers(request) + [(b"vary", b"Accept-Encoding")]
+    if status == 304:
+        body = b""
+    else:
+        if body is None:
+            # Same encoder as jsonify, so both modes return identical bytes.
+            body = flask_app.json.encode(payload)
+            encoding = choose_encoding(request.headers.get("accept-encoding"))
+            if encoding is not None and compressible("application/json", len(body)):
+                body = await asyncio.to_thread(compress_and_cache, body, encoding, etag if status == 200 else None)
+            else:
+                encoding = None
+        headers.append((b"content-type", b"application/json"))
+        if encoding is not None:
+            headers.append((b"content-encoding", encoding.encode()))
+            etag = weak_etag(etag) if etag is not None else None
+    if etag is not None and status in (200, 304):
+        headers.append((b"etag", etag.encode()))
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _authenticate(request: Request):
+    """Same checks as middleware.auth_middleware.token_required; returns an error pair or None."""
+    access_token = request.cookies.get("access_token")
+    refresh_token = request.cookies.get("refresh_token")
+
+    if not access_token and not refresh_token:
+        return {"error": "No tokens provided"}, 401
+
+    access_data = verify_jwt_token(access_token) if access_token else {"error": "No access token"}
+    if "error" in access_data:
+        refresh_data = verify_jwt_token(refresh_token, is_refresh=True) if refresh_token else {"error": "No refresh token"}
+        if "error" in refresh_data:
+            return {"error": "Invalid or expired token"}, 401
+        request.decoded_token = refresh_data
+    else:
+        request.decoded_token = access_data
+    return None
+
+
+async def _conditional(send, request: Request, etag: str, plan):
+    if if_none_match(request.headers.get("if-none-match"), etag):
+        return await _respond(send, request, None, 304, etag)
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    cached = cached_compressed(etag, encoding)
+    if cached is not None:
+        return await _respond(send, request, None, 200, etag, body=cached, encoding=encoding)
+    try:
+        result, status = await run_plan_async(plan)
+    except psycopg.Error as e:
+        result, status = {"error": f"Database error: {e}"}, 400
+    await _respond(send, request, result, status, etag if status == 200 else None)
+
+
+async def _version(plan):
+    """Async counterpart of database.versions._probe."""
+    try:
+        return await run_plan_async(plan)
+    except Exception as e:
+        print(f"❌ Version probe failed: {e}")
+        return None
+
+
+async def get_board_lists(send, request: Request):
+    data = request.get_json()
+    if not data or "board_id" not in data:
+        return await _respond(send, request, {"error": "board_id is required"}, 400)
+
+    board_id = data["board_id"]
+    since = data.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except (TypeError, ValueError):
+            return await _respond(send, request, {"error": "since must be an integer cursor"}, 400)
+
+    version = await _version(board_version_plan(board_id))
+    etag = make_etag("board", board_id, since, version) if version is not None else None
+    await _conditional(send, request, etag, board_lists_plan(board_id, since))
+
+
+async def get_boards(send, request: Request):
+    data = request.get_json()
+    if not data:
+        return await _respond(send, request, {"error": "JSON body required"}, 400)
+
+    project_id = data.get("project_id")
+    user_id = data.get("user_id")
+    if not project_id and not user_id:
+        return await _respond(send, request, {"error": "project_id is required"}, 400)
+
+    owner_role_id = await asyncio.to_thread(get_role_id, "project_owner")
+    if owner_role_id is None:
+        return await _respond(send, request, {"error": "project_owner role missing"}, 500)
+
+    version = await _version(project_boards_version_plan(project_id))
+    etag = make_etag("boards", project_id, user_id, version) if version is not None else None
+    await _conditional(send, request, etag, boards_for_project_plan(project_id, user_id, owner_role_id))
+
+
+async def get_projects(send, request: Request):
+    data = request.get_json() or {}
+    user_id = data.get("owner_id")
+    if not user_id:
+        return await _respond(send, request, {"error": "Missing owner_id"}, 400)
+
+    version = await _version(user_projects_version_plan(user_id))
+    etag = make_etag("projects", user_id, version) if version is not None else None
+    await _conditional(send, request, etag, projects_for_user_plan(user_id))
+
+
+async def _project_role(user_id: int, project_id: int) -> str:
+    role_name = get_cached_role(user_id, project_id)
+    if role_name is None:
+        generation = role_generation()
+        role_name = await asyncio.to_thread(get_user_role_name_db, user_id, project_id)
+        if role_name != "No Role":
+            cache_role(user_id, project_id, role_name, generation)
+    return role_name
+
+
+async def board_events_stream(send, receive, request: Request, board_id: int):
+    """Async version of routes.board_events.board_events_stream."""
+    try:
+        project_id = int(request.args.get("project_id", ""))
+    except ValueError:
+        return await _respond(send, request, {"error": "Missing project_id"}, 400)
+
+    role_name = await _project_role(request.decoded_token.get("id"), project_id)
+    if role_name not in BOARD_EVENT_ROLES:
+        return await _respond(send, request, {
+            "error": "Permission denied. You do not have permission to perform this action.",
+            "user_role": role_name
+        }, 403)
+
+    if not await asyncio.to_thread(board_in_project, board_id, project_id):
+        return await _respond(send, request, {"error": "Board not found"}, 404)
+
+    subscriber = async_board_events.subscribe(board_id)
+    disconnected = asyncio.get_running_loop().create_task(_wait_for_disconnect(receive))
+    try:
+        cursor = await _version(board_version_plan(board_id))
+        await send({"type": "http.response.start", "status": 200, "headers": _cors_headers(request) + [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+        ]})
+        await _send_chunk(send, _sse("ready", {"board_id": board_id, "cursor": cursor}, cursor))
+
+        while not disconnected.done():
+            try:
+                message = await asyncio.wait_for(subscriber.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                await _send_chunk(send, ": keepalive\n\n")
+                continue
+            await _send_chunk(send, _sse(message["event"], message, message.get("version")))
+    finally:
+        disconnected.cancel()
+        async_board_events.unsubscribe(board_id, subscriber)
+
+
+async def _send_chunk(send, text: str):
+    await send({"type": "http.response.body", "body": text.encode(), "more_body": True})
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+ASYNC_ROUTES = {
+    "/get-board-lists": get_board_lists,
+    "/get-boards": get_boards,
+    "/get-projects": get_projects,
+}
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await async_board_events.close()
+            await close_async_pool()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+
+    if scope["type"] == "http":
+        method, path = scope["method"], scope["path"]
+        handler = ASYNC_ROUTES.get(path) if method == "POST" else None
+        events = BOARD_EVENTS_PATH.match(path) if method == "GET" else None
+
+        if handler is not None or events is not None:
+            request = Request(scope, await _read_body(receive) if handler else b"")
+            error = _authenticate(request)
+            if error is not None:
+                return await _respond(send, request, *error)
+            if handler is not None:
+                return await handler(send, request)
+            return await board_events_stream(send, receive, request, int(events.group(1)))
+
+    # Everything else (including CORS preflights) is served by Flask.
+    await wsgi_app(scope, receive, send)
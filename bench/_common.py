@@ -0,0 +1,163 @@
+# Shared helpers for the scripts in bench/.
+#
+# Benchmarks use the database configured for the app (DB_* / .env, with
+# every migration applied). Data is seeded under a throwaway user and
+# project and removed again when the benchmark ends.
+import os, sys, statistics, subprocess, time, uuid
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import psycopg2.extras
+from database.config import db_transaction
+
+
+def timed(fn, repeat: int = 20, warmup: int = 2) -> dict:
+    """Run fn() repeatedly; returns median/min/p95 wall time in ms."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": samples[0],
+        "p95_ms": percentile(samples, 0.95),
+    }
+
+
+def percentile(sorted_samples: list, p: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * p))]
+
+
+@contextmanager
+def count_queries():
+    """Count statements sent through RealDictCursor (what db_transaction hands out)."""
+    counter = {"queries": 0}
+    original = psycopg2.extras.RealDictCursor.execute
+
+    def execute(self, query, vars=None):
+        counter["queries"] += 1
+        return original(self, query, vars)
+
+    psycopg2.extras.RealDictCursor.execute = execute
+    try:
+        yield counter
+    finally:
+        psycopg2.extras.RealDictCursor.execute = original
+
+
+@contextmanager
+def seeded_board(cards: int, lists: int = 10, members: int = 5):
+    """
+    A throwaway board with `lists` lists and `cards` cards spread over them.
+    Every other card has a due date/status and every third card two
+    assignees, so hydration has something to join. Yields the ids.
+    """
+    with db_transaction() as cur:
+        user_ids = []
+        for i in range(members):
+            cur.execute("""
+                INSERT INTO users (full_name, email, salt, verifier)
+                VALUES (%s, %s, '\\x00', '\\x00')
+                RETURNING id
+            """, (f"Bench User {i}", f"bench-{uuid.uuid4().hex}@example.com"))
+            user_ids.append(cur.fetchone()["id"])
+        owner = user_ids[0]
+
+        cur.execute("INSERT INTO projects (name, owner_id) VALUES ('Bench project', %s) RETURNING id", (owner,))
+        project_id = cur.fetchone()["id"]
+        cur.execute("INSERT INTO boards (project_id, name) VALUES (%s, 'Bench board') RETURNING id", (project_id,))
+        board_id = cur.fetchone()["id"]
+        cur.execute("""
+            INSERT INTO board_memberships (board_id, user_id, role_id)
+            SELECT %s, u, (SELECT id FROM roles WHERE name = 'board_member')
+            FROM unnest(%s::int[]) AS u
+        """, (board_id, user_ids[1:]))
+
+        cur.execute("""
+            INSERT INTO lists (board_id, name, rank)
+            SELECT %s, 'List ' || i, i * 1024.0
+            FROM generate_series(1, %s) AS i
+            RETURNING id
+        """, (board_id, lists))
+        list_ids = [row["id"] for row in cur.fetchall()]
+
+        cur.execute("""
+            INSERT INTO cards (list_id, title, rank, created_by, priority)
+            SELECT (%s::int[])[1 + i %% %s], 'Card ' || i, i * 1024.0, %s, 'low'
+            FROM generate_series(1, %s) AS i
+            RETURNING id
+        """, (list_ids, lists, owner, cards))
+        card_ids = [row["id"] for row in cur.fetchall()]
+
+        cur.execute("""
+            INSERT INTO card_contents (card_id, due_date, status, content_html)
+            SELECT c, now() + interval '7 days', 'open', '<p>bench</p>'
+            FROM unnest(%s::int[]) AS c
+        """, (card_ids[::2],))
+        cur.execute("""
+            INSERT INTO card_assignees (card_id, user_id)
+            SELECT c, u
+            FROM unnest(%s::int[]) AS c, unnest(%s::int[]) AS u
+        """, (card_ids[::3], user_ids[:2]))
+
+    try:
+        yield {
+            "user_id": owner,
+            "user_ids": user_ids,
+            "project_id": project_id,
+            "board_id": board_id,
+            "list_ids": list_ids,
+            "card_ids": card_ids,
+        }
+    finally:
+        with db_transaction() as cur:
+            cur.execute("DELETE FROM projects WHERE id = %s", (project_id,))
+            cur.execute("DELETE FROM users WHERE id = ANY(%s)", (user_ids,))
+
+
+def access_cookie(user_id: int, expires_in_seconds: int = 3600) -> str:
+    from utils.jwt_helper import create_jwt_token
+    token = create_jwt_token({"id": user_id, "email": "bench@example.com", "type": "access"}, expires_in_seconds)
+    return f"access_token={token}"
+
+
+@contextmanager
+def server(command: list, port: int, env: dict = None):
+    """Start a server subprocess from the repo root and wait until it accepts connections."""
+    import socket
+    process = subprocess.Popen(command, cwd=ROOT, env={**os.environ, **(env or {})},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"server did not start: {' '.join(command)}")
+                time.sleep(0.1)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def sync_server_command(port: int, threads: int = 8) -> list:
+    """gunicorn with one gthread worker when installed, else the werkzeug threaded server."""
+    try:
+        import gunicorn  # noqa: F401
+        return [sys.executable, "-m", "gunicorn", "main:app", "-k", "gthread", "-w", "1",
+                "--threads", str(threads), "-b", f"127.0.0.1:{port}"]
+    except ImportError:
+        return [sys.executable, "-c",
+                f"from main import app; app.run(host='127.0.0.1', port={port}, threaded=True, debug=False)"]
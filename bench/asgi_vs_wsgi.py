@@ -0,0 +1,103 @@
+"""
+Sync mode (gunicorn gthread, one worker) vs ASGI mode (uvicorn asgi:app, one worker).
+
+    python bench/asgi_vs_wsgi.py [--concurrency 32] [--duration 10] [--threads 8] [--streams 8]
+
+Each server is loaded with --concurrency clients posting /get-board-lists
+for a seeded board, first on its own and then while --streams clients hold
+/boards/<id>/events open. Prints throughput, latency and failed requests
+(5 s client timeout). The sync side falls back to the werkzeug threaded
+server when gunicorn is not installed, which has no thread cap.
+"""
+import argparse, http.client, json, socket, threading, time
+from _common import access_cookie, percentile, seeded_board, server, sync_server_command
+import sys
+
+SYNC_PORT, ASGI_PORT = 8711, 8712
+
+
+def load(port: int, body: bytes, cookie: str, concurrency: int, duration: float) -> dict:
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        mine, failed = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/get-board-lists", body, {"Content-Type": "application/json", "Cookie": cookie})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise http.client.HTTPException(response.status)
+                mine.append((time.perf_counter() - start) * 1000)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        with lock:
+            latencies.extend(mine)
+            failures[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return {
+        "rps": len(latencies) / duration,
+        "p50": percentile(latencies, 0.5) if latencies else float("nan"),
+        "p99": percentile(latencies, 0.99) if latencies else float("nan"),
+        "failed": failures[0],
+    }
+
+
+def open_streams(port: int, board_id: int, project_id: int, cookie: str, count: int) -> list:
+    streams = []
+    for _ in range(count):
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.sendall((f"GET /boards/{board_id}/events?project_id={project_id} HTTP/1.1\r\n"
+                      f"Host: 127.0.0.1\r\nCookie: {cookie}\r\n\r\n").encode())
+        streams.append(sock)
+    return streams
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--threads", type=int, default=8, help="gthread threads of the sync worker")
+    parser.add_argument("--streams", type=int, default=None, help="open event streams (default: --threads)")
+    parser.add_argument("--cards", type=int, default=500)
+    args = parser.parse_args()
+    streams = args.threads if args.streams is None else args.streams
+
+    modes = [
+        ("sync", SYNC_PORT, sync_server_command(SYNC_PORT, args.threads)),
+        ("asgi", ASGI_PORT, [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(ASGI_PORT),
+                             "--workers", "1", "--log-level", "warning"]),
+    ]
+
+    with seeded_board(cards=args.cards) as seed:
+        cookie = access_cookie(seed["user_id"])
+        body = json.dumps({"board_id": seed["board_id"], "project_id": seed["project_id"]}).encode()
+
+        print(f"{'mode':<5} {'open streams':>12} | {'req/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'failed':>7}")
+        for name, port, command in modes:
+            with server(command, port):
+                load(port, body, cookie, 4, 1)  # warm up pools and caches
+                for n in (0, streams):
+                    sockets = open_streams(port, seed["board_id"], seed["project_id"], cookie, n)
+                    time.sleep(0.5)
+                    result = load(port, body, cookie, args.concurrency, args.duration)
+                    for sock in sockets:
+                        sock.close()
+                    print(f"{name:<5} {n:>12} | {result['rps']:>7.0f} {result['p50']:>8.1f} "
+                          f"{result['p99']:>8.1f} {result['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
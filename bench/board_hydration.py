@@ -0,0 +1,79 @@
+"""
+/get-board-lists hydration: per-card queries (before) vs the fixed-query plan (after).
+
+    python bench/board_hydration.py [--cards 50,200,500,1000,2000] [--repeat 10]
+
+Prints queries and median latency per board size. The snapshot cache is
+cleared before every call, so "after" is always a cold build.
+"""
+import argparse
+from _common import count_queries, seeded_board, timed
+
+from database.board_list import get_lists_by_board_id
+from database.config import db_transaction
+from utils.board_cache import board_cache
+
+
+def get_lists_before(board_id: int):
+    """The loader this replaced: two queries per card (ordered by rank now that positions are gone)."""
+    with db_transaction(readonly=True) as cur:
+        cur.execute("SELECT id, name FROM lists WHERE board_id = %s ORDER BY rank ASC", (board_id,))
+        lists = cur.fetchall()
+        cur.execute("""
+            SELECT id, list_id, title, created_by, created_at, priority
+            FROM cards
+            WHERE list_id IN (SELECT id FROM lists WHERE board_id = %s)
+            ORDER BY rank ASC, created_at ASC
+        """, (board_id,))
+        cards_by_list = {}
+        for card in cur.fetchall():
+            cur.execute("""
+                SELECT u.id AS user_id, u.full_name, u.email
+                FROM card_assignees ca
+                JOIN users u ON u.id = ca.user_id
+                WHERE ca.card_id = %s
+            """, (card["id"],))
+            card["members"] = cur.fetchall()
+            cur.execute("SELECT due_date, status FROM card_contents WHERE card_id = %s LIMIT 1", (card["id"],))
+            content = cur.fetchone()
+            card["due_date"] = content["due_date"] if content else None
+            card["status"] = content["status"] if content else None
+            cards_by_list.setdefault(card["list_id"], []).append(card)
+        for list_obj in lists:
+            list_obj["cards"] = cards_by_list.get(list_obj["id"], [])
+        cur.execute("""
+            SELECT u.id AS user_id, u.full_name, u.email, r.id AS role_id, r.name AS role_name
+            FROM board_memberships bm
+            JOIN users u ON u.id = bm.user_id
+            JOIN roles r ON r.id = bm.role_id
+            WHERE bm.board_id = %s
+        """, (board_id,))
+        return {"lists": lists, "members": cur.fetchall()}
+
+
+def get_lists_after(board_id: int):
+    board_cache.clear()
+    return get_lists_by_board_id(board_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", default="50,200,500,1000,2000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'cards':>6} | {'before q':>8} {'before ms':>10} | {'after q':>7} {'after ms':>9} | speedup")
+    for n in [int(c) for c in args.cards.split(",")]:
+        with seeded_board(cards=n) as seed:
+            board_id = seed["board_id"]
+            row = []
+            for fn in (get_lists_before, get_lists_after):
+                with count_queries() as counter:
+                    fn(board_id)
+                row.append((counter["queries"], timed(lambda: fn(board_id), repeat=args.repeat)["median_ms"]))
+            (q_before, ms_before), (q_after, ms_after) = row
+            print(f"{n:>6} | {q_before:>8} {ms_before:>10.1f} | {q_after:>7} {ms_after:>9.1f} | {ms_before / ms_after:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+/update-cards-list reorder: one UPDATE per card (before) vs one set-based UPDATE (after).
+
+    python bench/card_reorder.py [--cards 1000] [--repeat 10]
+
+Reverses a list of --cards cards, and for the cross-list case moves half of
+them into a second list, printing statements sent and median wall time.
+"""
+import argparse
+from _common import count_queries, seeded_board, timed
+
+from database.cards import update_card_positions
+from database.config import db_transaction
+from database.ranking import RANK_STEP
+
+
+def reorder_before(lists: list):
+    """The loop this replaced, writing ranks instead of the old positions."""
+    with db_transaction() as cur:
+        for entry in lists:
+            for index, card in enumerate(entry["cards"]):
+                cur.execute("""
+                    UPDATE cards
+                    SET list_id = %s, rank = %s
+                    WHERE id = %s
+                """, (entry["list_id"], (index + 1) * RANK_STEP, card["id"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with seeded_board(cards=args.cards, lists=1) as seed:
+        (list_id,) = seed["list_ids"]
+        with db_transaction() as cur:
+            cur.execute("INSERT INTO lists (board_id, name, rank) VALUES (%s, 'Other', 0) RETURNING id", (seed["board_id"],))
+            other_list_id = cur.fetchone()["id"]
+
+        card_ids = seed["card_ids"]
+        same_list = [{"list_id": list_id, "cards": [{"id": c} for c in reversed(card_ids)]}]
+        half = len(card_ids) // 2
+        cross_list = [
+            {"list_id": list_id, "cards": [{"id": c} for c in card_ids[:half]]},
+            {"list_id": other_list_id, "cards": [{"id": c} for c in card_ids[half:]]},
+        ]
+        print(f"{'case':<22} | {'before q':>8} {'before ms':>10} | {'after q':>7} {'after ms':>9} | speedup")
+        for name, payload in ((f"{args.cards} cards, one list", same_list), (f"{args.cards} cards, two lists", cross_list)):
+            row = []
+            for fn in (reorder_before, update_card_positions):
+                with count_queries() as counter:
+                    fn(payload)
+                # Re-applying the same order still rewrites every row.
+                row.append((counter["queries"], timed(lambda: fn(payload), repeat=args.repeat)["median_ms"]))
+            (q_before, ms_before), (q_after, ms_after) = row
+            print(f"{name:<22} | {q_before:>8} {ms_before:>10.1f} | {q_after:>7} {ms_after:>9.1f} | {ms_before / ms_after:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Board response serialization on a 5k-card board: Flask's stdlib jsonify (before)
+vs the JSON providers (after).
+
+    python bench/json_encoding.py [--cards 5000] [--repeat 10]
+
+"encode" rows time serialization of an already built payload. "build +
+encode" rows time the whole cold read: queries, assembly and encoding.
+(A json_agg snapshot built by Postgres was tried and dropped: 253 ms vs
+203 ms for python + orjson at 5k cards.)
+"""
+import argparse
+from _common import seeded_board, timed
+
+from flask.json.provider import DefaultJSONProvider
+from main import app
+import database.board_list as board_list
+import utils.json_provider as json_provider
+from utils.board_cache import board_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    flask_default = DefaultJSONProvider(app)
+    std = json_provider.JSONProvider(app)
+    orjson = json_provider.OrjsonProvider(app) if json_provider.orjson is not None else None
+
+    with seeded_board(cards=args.cards) as seed:
+        board_id = seed["board_id"]
+        board_cache.clear()
+        payload, _ = board_list.get_lists_by_board_id(board_id)
+
+        rows = [("encode: flask jsonify (before)", lambda: flask_default.response(payload).get_data())]
+        rows.append(("encode: std provider", lambda: std.encode(payload)))
+        if orjson is not None:
+            rows.append(("encode: orjson provider", lambda: orjson.encode(payload)))
+
+            def orjson_iso():
+                json_provider.JSON_DATETIME_FORMAT = "iso"
+                try:
+                    return orjson.encode(payload)
+                finally:
+                    json_provider.JSON_DATETIME_FORMAT = "http"
+            rows.append(("encode: orjson provider, iso dates", orjson_iso))
+
+        def cold_read(encode):
+            def read():
+                board_cache.clear()
+                return encode(board_list.get_lists_by_board_id(board_id)[0])
+            return read
+
+        fast = orjson or std
+        rows.append(("build + encode: flask jsonify (before)",
+                     cold_read(lambda result: flask_default.response(result).get_data())))
+        rows.append((f"build + encode: {type(fast).__name__}", cold_read(fast.encode)))
+
+        print(f"{len(seed['card_ids'])} cards, {len(std.encode(payload)) / 1024:.0f} KiB of JSON")
+        baseline = None
+        for name, fn in rows:
+            ms = timed(fn, repeat=args.repeat)["median_ms"]
+            if name.endswith("(before)"):
+                baseline = ms
+            print(f"{name:<48} {ms:8.1f} ms  {baseline / ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
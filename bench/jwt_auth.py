@@ -0,0 +1,74 @@
+"""
+Per-request auth overhead of token_required / require_roles: every token
+decoded and HMAC-checked (before) vs the verified-token cache (after).
+
+    python bench/jwt_auth.py [--calls 20000]
+
+"before" runs the same code with the cache sized to zero, so each call
+pays jwt.decode() exactly as the uncached decorators did. No database is
+needed: the project role comes from the role cache.
+"""
+import argparse, time
+from _common import ROOT  # noqa: F401  (puts the repo on sys.path)
+
+from main import app
+from middleware.auth_middleware import token_required
+from middleware.role_middleware import require_roles
+from utils import jwt_helper, role_cache
+from utils.jwt_helper import create_jwt_token
+
+
+@token_required
+def protected_view():
+    return "ok"
+
+
+@token_required
+@require_roles(["project_owner"])
+def role_view():
+    return "ok"
+
+
+def per_call_us(view, cookies: dict, calls: int) -> float:
+    header = "; ".join(f"{name}={value}" for name, value in cookies.items())
+    with app.test_request_context("/bench", method="POST", json={"project_id": 2}, headers={"Cookie": header}):
+        view()
+        start = time.perf_counter()
+        for _ in range(calls):
+            view()
+        return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Serve the role from the cache without a database or listener.
+    role_cache.role_invalidations.ensure_started = lambda: None
+    role_cache.role_invalidations.connected = True
+    role_cache.cache_role(3, 2, "project_owner", role_cache.role_generation())
+
+    fresh = create_jwt_token({"id": 3, "email": "bench@example.com", "type": "access"}, 20)
+    stale = create_jwt_token({"id": 3, "email": "bench@example.com", "type": "access"}, -5)
+    refresh = create_jwt_token({"id": 3, "email": "bench@example.com", "type": "refresh"}, 3 * 60 * 60)
+    cases = [
+        ("token_required, access", protected_view, {"access_token": fresh}),
+        ("token_required, expired + refresh", protected_view, {"access_token": stale, "refresh_token": refresh}),
+        ("+ require_roles, access", role_view, {"access_token": fresh}),
+        ("+ require_roles, expired + refresh", role_view, {"access_token": stale, "refresh_token": refresh}),
+    ]
+
+    cache_size = jwt_helper.verified_tokens.maxsize
+    print(f"{'case':<36} {'before us':>10} {'after us':>9}")
+    for name, view, cookies in cases:
+        jwt_helper.verified_tokens.maxsize = 0
+        jwt_helper.verified_tokens.clear()
+        before = per_call_us(view, cookies, args.calls)
+        jwt_helper.verified_tokens.maxsize = cache_size
+        after = per_call_us(view, cookies, args.calls)
+        print(f"{name:<36} {before:>10.1f} {after:>9.1f}   {before / after:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
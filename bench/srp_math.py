@@ -0,0 +1,85 @@
+"""
+Server-side SRP cost per login: the original inline math (before) vs
+utils.srpUtils' precomputed k, fixed-base g^b table and optional gmpy2 (after).
+
+    python bench/srp_math.py [--seconds 3]
+
+Runs each variant in a fresh process, with and without gmpy2, and prints
+milliseconds per login and logins/sec on one core. Only the server's math is
+timed (B, u, S, K, M1, M2); the client side is computed once up front.
+"""
+import argparse, os, secrets, subprocess, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(variant: str, seconds: float):
+    sys.path.insert(0, ROOT)
+    from utils import srpUtils
+    from utils.srpUtils import N, g, H
+
+    email, salt = "bench@example.com", secrets.token_bytes(16)
+    x = H(salt, H(f"{email}:pw"))
+    v = pow(g, x, N)
+    A = pow(g, secrets.randbits(256), N)
+
+    def before():
+        b = secrets.randbits(256)
+        k = H(N, g)
+        B = (k * v + pow(g, b, N)) % N
+        u = H(A, B)
+        Avu = (A * pow(v, u, N)) % N
+        K = H(pow(Avu, b, N))
+        M1 = H(email, salt, A, B, K)
+        return H(A, M1, K)
+
+    def after():
+        b = srpUtils.randbits_256()
+        B = srpUtils.server_public_B(v, b)
+        u = H(A, B)
+        K = srpUtils.server_session_key(A, v, u, b)
+        M1 = H(email, salt, A, B, K)
+        return H(A, M1, K)
+
+    fn = before if variant == "before" else after
+    fn()  # builds the g table on first use
+    logins, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        logins += 1
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed / logins * 1000:.2f} {logins / elapsed:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--no-gmpy2", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        if args.no_gmpy2:
+            sys.modules["gmpy2"] = None
+        return run(args.variant, args.seconds)
+
+    variants = [("before", True, "before"), ("after", True, "after, pure Python")]
+    try:
+        import gmpy2  # noqa: F401
+        variants.append(("after", False, "after, gmpy2"))
+    except ImportError:
+        print("gmpy2 is not installed; skipping that variant")
+
+    print(f"{'variant':<26} {'ms/login':>9} {'logins/s/core':>14}")
+    baseline = None
+    for variant, no_gmpy2, label in variants:
+        command = [sys.executable, __file__, "--variant", variant, "--seconds", str(args.seconds)]
+        if no_gmpy2:
+            command.append("--no-gmpy2")
+        ms, rate = map(float, subprocess.run(command, capture_output=True, text=True, check=True).stdout.split())
+        baseline = baseline or ms
+        print(f"{label:<26} {ms:>9.2f} {rate:>14.0f}   {baseline / ms:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
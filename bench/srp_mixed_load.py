@@ -0,0 +1,104 @@
+"""
+Board read latency during a login burst, SRP math inline (before) vs in a
+process pool (after).
+
+    python bench/srp_mixed_load.py [--workers 2] [--logins 6] [--duration 8] [--no-gmpy2]
+
+Starts one sync worker per mode (gunicorn gthread when installed) with
+SRP_PROCESS_WORKERS=0 and then --workers. A reader polls /get-board-lists
+every 10 ms, first alone and then while --logins clients loop
+/srp-login/start + /srp-login/verify, and the read latencies are compared.
+--no-gmpy2 hides gmpy2 from the servers so the SRP math runs in pure Python,
+the only case where the pool helps (SRP_PROCESS_WORKERS=auto enables it
+only then).
+"""
+import argparse, json, os, secrets, tempfile, threading, time, urllib.error, urllib.request
+from _common import access_cookie, percentile, seeded_board, server, sync_server_command
+
+from database.config import db_transaction
+from utils.srpUtils import N, g, H
+
+PORT = 8713
+
+
+def post(path: str, body: dict, cookie: str = None):
+    request = urllib.request.Request(f"http://127.0.0.1:{PORT}{path}", data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"})
+    if cookie:
+        request.add_header("Cookie", cookie)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def read_latencies(body: dict, cookie: str, duration: float) -> list:
+    latencies, stop_at = [], time.monotonic() + duration
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        post("/get-board-lists", body, cookie)
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.01)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="SRP_PROCESS_WORKERS for the pooled run")
+    parser.add_argument("--logins", type=int, default=6, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=8)
+    parser.add_argument("--no-gmpy2", action="store_true", help="run the servers without gmpy2")
+    args = parser.parse_args()
+
+    env = {}
+    if args.no_gmpy2:
+        shadow = tempfile.mkdtemp()
+        with open(os.path.join(shadow, "gmpy2.py"), "w") as f:
+            f.write("raise ImportError('hidden by bench/srp_mixed_load.py')\n")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [shadow, os.environ.get("PYTHONPATH")]))
+
+    email = f"bench-{secrets.token_hex(8)}@example.com"
+    salt = secrets.token_bytes(16)
+    verifier = pow(g, H(salt, H(f"{email}:pw")), N)
+    A = format(pow(g, secrets.randbits(256), N), "x")
+
+    with seeded_board(cards=200) as seed:
+        cookie = access_cookie(seed["user_id"])
+        body = {"board_id": seed["board_id"], "project_id": seed["project_id"]}
+        print(f"{'SRP_PROCESS_WORKERS':<20} {'phase':<6} | {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'max ms':>7} | logins")
+        try:
+            for workers in (0, args.workers):
+                with server(sync_server_command(PORT), PORT, {**env, "SRP_PROCESS_WORKERS": str(workers)}):
+                    post("/srp-register", {"full_name": "Bench", "email": email,
+                                           "salt": salt.hex(), "verifier": format(verifier, "x")})
+                    idle = read_latencies(body, cookie, args.duration / 2)
+
+                    stop, logins = threading.Event(), [0]
+
+                    def burst():
+                        while not stop.is_set():
+                            _, started = post("/srp-login/start", {"email": email, "A": A})
+                            session_id = json.loads(started)["session_id"]
+                            post("/srp-login/verify", {"session_id": session_id, "email": email, "M1": "ab"})
+                            logins[0] += 1
+
+                    clients = [threading.Thread(target=burst) for _ in range(args.logins)]
+                    for client in clients:
+                        client.start()
+                    time.sleep(0.5)
+                    busy = read_latencies(body, cookie, args.duration)
+                    stop.set()
+                    for client in clients:
+                        client.join()
+
+                    for phase, lat in (("idle", idle), ("burst", busy)):
+                        print(f"{workers:<20} {phase:<6} | {percentile(lat, .5):>7.1f} {percentile(lat, .95):>7.1f} "
+                              f"{percentile(lat, .99):>7.1f} {lat[-1]:>7.1f} | {logins[0] if phase == 'burst' else ''}")
+        finally:
+            with db_transaction() as cur:
+                cur.execute("DELETE FROM users WHERE email = %s", (email,))
+
+
+if __name__ == "__main__":
+    main()
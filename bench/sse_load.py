@@ -0,0 +1,143 @@
+"""
+Board event fan-out under load: N subscribers on /boards/<id>/events while
+list renames are committed, per server mode.
+
+    python bench/sse_load.py [--subscribers 1000] [--events 20] [--threads 32]
+
+Modes: gunicorn gthread (one worker, --threads), gunicorn gevent when
+installed, and uvicorn asgi:app when installed. Every subscriber opens its
+stream and waits for "ready"; then each rename is committed from this
+process (pg_notify -> the worker's LISTEN connection -> every subscriber
+queue) and the time until each subscriber has read the event is recorded.
+Each worker caps its open streams (SSE_MAX_STREAMS, set by gunicorn.conf.py:
+half the threads under gthread, worker connections under gevent); the
+subscribers past the cap are answered 503 and counted as rejected.
+"""
+import argparse, resource, selectors, socket, sys, time
+from _common import access_cookie, percentile, seeded_board, server
+
+import database.board_list as board_list
+
+GTHREAD_PORT, GEVENT_PORT, ASGI_PORT = 8714, 8715, 8716
+
+
+def raise_fd_limit(needed: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+class Subscribers:
+    """Raw-socket SSE clients multiplexed on one selector."""
+
+    def __init__(self, port: int, path: str, cookie: str, count: int):
+        self.selector = selectors.DefaultSelector()
+        self.buffers, self.ready, self.rejected, self.received = {}, set(), set(), {}
+        request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n\r\n".encode()
+        for _ in range(count):
+            sock = socket.create_connection(("127.0.0.1", port))
+            sock.sendall(request)
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ)
+            self.buffers[sock] = b""
+
+    def pump(self, until, timeout: float):
+        """Read whatever arrives until until() is true or timeout seconds pass."""
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline:
+            for key, _ in self.selector.select(min(0.1, max(0, deadline - time.monotonic()))):
+                sock = key.fileobj
+                try:
+                    chunk = sock.recv(65536)
+                except OSError:
+                    chunk = b""
+                if not chunk:
+                    self.selector.unregister(sock)
+                    continue
+                now = time.perf_counter()
+                data = self.buffers[sock] + chunk
+                if data.startswith(b"HTTP/1.1 503"):
+                    self.rejected.add(sock)
+                    self.selector.unregister(sock)
+                    continue
+                *events, self.buffers[sock] = data.split(b"\n\n")
+                for event in events:
+                    if b"event: ready" in event:
+                        self.ready.add(sock)
+                    elif b"event: " in event:
+                        self.received.setdefault(sock, []).append(now)
+
+    def close(self):
+        for sock in self.buffers:
+            sock.close()
+        self.selector.close()
+
+
+def run_mode(command: list, port: int, seed: dict, cookie: str, count: int, events: int) -> dict:
+    path = f"/boards/{seed['board_id']}/events?project_id={seed['project_id']}"
+    list_id = seed["list_ids"][0]
+    with server(command, port):
+        subscribers = Subscribers(port, path, cookie, count)
+        try:
+            subscribers.pump(lambda: len(subscribers.ready) + len(subscribers.rejected) == count,
+                             timeout=max(10, count / 100))
+            listening, rejected = len(subscribers.ready), len(subscribers.rejected)
+            latencies, delivered = [], 0
+            for i in range(events):
+                subscribers.received.clear()
+                start = time.perf_counter()
+                board_list.update_list_name(list_id, f"Renamed {i}")
+                subscribers.pump(lambda: len(subscribers.received) >= listening, timeout=5)
+                delivered += len(subscribers.received)
+                latencies.extend((times[0] - start) * 1000 for times in subscribers.received.values())
+        finally:
+            subscribers.close()
+    latencies.sort()
+    nan = float("nan")
+    return {
+        "ready": listening,
+        "rejected": rejected,
+        "delivered": delivered,
+        "expected": listening * events,
+        "p50": percentile(latencies, 0.5) if latencies else nan,
+        "p99": percentile(latencies, 0.99) if latencies else nan,
+        "max": latencies[-1] if latencies else nan,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=20, help="list renames to commit")
+    parser.add_argument("--threads", type=int, default=32, help="gthread threads of the sync worker")
+    args = parser.parse_args()
+    raise_fd_limit(args.subscribers * 2 + 256)
+
+    gunicorn = [sys.executable, "-m", "gunicorn", "main:app", "-w", "1", "--log-level", "warning"]
+    modes = [("gthread", GTHREAD_PORT, gunicorn + ["-k", "gthread", "--threads", str(args.threads),
+                                                   "-b", f"127.0.0.1:{GTHREAD_PORT}"])]
+    try:
+        import gevent  # noqa: F401
+        modes.append(("gevent", GEVENT_PORT, gunicorn + ["-k", "gevent", "--worker-connections",
+                                                         str(args.subscribers + 100), "-b", f"127.0.0.1:{GEVENT_PORT}"]))
+    except ImportError:
+        print("gevent is not installed; skipping the gevent worker")
+    try:
+        import uvicorn  # noqa: F401
+        modes.append(("asgi", ASGI_PORT, [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(ASGI_PORT),
+                                          "--workers", "1", "--log-level", "warning"]))
+    except ImportError:
+        print("uvicorn is not installed; skipping ASGI mode")
+
+    with seeded_board(cards=10) as seed:
+        cookie = access_cookie(seed["user_id"])
+        print(f"{args.subscribers} subscribers, {args.events} events")
+        print(f"{'mode':<8} {'streaming':>9} {'rejected':>8} | {'delivered':>17} | {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+        for name, port, command in modes:
+            result = run_mode(command, port, seed, cookie, args.subscribers, args.events)
+            print(f"{name:<8} {result['ready']:>9} {result['rejected']:>8} | {result['delivered']:>8}/{result['expected']:<8} | "
+                  f"{result['p50']:>7.1f} {result['p99']:>7.1f} {result['max']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Async (psycopg 3) database access for the optional ASGI mode, see asgi.py.
+#
+# Only read paths run here. They are the same plans the Flask routes run
+# (database.plan), executed on an AsyncClientCursor so the psycopg2-style SQL
+# (client-side %s binding, dict rows) works unchanged.
+from database.config import db_connect_kwargs
+from database.events import BOARD_EVENTS_CHANNEL, RESYNC, SUBSCRIBER_QUEUE_SIZE
+import asyncio, json, os
+
+try:
+    import psycopg
+    from psycopg import AsyncClientCursor
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:  # only needed when serving through asgi.py
+    psycopg = None
+
+_async_pool = None
+
+
+async def _configure(conn):
+    # Every async query is a read; the flag is sent with BEGIN, no extra round trip.
+    await conn.set_read_only(True)
+
+
+async def get_async_pool():
+    global _async_pool
+    if psycopg is None:
+        raise RuntimeError("ASGI mode needs psycopg[binary] and psycopg-pool installed")
+    if _async_pool is None:
+        _async_pool = AsyncConnectionPool(
+            kwargs={**db_connect_kwargs(), "row_factory": dict_row, "cursor_factory": AsyncClientCursor},
+            min_size=int(os.getenv("DB_POOL_MINCONN", "1")),
+            max_size=int(os.getenv("DB_ASYNC_POOL_MAXCONN", "20")),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+            max_lifetime=float(os.getenv("DB_POOL_MAX_AGE", "1800")),
+            configure=_configure,
+            open=False,
+        )
+        await _async_pool.open()
+        print("✅ Async database connection pool initialized!")
+    return _async_pool
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+        print("✅ Async database connection pool closed.")
+
+
+async def run_plan_async(plan):
+    """Run a plan in its own read-only transaction and return its result."""
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                try:
+                    step = next(plan)
+                    while True:
+                        await cur.execute(step.sql, step.params)
+                        step = plan.send(await cur.fetchone() if step.one else await cur.fetchall())
+                except StopIteration as done:
+                    return done.value
+
+
+class AsyncBoardEventHub:
+    """
+    asyncio counterpart of database.events.BoardEventHub.
+
+    One LISTEN connection per process feeds asyncio queues, so an open event
+    stream costs a queue and a coroutine instead of a worker thread.
+    """
+
+    def __init__(self, channel: str = BOARD_EVENTS_CHANNEL):
+        self.channel = channel
+        self._subscribers = {}
+        self._task = None
+
+    def subscribe(self, board_id: int) -> asyncio.Queue:
+        subscriber = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(int(board_id), set()).add(subscriber)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+        return subscriber
+
+    def unsubscribe(self, board_id: int, subscriber: asyncio.Queue):
+        subscribers = self._subscribers.get(int(board_id))
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[int(board_id)]
+
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, board_id: int, message: dict):
+        for subscriber in list(self._subscribers.get(int(board_id), ())):
+            self._offer(subscriber, message)
+
+    def _broadcast(self, message: dict):
+        for subscriber in [s for group in self._subscribers.values() for s in group]:
+            self._offer(subscriber, message)
+
+    @staticmethod
+    def _offer(subscriber: asyncio.Queue, message: dict):
+        try:
+            subscriber.put_nowait(message)
+        except asyncio.QueueFull:
+            # Drop the backlog of a slow client and tell it to resync instead.
+            while not subscriber.empty():
+                subscriber.get_nowait()
+            subscriber.put_nowait(RESYNC)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        backoff = 1
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(**db_connect_kwargs(), autocommit=True)
+                async with conn:
+                    await conn.execute(f"LISTEN {self.channel}")
+                    print(f"✅ Listening for board events on '{self.channel}' (async)")
+                    backoff = 1
+                    async for notify in conn.notifies():
+                        try:
+                            message = json.loads(notify.payload)
+                        except ValueError:
+                            continue
+                        if message.get("board_id") is not None:
+                            self.publish(message["board_id"], message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Board event listener failed, reconnecting in {backoff}s: {e}")
+                # Anything published while we were down is lost.
+                self._broadcast(RESYNC)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+
+async_board_events = AsyncBoardEventHub()
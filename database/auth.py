@@ -1,26 +1,25 @@
-from database.config import get_db_connection, release_db_connection
+from database.config import db_transaction
 from psycopg2 import Binary
-from psycopg2.extras import RealDictCursor
 from typing import Optional, Dict, Any
 import psycopg2
 
 
 def register_srp_user(full_name: str, email: str, salt_bytes: bytes, verifier_bytes: bytes):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("SELECT id FROM roles WHERE name = 'app_user'")
-        app_role = cur.fetchone()
-        app_role_id = app_role["id"] if app_role else None
+        # One statement: the role is looked up inline and a taken email
+        # inserts nothing instead of needing a check beforehand.
+        with db_transaction() as cur:
+            cur.execute("""
+                INSERT INTO users (full_name, email, salt, verifier, app_role_id)
+                VALUES (%s, %s, %s, %s, (SELECT id FROM roles WHERE name = 'app_user'))
+                ON CONFLICT (email) DO NOTHING
+                RETURNING id, full_name, email, app_role_id, created_at
+            """, (full_name, email, Binary(salt_bytes), Binary(verifier_bytes)))
 
-        cur.execute("""
-            INSERT INTO users (full_name, email, salt, verifier, app_role_id)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING id, full_name, email, app_role_id, created_at
-        """, (full_name, email, Binary(salt_bytes), Binary(verifier_bytes), app_role_id))
+            new_user = cur.fetchone()
 
-        new_user = cur.fetchone()
-        conn.commit()
+        if new_user is None:
+            return {"error": "That email is already in use. Try logging in instead."}, 400
 
         return {
             "message": "🎉 Registration successful! Welcome aboard!",
@@ -28,49 +27,14 @@ def register_srp_user(full_name: str, email: str, salt_bytes: bytes, verifier_by
         }, 201
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
-
-def get_user_salt_verifier(email: str) -> Optional[Dict[str, Any]]:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)  
-    try:
-        cur.execute("SELECT salt, verifier FROM users WHERE email=%s", (email,))
-        row = cur.fetchone()  
-        return row
-    finally:
-        cur.close()
-        release_db_connection(conn)
-
-def get_user_email(email: str):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    try:
+def get_user_auth_record(email: str) -> Optional[Dict[str, Any]]:
+    """Everything the SRP login needs about a user: salt/verifier for step 1, token claims for step 2."""
+    with db_transaction(readonly=True) as cur:
         cur.execute("""
-            SELECT id, email, app_role_id, full_name FROM users WHERE email = %s
+            SELECT id, email, full_name, app_role_id, salt, verifier
+            FROM users
+            WHERE email = %s
         """, (email,))
-        user = cur.fetchone()
-
-        if user:
-            return {
-                "email": user["email"],
-                "id": user["id"],
-                "full_name": user["full_name"],
-                "app_role_id": user["app_role_id"]
-
-            }
-        else:
-            return None
-    except psycopg2.Error as e:
-        conn.rollback()
-        return {"error": str(e)}, 400
-    finally:
-        cur.close()
-        release_db_connection(conn)
-
-
-
+        return cur.fetchone()
@@ -1,28 +1,45 @@
-from database.config import get_db_connection, release_db_connection
-from psycopg2.extras import RealDictCursor
+from database.config import db_transaction
+from database.plan import query, query_one, run_plan
+from database.ranking import RANK_STEP, find_rank_at, lock_siblings, lock_siblings_sql, schedule_rebalance
 import psycopg2
+from database.versions import lock_boards, record_board_change
+from utils.board_cache import cache_board_snapshot, get_board_snapshot
 
 def add_board_list(board_id: int, name: str, position: int = None):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        if position is None:
-            cur.execute("""
-                SELECT COALESCE(MAX(position), -1) + 1 AS next_position
-                FROM lists
-                WHERE board_id = %s
-            """, (board_id,))
-            result = cur.fetchone()
-            position = result["next_position"]
-
-        cur.execute("""
-            INSERT INTO lists (board_id, name, position)
-            VALUES (%s, %s, %s)
-            RETURNING id, name, position
-        """, (board_id, name, position))
-
-        new_list = cur.fetchone()
-        conn.commit()
+        with db_transaction() as cur:
+            lock_boards(cur, board_id=board_id)
+            if position is None:
+                # Lock the board and append in one round trip, as add_card_to_list does.
+                cur.execute(lock_siblings_sql("lists") + """
+                    INSERT INTO lists (board_id, name, rank)
+                    SELECT %s, %s, COALESCE(MAX(rank), 0) + %s
+                    FROM lists
+                    WHERE board_id = %s
+                    RETURNING
+                        id, name,
+                        (SELECT COUNT(*) FROM lists WHERE board_id = %s) AS position
+                """, (board_id, board_id, name, RANK_STEP, board_id, board_id))
+            else:
+                lock_siblings(cur, "lists", board_id)
+                rank, crowded = find_rank_at(cur, "lists", "board_id", board_id, position)
+                cur.execute("""
+                    INSERT INTO lists (board_id, name, rank)
+                    VALUES (%s, %s, %s)
+                    RETURNING
+                        id, name,
+                        (
+                            SELECT COUNT(*) FROM lists AS l2
+                            WHERE l2.board_id = %s
+                              AND l2.rank <= %s
+                        ) AS position
+                """, (board_id, name, rank, board_id, rank))
+
+            new_list = cur.fetchone()
+            record_board_change(cur, "list", [new_list["id"]], board_id=board_id, event="list.created")
+
+        if position is not None and crowded:
+            schedule_rebalance("lists", board_id)
 
         return {
             "message": "New list added successfully",
@@ -30,216 +47,352 @@ def add_board_list(board_id: int, name: str, position: int = None):
         }, 201
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
-def get_lists_by_board_id(board_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        cur.execute("""
-            SELECT id, name, position
-            FROM lists
-            WHERE board_id = %s
-            ORDER BY position ASC
-        """, (board_id,))
-        lists = cur.fetchall()
-        cur.execute("""
+def _fetch_lists(board_id: int):
+    return (yield query("""
+        SELECT 
+            id, 
+            name, 
+            ROW_NUMBER() OVER (ORDER BY rank ASC, id ASC) - 1 AS position
+        FROM lists
+        WHERE board_id = %s
+        ORDER BY rank ASC, id ASC
+    """, (board_id,)))
+
+
+def _fetch_cards(board_id: int, touching_card_ids: list = None):
+    """
+    Cards on the board with their due date/status joined in, in list order.
+
+    With touching_card_ids, only the lists currently holding those cards are
+    read, so a delta can ship their full order.
+    """
+    return (yield query("""
+        SELECT 
+            c.id, 
+            c.list_id, 
+            c.title, 
+            ROW_NUMBER() OVER (PARTITION BY c.list_id ORDER BY c.rank ASC, c.id ASC) - 1 AS position, 
+            c.created_by, 
+            c.created_at,
+            c.priority,
+            cc.due_date,
+            cc.status
+        FROM cards c
+        JOIN lists l ON l.id = c.list_id
+        LEFT JOIN card_contents cc ON cc.card_id = c.id
+        WHERE l.board_id = %s
+          AND (
+              %s::int[] IS NULL
+              OR c.list_id IN (SELECT list_id FROM cards WHERE id = ANY(%s::int[]))
+          )
+        ORDER BY c.rank ASC, c.id ASC
+    """, (board_id, touching_card_ids, touching_card_ids)))
+
+
+def _attach_card_members(board_id: int, cards: list, card_ids: list = None):
+    rows = yield query("""
+        SELECT 
+            ca.card_id,
+            u.id AS user_id,
+            u.full_name,
+            u.email
+        FROM card_assignees ca
+        JOIN cards c ON c.id = ca.card_id
+        JOIN lists l ON l.id = c.list_id
+        JOIN users u ON u.id = ca.user_id
+        WHERE l.board_id = %s
+          AND (%s::int[] IS NULL OR ca.card_id = ANY(%s::int[]))
+    """, (board_id, card_ids, card_ids))
+    members_by_card = {}
+    for row in rows:
+        card_id = row.pop("card_id")
+        members_by_card.setdefault(card_id, []).append(row)
+
+    for card in cards:
+        card["members"] = members_by_card.get(card["id"], [])
+
+
+def _fetch_board_members(board_id: int):
+    return (yield query("""
+        (
+            -- Project owner
             SELECT 
-                id, 
-                list_id, 
-                title, 
-                position, 
-                created_by, 
-                created_at,
-                priority 
-            FROM cards
-            WHERE list_id IN (
-                SELECT id FROM lists WHERE board_id = %s
-            )
-            ORDER BY position ASC, created_at ASC
-        """, (board_id,))
-        cards = cur.fetchall()
-        cards_by_list = {}
-        for card in cards:
-            list_id = card["list_id"]
-            if list_id not in cards_by_list:
-                cards_by_list[list_id] = []
-            cur.execute("""
-                SELECT 
-                    u.id AS user_id,
-                    u.full_name,
-                    u.email
-                FROM card_assignees ca
-                JOIN users u ON u.id = ca.user_id
-                WHERE ca.card_id = %s
-            """, (card["id"],))
-            card_members = cur.fetchall()
-            card["members"] = card_members  
-
-            cur.execute("""
-                SELECT due_date, status
-                FROM card_contents
-                WHERE card_id = %s
-                LIMIT 1
-            """, (card["id"],))
-            due_date_row = cur.fetchone()
-
-            card["due_date"] = due_date_row["due_date"] if due_date_row else None
-            card["status"] = due_date_row["status"] if due_date_row else None
-
-            cards_by_list[list_id].append(card)
-
-
-        for list_obj in lists:
-            list_id = list_obj["id"]
-            list_obj["cards"] = cards_by_list.get(list_id, [])
-        cur.execute("""
-            (
-                -- Project owner
-                SELECT 
-                    u.id AS user_id,
-                    u.full_name,
-                    u.email,
-                    r.id AS role_id,
-                    r.name AS role_name
-                FROM projects p
-                JOIN users u ON u.id = p.owner_id
-                JOIN roles r ON r.name = 'project_owner'
-                WHERE p.id = (SELECT project_id FROM boards WHERE id = %s)
-            )
-            UNION
-            (
-                -- Project-level members
-                SELECT
-                    u.id AS user_id,
-                    u.full_name,
-                    u.email,
-                    r.id AS role_id,
-                    r.name AS role_name
-                FROM project_memberships pm
-                JOIN users u ON u.id = pm.user_id
-                JOIN roles r ON r.id = pm.role_id
-                WHERE pm.project_id = (SELECT project_id FROM boards WHERE id = %s)
-            )
-            UNION
-            (
-                -- Board-level members
-                SELECT
-                    u.id AS user_id,
-                    u.full_name,
-                    u.email,
-                    r.id AS role_id,
-                    r.name AS role_name
-                FROM board_memberships bm
-                JOIN users u ON u.id = bm.user_id
-                JOIN roles r ON r.id = bm.role_id
-                WHERE bm.board_id = %s
-            )
-        """, (board_id, board_id, board_id))
-
-        members = cur.fetchall()
-
-        return {
-            "message": "Lists, cards, and board members fetched successfully",
-            "lists": lists,
-            "members": members
-        }, 200
+                u.id AS user_id,
+                u.full_name,
+                u.email,
+                r.id AS role_id,
+                r.name AS role_name
+            FROM projects p
+            JOIN users u ON u.id = p.owner_id
+            JOIN roles r ON r.name = 'project_owner'
+            WHERE p.id = (SELECT project_id FROM boards WHERE id = %s)
+        )
+        UNION
+        (
+            -- Project-level members
+            SELECT
+                u.id AS user_id,
+                u.full_name,
+                u.email,
+                r.id AS role_id,
+                r.name AS role_name
+            FROM project_memberships pm
+            JOIN users u ON u.id = pm.user_id
+            JOIN roles r ON r.id = pm.role_id
+            WHERE pm.project_id = (SELECT project_id FROM boards WHERE id = %s)
+        )
+        UNION
+        (
+            -- Board-level members
+            SELECT
+                u.id AS user_id,
+                u.full_name,
+                u.email,
+                r.id AS role_id,
+                r.name AS role_name
+            FROM board_memberships bm
+            JOIN users u ON u.id = bm.user_id
+            JOIN roles r ON r.id = bm.role_id
+            WHERE bm.board_id = %s
+        )
+    """, (board_id, board_id, board_id)))
+
+
+def get_lists_by_board_id(board_id: int, since: int = None):
+    try:
+        with db_transaction(readonly=True) as cur:
+            return run_plan(cur, board_lists_plan(board_id, since))
 
     except psycopg2.Error as e:
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
+
+def board_lists_plan(board_id: int, since: int = None):
+    """
+    Return the whole board, or with `since` only what changed after that cursor.
+
+    Every response carries "cursor" (the board version it reflects) to pass
+    as `since` on the next poll. When the change log no longer reaches back
+    to `since`, the full board is returned with "full": true.
+    """
+    board = yield query_one("SELECT version FROM boards WHERE id = %s", (board_id,))
+    version = board["version"] if board else None
+
+    if since is not None and version is not None and since <= version:
+        row = yield query_one("""
+            SELECT %s = %s OR EXISTS (
+                SELECT 1 FROM board_changes
+                WHERE board_id = %s AND version = %s
+            ) AS covered
+        """, (since, version, board_id, since + 1))
+        if row["covered"]:
+            return (yield from _board_changes_plan(board_id, since, version)), 200
+
+    # Unchanged boards are served from the snapshot cache; only the
+    # version lookup reaches Postgres.
+    if version is not None:
+        snapshot = get_board_snapshot(board_id, version)
+        if snapshot is not None:
+            return snapshot, 200
+
+    # The whole board costs a fixed number of queries regardless of card count.
+    lists = yield from _fetch_lists(board_id)
+    cards = yield from _fetch_cards(board_id)
+    yield from _attach_card_members(board_id, cards)
+
+    cards_by_list = {}
+    for card in cards:
+        cards_by_list.setdefault(card["list_id"], []).append(card)
+
+    for list_obj in lists:
+        list_id = list_obj["id"]
+        list_obj["cards"] = cards_by_list.get(list_id, [])
+
+    members = yield from _fetch_board_members(board_id)
+
+    snapshot = {
+        "message": "Lists, cards, and board members fetched successfully",
+        "lists": lists,
+        "members": members,
+        "cursor": version,
+        "full": True
+    }
+    if version is not None:
+        cache_board_snapshot(board_id, version, snapshot)
+
+    return snapshot, 200
+
+
+def _board_changes_plan(board_id: int, since: int, version: int):
+    """
+    Build a delta from the change log.
+
+    Upserted lists and cards come back as full rows; ids in "deleted" are
+    tombstones (cards on a deleted list are dropped with it). "list_order"
+    and "card_order" give the complete order of every list set or list that
+    gained or reordered cards; "members" is only set when membership changed.
+    """
+    rows = yield query("""
+        SELECT DISTINCT ON (entity, entity_id) entity, entity_id, op
+        FROM board_changes
+        WHERE board_id = %s AND version > %s
+        ORDER BY entity, entity_id, version DESC, id DESC
+    """, (board_id, since))
+
+    changed = {"list": {}, "card": {}, "members": {}, "board": {}}
+    for row in rows:
+        changed.setdefault(row["entity"], {})[row["entity_id"]] = row["op"]
+
+    delta = {
+        "message": "Board changes fetched successfully",
+        "cursor": version,
+        "full": False,
+        "lists": [],
+        "cards": [],
+        "deleted": {"lists": [], "cards": []},
+        "list_order": None,
+        "card_order": {},
+        "members": None
+    }
+
+    list_upserts = {i for i, op in changed["list"].items() if op == "upsert"}
+    delta["deleted"]["lists"] = [i for i, op in changed["list"].items() if op == "delete"]
+    if list_upserts:
+        lists = yield from _fetch_lists(board_id)
+        delta["list_order"] = [l["id"] for l in lists]
+        delta["lists"] = [l for l in lists if l["id"] in list_upserts]
+        # Lists that moved to another board are gone as far as this one is concerned.
+        delta["deleted"]["lists"] += list(list_upserts - set(delta["list_order"]))
+
+    card_upserts = {i for i, op in changed["card"].items() if op == "upsert"}
+    delta["deleted"]["cards"] = [i for i, op in changed["card"].items() if op == "delete"]
+    if card_upserts:
+        cards = yield from _fetch_cards(board_id, list(card_upserts))
+        for card in cards:
+            delta["card_order"].setdefault(card["list_id"], []).append(card["id"])
+        delta["cards"] = [c for c in cards if c["id"] in card_upserts]
+        yield from _attach_card_members(board_id, delta["cards"], [c["id"] for c in delta["cards"]])
+        delta["deleted"]["cards"] += list(card_upserts - {c["id"] for c in delta["cards"]})
+
+    if changed["members"]:
+        delta["members"] = yield from _fetch_board_members(board_id)
+
+    return delta
 
 
 def update_list_positions(lists: list):
     if not isinstance(lists, list) or len(lists) == 0:
         return {"error": "Invalid payload format"}, 400
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        update_values = [(item["id"], item["position"]) for item in lists]
-        query = """
-            UPDATE lists AS l SET
-                position = v.position
-            FROM (VALUES %s) AS v(id, position)
-            WHERE l.id = v.id
-        """
-        psycopg2.extras.execute_values(cur, query, update_values)
-        conn.commit()
-        return {
-            "message": "List positions updated successfully",
-            "updated": len(lists)
-        }, 200
+        with db_transaction() as cur:
+            update_values = [(item["id"], (int(item["position"]) + 1) * RANK_STEP) for item in lists]
+            record_board_change(cur, "list", [item["id"] for item in lists], list_ids=[item["id"] for item in lists], event="lists.reordered")
+            # Same sibling lock as appends and single moves, so they can't interleave.
+            cur.execute("SELECT DISTINCT board_id FROM lists WHERE id = ANY(%s)", ([item["id"] for item in lists],))
+            lock_siblings(cur, "lists", *[row["board_id"] for row in cur.fetchall()])
+            update_query = """
+                UPDATE lists AS l SET
+                    rank = v.rank
+                FROM (VALUES %s) AS v(id, rank)
+                WHERE l.id = v.id
+            """
+            psycopg2.extras.execute_values(cur, update_query, update_values)
+            return {
+                "message": "List positions updated successfully",
+                "updated": len(lists)
+            }, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 def update_list_name(list_id: int, new_name: str):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            UPDATE lists
-            SET name = %s
-            WHERE id = %s
-            RETURNING id, name;
-        """, (new_name, list_id))
-
-        updated = cur.fetchone()
-        conn.commit()
-
-        if updated:
-            return {
-                "message": "List name updated successfully",
-                "list": updated
-            }, 200
-        else:
-            return {"error": "List not found"}, 404
+        with db_transaction() as cur:
+            record_board_change(cur, "list", [list_id], list_ids=[list_id], event="list.renamed")
+            cur.execute("""
+                UPDATE lists
+                SET name = %s
+                WHERE id = %s
+                RETURNING id, name;
+            """, (new_name, list_id))
+
+            updated = cur.fetchone()
+
+            if updated:
+                return {
+                    "message": "List name updated successfully",
+                    "list": updated
+                }, 200
+            else:
+                return {"error": "List not found"}, 404
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": e.pgerror or "Database error"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 def delete_list(list_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            DELETE FROM lists
-            WHERE id = %s
-            RETURNING id;
-        """, (list_id,))
+        with db_transaction() as cur:
+            record_board_change(cur, "list", [list_id], "delete", list_ids=[list_id], event="list.deleted")
+            cur.execute("""
+                DELETE FROM lists
+                WHERE id = %s
+                RETURNING id;
+            """, (list_id,))
 
-        deleted = cur.fetchone()
-        conn.commit()
+            deleted = cur.fetchone()
 
-        if deleted:
-            return {"message": "List deleted successfully"}, 200
-        else:
-            return {"error": "List not found"}, 404
+            if deleted:
+                return {"message": "List deleted successfully"}, 200
+            else:
+                return {"error": "List not found"}, 404
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
+
+def move_list(list_id: int, new_position: int):
+    try:
+        with db_transaction() as cur:
+            cur.execute("SELECT board_id FROM lists WHERE id = %s", (list_id,))
+            found = cur.fetchone()
+            if not found:
+                return {"error": "List not found"}, 404
+
+            board_id = found["board_id"]
+            record_board_change(cur, "list", [list_id], board_id=board_id, event="list.moved")
+            lock_siblings(cur, "lists", board_id)
+            new_rank, crowded = find_rank_at(cur, "lists", "board_id", board_id, new_position, exclude_id=list_id)
+
+            cur.execute("""
+                UPDATE lists
+                SET rank = %s
+                WHERE id = %s
+                RETURNING
+                    id, name,
+                    (
+                        SELECT COUNT(*) FROM lists AS l2
+                        WHERE l2.board_id = lists.board_id
+                          AND l2.id <> lists.id
+                          AND (l2.rank, l2.id) < (lists.rank, lists.id)
+                    ) AS position
+            """, (new_rank, list_id))
+
+            moved = cur.fetchone()
+
+        if crowded:
+            schedule_rebalance("lists", board_id)
+
+        return {
+            "message": "List moved successfully",
+            "list": moved
+        }, 200
+
+    except psycopg2.Error as e:
+        return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
@@ -1,291 +1,296 @@
-from database.config import get_db_connection, release_db_connection, release_db_connection
-from psycopg2.extras import RealDictCursor
+from database.config import db_transaction
+from database.plan import query, query_one, run_plan
 import psycopg2
-
-def add_new_board(project_id: int, name: str, position: int = 0, category: str = "General"):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+from utils.role_cache import invalidate_roles
+from database.get_roles import get_role_id
+from database.ranking import RANK_STEP
+from database.versions import bump_project_version, record_board_change
+import json, os
+
+# List sets a new board can start with. Extra templates can be supplied as a
+# JSON object in BOARD_TEMPLATES, e.g. {"bugs": ["Reported", "Fixing", "Fixed"]}.
+DEFAULT_BOARD_TEMPLATES = {
+    "default": ["To Do", "In Progress", "Done"],
+    "empty": [],
+}
+
+
+def load_board_templates(raw: str = None) -> dict:
+    """Built-in templates plus the ones in `raw`; an invalid value is reported and ignored."""
+    if not raw:
+        return dict(DEFAULT_BOARD_TEMPLATES)
     try:
-        cur.execute("""
-            INSERT INTO boards (project_id, name, position, category)
-            VALUES (%s, %s, %s, %s)
-            RETURNING id, project_id, name, position
-        """, (project_id, name, position, category))
+        extra = json.loads(raw)
+    except ValueError as e:
+        print(f"❌ BOARD_TEMPLATES is not valid JSON, using the built-in templates: {e}")
+        return dict(DEFAULT_BOARD_TEMPLATES)
+
+    if not isinstance(extra, dict) or not all(
+        isinstance(name, str) and isinstance(lists, list) and all(isinstance(l, str) for l in lists)
+        for name, lists in extra.items()
+    ):
+        print("❌ BOARD_TEMPLATES must map template names to lists of list names, using the built-in templates")
+        return dict(DEFAULT_BOARD_TEMPLATES)
+
+    return {**DEFAULT_BOARD_TEMPLATES, **extra}
+
+
+BOARD_TEMPLATES = load_board_templates(os.getenv("BOARD_TEMPLATES"))
 
-        new_board = cur.fetchone()
-        conn.commit()
 
-        return {
-            "message": "New board added successfully",
-            "board": dict(new_board)
-        }, 201
+def add_new_board(project_id: int, name: str, position: int = 0, category: str = "General", lists: list = None):
+    """Create a board and its starting lists in a single statement."""
+    try:
+        with db_transaction() as cur:
+            cur.execute("""
+                WITH new_board AS (
+                    INSERT INTO boards (project_id, name, position, category)
+                    VALUES (%s, %s, %s, %s)
+                    RETURNING id, project_id, name, position
+                ), new_lists AS (
+                    INSERT INTO lists (board_id, name, rank)
+                    SELECT new_board.id, l.name, l.ord * %s
+                    FROM new_board, unnest(%s::text[]) WITH ORDINALITY AS l(name, ord)
+                ), project_version AS (
+                    UPDATE projects SET version = version + 1 WHERE id = %s
+                )
+                SELECT id, project_id, name, position FROM new_board
+            """, (project_id, name, position, category, RANK_STEP, list(lists or []), project_id))
+
+            new_board = cur.fetchone()
+
+            return {
+                "message": "New board added successfully",
+                "board": dict(new_board)
+            }, 201
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 def get_boards_for_project(project_id: int, user_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
     try:
-        cur.execute("SELECT id FROM roles WHERE name = 'project_owner'")
-        owner_role = cur.fetchone()
-        if not owner_role:
+        PROJECT_OWNER_ROLE_ID = get_role_id("project_owner")
+        if PROJECT_OWNER_ROLE_ID is None:
             return {"error": "project_owner role missing"}, 500
 
-        PROJECT_OWNER_ROLE_ID = owner_role["id"]
-        PROJECT_OWNER_ROLE_NAME = "project_owner"
-        cur.execute("""
+        with db_transaction(readonly=True) as cur:
+            return run_plan(cur, boards_for_project_plan(project_id, user_id, PROJECT_OWNER_ROLE_ID))
+
+    except psycopg2.Error as e:
+        return {"error": str(e)}, 400
+
+
+def boards_for_project_plan(project_id: int, user_id: int, owner_role_id: int):
+    PROJECT_OWNER_ROLE_NAME = "project_owner"
+    project = yield query_one("""
+        SELECT 
+            p.owner_id,
+            pm.role_id AS project_role_id,
+            r.name AS project_role_name
+        FROM projects p
+        LEFT JOIN project_memberships pm
+            ON pm.project_id = p.id
+           AND pm.user_id = %s
+        LEFT JOIN roles r
+            ON r.id = pm.role_id
+        WHERE p.id = %s
+    """, (user_id, project_id))
+
+    if not project:
+        return {"error": "Project not found"}, 404
+
+    is_owner = project["owner_id"] == user_id
+    if is_owner:
+        project_role_id = owner_role_id
+        project_role_name = PROJECT_OWNER_ROLE_NAME
+
+    elif project["project_role_id"]:
+        project_role_id = project["project_role_id"]
+        project_role_name = project["project_role_name"]
+
+    else:
+        project_role_id = None
+        project_role_name = None
+    if is_owner or (project_role_name and project_role_name.startswith("project_")):
+        boards = yield query("""
             SELECT 
-                p.owner_id,
-                pm.role_id AS project_role_id,
-                r.name AS project_role_name
-            FROM projects p
-            LEFT JOIN project_memberships pm
-                ON pm.project_id = p.id
-               AND pm.user_id = %s
+                b.id,
+                b.project_id,
+                b.name,
+                b.position,
+                b.category,
+                b.created_at,
+                bm.role_id AS board_role_id,
+                r.name AS board_role_name
+
+            FROM boards b
+            LEFT JOIN board_memberships bm 
+                ON bm.board_id = b.id
+               AND bm.user_id = %s
+
             LEFT JOIN roles r
-                ON r.id = pm.role_id
-            WHERE p.id = %s
-        """, (user_id, project_id))
+                ON r.id = bm.role_id
 
-        project = cur.fetchone()
-        if not project:
-            return {"error": "Project not found"}, 404
+            WHERE b.project_id = %s
+            ORDER BY b.position ASC
+        """, (user_id, project_id))
 
-        is_owner = project["owner_id"] == user_id
-        if is_owner:
-            project_role_id = PROJECT_OWNER_ROLE_ID
-            project_role_name = PROJECT_OWNER_ROLE_NAME
+    else:
+        boards = yield query("""
+            SELECT 
+                b.id,
+                b.project_id,
+                b.name,
+                b.position,
+                b.category,
+                b.created_at,
+                bm.role_id AS board_role_id,
+                r.name AS board_role_name
+
+            FROM boards b
+            JOIN board_memberships bm 
+                ON bm.board_id = b.id
+               AND bm.user_id = %s
 
-        elif project["project_role_id"]:
-            project_role_id = project["project_role_id"]
-            project_role_name = project["project_role_name"]
+            LEFT JOIN roles r
+                ON r.id = bm.role_id
 
-        else:
-            project_role_id = None
-            project_role_name = None
-        if is_owner or (project_role_name and project_role_name.startswith("project_")):
-            cur.execute("""
-                SELECT 
-                    b.*,
-                    (
-                        SELECT COUNT(DISTINCT u.user_id) FROM (
-                            SELECT bm2.user_id
-                            FROM board_memberships bm2
-                            WHERE bm2.board_id = b.id
-                            
-                            UNION
-                            
-                            SELECT pm.user_id
-                            FROM project_memberships pm
-                            JOIN roles pr ON pr.id = pm.role_id
-                            WHERE pm.project_id = b.project_id
-                              AND pr.name LIKE 'project_%%'
-                            
-                            UNION
-                            
-                            SELECT p.owner_id
-                            FROM projects p
-                            WHERE p.id = b.project_id
-                        ) u
-                    ) AS members_count,
-                    
-                    bm.role_id AS board_role_id,
-                    r.name AS board_role_name
+            WHERE b.project_id = %s
+            ORDER BY b.position ASC
+        """, (user_id, project_id))
 
+    board_ids = [board["id"] for board in boards]
+    members_by_board = {board_id: [] for board_id in board_ids}
+    if board_ids:
+        rows = yield query("""
+            SELECT DISTINCT
+                role_data.board_id,
+                u.id AS user_id,
+                u.full_name,
+                u.email,
+                role_data.role_id,
+                role_data.role_name
+
+            FROM users u
+            JOIN (
+                -- Board members
+                SELECT bm.board_id, bm.user_id, bm.role_id, r.name AS role_name
+                FROM board_memberships bm
+                LEFT JOIN roles r ON r.id = bm.role_id
+                WHERE bm.board_id = ANY(%s)
+
+                UNION
+
+                -- Project-level roles
+                SELECT b.id, pm.user_id, pm.role_id, r.name AS role_name
                 FROM boards b
-                LEFT JOIN board_memberships bm 
-                    ON bm.board_id = b.id
-                   AND bm.user_id = %s
+                JOIN project_memberships pm ON pm.project_id = b.project_id
+                JOIN roles r ON r.id = pm.role_id
+                WHERE b.id = ANY(%s)
+                  AND r.name LIKE 'project_%%'
 
-                LEFT JOIN roles r
-                    ON r.id = bm.role_id
+                UNION
 
-                WHERE b.project_id = %s
-                ORDER BY b.position ASC
-            """, (user_id, project_id))
+                -- Project Owner
+                SELECT b.id, p.owner_id AS user_id,
+                       %s,
+                       'project_owner'
+                FROM boards b
+                JOIN projects p ON p.id = b.project_id
+                WHERE b.id = ANY(%s)
+            ) AS role_data
+                ON role_data.user_id = u.id
+        """, (board_ids, board_ids, owner_role_id, board_ids))
 
-        else:
-            cur.execute("""
-                SELECT 
-                    b.*,
-                    (
-                        SELECT COUNT(DISTINCT u.user_id) FROM (
-                            SELECT bm2.user_id
-                            FROM board_memberships bm2
-                            WHERE bm2.board_id = b.id
-                            
-                            UNION
-                            
-                            SELECT pm.user_id
-                            FROM project_memberships pm
-                            JOIN roles pr ON pr.id = pm.role_id
-                            WHERE pm.project_id = b.project_id
-                              AND pr.name LIKE 'project_%%'
-                            
-                            UNION
-                            
-                            SELECT p.owner_id
-                            FROM projects p
-                            WHERE p.id = b.project_id
-                        ) u
-                    ) AS members_count,
-
-                    bm.role_id AS board_role_id,
-                    r.name AS board_role_name
+        for member in rows:
+            members_by_board[member.pop("board_id")].append(dict(member))
 
-                FROM boards b
-                JOIN board_memberships bm 
-                    ON bm.board_id = b.id
-                   AND bm.user_id = %s
+    for board in boards:
+        board["members"] = members_by_board[board["id"]]
+        board["members_count"] = len({m["user_id"] for m in board["members"]})
 
-                LEFT JOIN roles r
-                    ON r.id = bm.role_id
+    results = []
+    for board in boards:
+        b = dict(board)
 
-                WHERE b.project_id = %s
-                ORDER BY b.position ASC
-            """, (user_id, project_id))
+        if is_owner:
+            b["user_role_id"] = owner_role_id
+            b["role_name"] = PROJECT_OWNER_ROLE_NAME
 
-        boards = cur.fetchall()
-        conn.commit()
+        elif project_role_name and project_role_name.startswith("project_"):
+            b["user_role_id"] = project_role_id
+            b["role_name"] = project_role_name
 
-        for board in boards:
+        else:
+            b["user_role_id"] = b["board_role_id"]
+            b["role_name"] = b["board_role_name"]
 
-            cur.execute("""
-                SELECT DISTINCT
-                    u.id AS user_id,
-                    u.full_name,
-                    u.email,
-                    role_data.role_id,
-                    role_data.role_name
-
-                FROM users u
-                JOIN (
-                    -- Board members
-                    SELECT bm.user_id, bm.role_id, r.name AS role_name
-                    FROM board_memberships bm
-                    LEFT JOIN roles r ON r.id = bm.role_id
-                    WHERE bm.board_id = %s
-
-                    UNION
-
-                    -- Project-level roles
-                    SELECT pm.user_id, pm.role_id, r.name AS role_name
-                    FROM project_memberships pm
-                    JOIN roles r ON r.id = pm.role_id
-                    WHERE pm.project_id = %s
-                      AND r.name LIKE 'project_%%'
-
-                    UNION
-
-                    -- Project Owner
-                    SELECT p.owner_id AS user_id,
-                           (SELECT id FROM roles WHERE name='project_owner'),
-                           'project_owner'
-                    FROM projects p
-                    WHERE p.id = %s
-                ) AS role_data
-                    ON role_data.user_id = u.id
-            """, (board["id"], project_id, project_id))
-
-            board_members = cur.fetchall()
-            board["members"] = [dict(m) for m in board_members]
-
-        results = []
-        for board in boards:
-            b = dict(board)
-
-            if is_owner:
-                b["user_role_id"] = PROJECT_OWNER_ROLE_ID
-                b["role_name"] = PROJECT_OWNER_ROLE_NAME
-
-            elif project_role_name and project_role_name.startswith("project_"):
-                b["user_role_id"] = project_role_id
-                b["role_name"] = project_role_name
-
-            else:
-                b["user_role_id"] = b["board_role_id"]
-                b["role_name"] = b["board_role_name"]
-
-            del b["board_role_id"]
-            del b["board_role_name"]
-
-            results.append(b)
-
-        return results, 200
+        del b["board_role_id"]
+        del b["board_role_name"]
 
-    except psycopg2.Error as e:
-        conn.rollback()
-        return {"error": str(e)}, 400
+        results.append(b)
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
+    return results, 200
 
 
-def update_board(board_id: int, name: str, category: str):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
 
+def board_in_project(board_id: int, project_id: int) -> bool:
     try:
-        cur.execute("""
-            UPDATE boards
-            SET name = %s,
-                category = %s
-            WHERE id = %s
-            RETURNING id
-        """, (name, category, board_id)) 
+        with db_transaction(readonly=True) as cur:
+            cur.execute("""
+                SELECT 1 FROM boards WHERE id = %s AND project_id = %s
+            """, (board_id, project_id))
+            return cur.fetchone() is not None
+    except psycopg2.Error:
+        return False
 
-        updated_board = cur.fetchone()
 
-        if not updated_board:
-            return {"error": "Board not found"}, 404
+def update_board(board_id: int, name: str, category: str):
+    try:
+        with db_transaction() as cur:
+            cur.execute("""
+                UPDATE boards
+                SET name = %s,
+                    category = %s
+                WHERE id = %s
+                RETURNING id
+            """, (name, category, board_id)) 
+
+            updated_board = cur.fetchone()
 
-        conn.commit()
+            if not updated_board:
+                return {"error": "Board not found"}, 404
+            record_board_change(cur, "board", [board_id], board_id=board_id, event="board.updated")
 
-        return {
-            "message": "Board updated successfully",
-            "board": dict(updated_board)
-        }, 200
+            return {
+                "message": "Board updated successfully",
+                "board": dict(updated_board)
+            }, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 def delete_board(project_id: int, board_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
     try:
-        cur.execute("""
-            DELETE FROM boards
-            WHERE id = %s AND project_id = %s
-            RETURNING id
-        """, (board_id, project_id))
+        with db_transaction() as cur:
+            cur.execute("""
+                DELETE FROM boards
+                WHERE id = %s AND project_id = %s
+                RETURNING id
+            """, (board_id, project_id))
 
-        deleted = cur.fetchone()
+            deleted = cur.fetchone()
 
-        if not deleted:
-            return {"error": "Board not found"}, 404
+            if not deleted:
+                return {"error": "Board not found"}, 404
+            bump_project_version(cur, project_id=project_id)
 
-        conn.commit()
+        invalidate_roles(project_id=project_id)
         return {"message": "Board deleted successfully"}, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
@@ -1,179 +1,209 @@
-from database.config import get_db_connection, release_db_connection
-from psycopg2.extras import RealDictCursor
+from database.config import db_transaction
 import psycopg2
+from database.versions import record_board_change
+from database.events import notify_card_event
+from datetime import datetime
+import base64, binascii, json, os
+
+# Comments are paged newest-first; a page is at most COMMENTS_MAX_PAGE_SIZE.
+COMMENTS_PAGE_SIZE = int(os.getenv("COMMENTS_PAGE_SIZE", "50"))
+COMMENTS_MAX_PAGE_SIZE = int(os.getenv("COMMENTS_MAX_PAGE_SIZE", "200"))
 
 
 def add_card_content(card_id: int, content_html: str = None, due_date: str = None, status: bool = None):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        updated_fields = []
-        if content_html is not None:
-            updated_fields.append("content")
-        if due_date is not None:
-            updated_fields.append("due date")
-        if status is not None:
-            updated_fields.append("status")
-
-        insert_query = """
-            INSERT INTO card_contents (card_id, content_html, due_date, status)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (card_id)
-            DO UPDATE SET 
-                content_html = COALESCE(EXCLUDED.content_html, card_contents.content_html),
-                due_date = EXCLUDED.due_date,
-                status = COALESCE(EXCLUDED.status, card_contents.status),
-                updated_at = CURRENT_TIMESTAMP
-            RETURNING card_id, content_html, due_date, status, updated_at;
-        """
-        cur.execute(insert_query, (card_id, content_html, due_date, status))
-        new_content = cur.fetchone()
-        conn.commit()
-
-        if not updated_fields:
-            message = "No changes were made"
-        elif len(updated_fields) == 1:
-            message = f"{updated_fields[0].capitalize()} updated successfully"
-        else:
-            field_text = ", ".join(updated_fields[:-1]) + f" and {updated_fields[-1]}"
-            message = f"{field_text.capitalize()} updated successfully"
-
-        return {
-            "message": message,
-            "content": new_content
-        }, 201
+        with db_transaction() as cur:
+            record_board_change(cur, "card", [card_id], card_ids=[card_id], event="card.content_updated")
+            updated_fields = []
+            if content_html is not None:
+                updated_fields.append("content")
+            if due_date is not None:
+                updated_fields.append("due date")
+            if status is not None:
+                updated_fields.append("status")
+
+            insert_query = """
+                INSERT INTO card_contents (card_id, content_html, due_date, status)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (card_id)
+                DO UPDATE SET 
+                    content_html = COALESCE(EXCLUDED.content_html, card_contents.content_html),
+                    due_date = EXCLUDED.due_date,
+                    status = COALESCE(EXCLUDED.status, card_contents.status),
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING card_id, content_html, due_date, status, updated_at;
+            """
+            cur.execute(insert_query, (card_id, content_html, due_date, status))
+            new_content = cur.fetchone()
+
+            if not updated_fields:
+                message = "No changes were made"
+            elif len(updated_fields) == 1:
+                message = f"{updated_fields[0].capitalize()} updated successfully"
+            else:
+                field_text = ", ".join(updated_fields[:-1]) + f" and {updated_fields[-1]}"
+                message = f"{field_text.capitalize()} updated successfully"
+
+            return {
+                "message": message,
+                "content": new_content
+            }, 201
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 
-def get_card_content(card_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+def encode_comment_cursor(comment: dict) -> str:
+    """Opaque cursor pointing just past `comment` (towards older comments)."""
+    raw = json.dumps([comment["created_at"].isoformat(), comment["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
+
+def decode_comment_cursor(cursor: str):
+    """(created_at, id) from a cursor; raises ValueError if it is not one of ours."""
     try:
-        cur.execute("""
-            SELECT card_id, content_html, updated_at, due_date, status
-            FROM card_contents
-            WHERE card_id = %s
-        """, (card_id,))
-        content = cur.fetchone()
-
-        cur.execute("""
-            SELECT 
-                c.id,
-                c.card_id,
-                c.user_id,
-                u.full_name AS user_name,
-                c.comment,
-                c.created_at
-            FROM card_comments c
-            JOIN users u ON u.id = c.user_id
-            WHERE c.card_id = %s
-            ORDER BY c.created_at ASC
-        """, (card_id,))
-        comments = cur.fetchall()
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, comment_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(comment_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
 
-        return {
-            "content": content if content else None,
-            "comments": comments,
-            "message": "Success"
-        }, 200
 
+def comments_page_size(limit) -> int:
+    if limit is None:
+        return COMMENTS_PAGE_SIZE
+    try:
+        return max(1, min(int(limit), COMMENTS_MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+
+
+def _fetch_comments_page(cur, card_id: int, limit: int, cursor: str = None, with_user_name: bool = False):
+    """
+    One page of comments, newest page first, oldest-first within the page.
+
+    Keyset pagination on (created_at, id) backed by
+    idx_card_comments_card_created; pass the returned next_cursor to get the
+    page of older comments before it. with_user_name adds the author's name,
+    as /get-card-content has always returned it.
+    """
+    before = decode_comment_cursor(cursor) if cursor else None
+    cur.execute(f"""
+        SELECT 
+            c.id,
+            c.card_id,
+            c.user_id,
+            {"u.full_name AS user_name," if with_user_name else ""}
+            c.comment,
+            c.created_at
+        FROM card_comments c
+        {"JOIN users u ON u.id = c.user_id" if with_user_name else ""}
+        WHERE c.card_id = %s
+          AND (%s::timestamp IS NULL OR (c.created_at, c.id) < (%s::timestamp, %s))
+        ORDER BY c.created_at DESC, c.id DESC
+        LIMIT %s
+    """, (card_id, before and before[0], before and before[0], before and before[1], limit + 1))
+    rows = cur.fetchall()
+
+    next_cursor = encode_comment_cursor(rows[limit - 1]) if len(rows) > limit else None
+    comments = rows[:limit]
+    comments.reverse()
+    return comments, next_cursor
+
+
+def get_card_content(card_id: int, limit: int = None, cursor: str = None):
+    try:
+        limit = comments_page_size(limit)
+        with db_transaction(readonly=True) as cur:
+            cur.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM card_comments WHERE card_id = %s) AS comments_total,
+                    cc.card_id, cc.content_html, cc.updated_at, cc.due_date, cc.status
+                FROM (SELECT 1) AS one
+                LEFT JOIN card_contents cc ON cc.card_id = %s
+            """, (card_id, card_id))
+            row = cur.fetchone()
+            comments_total = row.pop("comments_total")
+
+            comments, next_cursor = _fetch_comments_page(cur, card_id, limit, cursor, with_user_name=True)
+
+            return {
+                "content": row if row["card_id"] is not None else None,
+                "comments": comments,
+                "comments_total": comments_total,
+                "next_cursor": next_cursor,
+                "message": "Success"
+            }, 200
+
+    except ValueError as e:
+        return {"error": str(e)}, 400
     except psycopg2.Error as e:
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 
 def add_comment(card_id: int, user_id: int, comment: str):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            INSERT INTO card_comments (card_id, user_id, comment)
-            VALUES (%s, %s, %s)
-            RETURNING id, card_id, user_id, comment, created_at;
-        """, (card_id, user_id, comment))
+        with db_transaction() as cur:
+            cur.execute("""
+                INSERT INTO card_comments (card_id, user_id, comment)
+                VALUES (%s, %s, %s)
+                RETURNING id, card_id, user_id, comment, created_at;
+            """, (card_id, user_id, comment))
 
-        new_comment = cur.fetchone()
-        conn.commit()
+            new_comment = cur.fetchone()
+            notify_card_event(cur, "comment.added", card_id, comment_id=new_comment["id"], user_id=user_id)
 
-        return {
-            "message": "Comment added successfully",
-            "comment": new_comment
-        }, 201
+            return {
+                "message": "Comment added successfully",
+                "comment": new_comment
+            }, 201
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {
             "error": f"Database error: {e.pgerror or str(e)}"
         }, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 def delete_comment(comment_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            DELETE FROM card_comments
-            WHERE id = %s
-            RETURNING id;
-        """, (comment_id,))
-
-        deleted = cur.fetchone()
+        with db_transaction() as cur:
+            cur.execute("""
+                DELETE FROM card_comments
+                WHERE id = %s
+                RETURNING id, card_id;
+            """, (comment_id,))
 
-        if not deleted:
-            return {"error": "Comment not found"}, 404
+            deleted = cur.fetchone()
 
-        conn.commit()
+            if not deleted:
+                return {"error": "Comment not found"}, 404
+            notify_card_event(cur, "comment.deleted", deleted["card_id"], comment_id=comment_id)
 
-        return {"message": "Comment deleted successfully"}, 200
+            return {"message": "Comment deleted successfully"}, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {
             "error": f"Database error: {e.pgerror or str(e)}"
         }, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
-def get_comments(card_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+def get_comments(card_id: int, limit: int = None, cursor: str = None):
     try:
-        cur.execute("""
-            SELECT id, card_id, user_id, comment, created_at
-            FROM card_comments
-            WHERE card_id = %s
-            ORDER BY created_at ASC;
-        """, (card_id,))
+        limit = comments_page_size(limit)
+        with db_transaction(readonly=True) as cur:
+            cur.execute("SELECT COUNT(*) AS total FROM card_comments WHERE card_id = %s", (card_id,))
+            total = cur.fetchone()["total"]
+            comments, next_cursor = _fetch_comments_page(cur, card_id, limit, cursor)
 
-        comments = cur.fetchall()
-        conn.commit()
-
-        return {"comments": comments}, 200
+            return {"comments": comments, "total": total, "next_cursor": next_cursor}, 200
 
+    except ValueError as e:
+        return {"error": str(e)}, 400
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
-
-    finally:
-        cur.close()
-        release_db_connection(conn)
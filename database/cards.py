@@ -1,110 +1,154 @@
-from database.config import get_db_connection, release_db_connection
-from psycopg2.extras import RealDictCursor
+from database.config import db_transaction
+from database.ranking import RANK_STEP, find_rank_at, lock_siblings, lock_siblings_sql, schedule_rebalance
 import psycopg2
+import psycopg2.extras
+from database.versions import lock_boards, record_board_change
 
 def add_card_to_list(list_id: int, title: str, created_by: int, priority: str):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            SELECT COALESCE(MAX(position), -1) + 1 AS next_position
-            FROM cards
-            WHERE list_id = %s
-        """, (list_id,))
-        result = cur.fetchone()
-        position = result["next_position"]
-        cur.execute("""
-            INSERT INTO cards (list_id, title, position, created_by, priority )
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING id, title, position, created_by, created_at, priority
-        """, (list_id, title, position, created_by, priority))
-
-        new_card = cur.fetchone()
-        conn.commit()
-
-        return {
-            "message": "New card added successfully",
-            "card": new_card
-        }, 201
+        with db_transaction() as cur:
+            lock_boards(cur, list_ids=[list_id])
+            # Lock the list and append in one round trip: the INSERT runs after
+            # the lock is granted, so it sees every earlier append committed.
+            cur.execute(lock_siblings_sql("cards") + """
+                INSERT INTO cards (list_id, title, rank, created_by, priority)
+                SELECT %s, %s, COALESCE(MAX(rank), 0) + %s, %s, %s
+                FROM cards
+                WHERE list_id = %s
+                RETURNING
+                    id, title, created_by, created_at, priority,
+                    (SELECT COUNT(*) FROM cards WHERE list_id = %s) AS position
+            """, (list_id, list_id, title, RANK_STEP, created_by, priority, list_id, list_id))
+
+            new_card = cur.fetchone()
+            record_board_change(cur, "card", [new_card["id"]], list_ids=[list_id], event="card.created")
+
+            return {
+                "message": "New card added successfully",
+                "card": new_card
+            }, 201
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 def delete_card(card_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("DELETE FROM cards WHERE id = %s", (card_id,))
-        conn.commit()
+        with db_transaction() as cur:
+            record_board_change(cur, "card", [card_id], "delete", card_ids=[card_id], event="card.deleted")
+            cur.execute("DELETE FROM cards WHERE id = %s", (card_id,))
 
-        return {"message": "Card deleted successfully"}, 200
+            return {"message": "Card deleted successfully"}, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
-def update_card_positions_by_list(list_id: int, cards: list):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        conn.autocommit = False
-        for index, card in enumerate(cards):
-            cur.execute("""
-                UPDATE cards
-                SET position = %s
-                WHERE id = %s AND list_id = %s
-            """, (
-                index,        
-                card["id"],   
-                list_id        
-            ))
+def update_card_positions(lists: list):
+    """
+    Reorder cards in one or more lists with a single UPDATE.
 
-        conn.commit()
+    `lists` is [{"list_id": ..., "cards": [{"id": ...}, ...]}, ...] with int
+    ids; each card is placed in its list in the given order. The lists must
+    be on one board and every card must currently be in one of them, so a
+    card can move between them; otherwise nothing is written and the
+    offending ids are returned with a 404 (unknown) or 400 (elsewhere).
+    """
+    values = [
+        (card["id"], entry["list_id"], (index + 1) * RANK_STEP)
+        for entry in lists
+        for index, card in enumerate(entry["cards"])
+    ]
+    if not values:
+        return {"message": "List updated successfully", "updated": 0}, 200
+
+    list_ids = [entry["list_id"] for entry in lists]
+    card_ids = [value[0] for value in values]
+    if len(set(card_ids)) != len(card_ids):
+        return {"error": "A card can only appear once"}, 400
 
-        return {
-            "message": "List updated successfully"
-        }, 200
+    try:
+        with db_transaction() as cur:
+            # With the board locked no other writer can move these cards, so
+            # what is checked here still holds when the UPDATE runs.
+            lock_boards(cur, list_ids=list_ids)
+            cur.execute("SELECT id, board_id FROM lists WHERE id = ANY(%s)", (list_ids,))
+            board_of_list = {row["id"]: row["board_id"] for row in cur.fetchall()}
+            missing = [list_id for list_id in list_ids if list_id not in board_of_list]
+            if missing:
+                return {"error": "List not found", "list_ids": missing}, 404
+            if len(set(board_of_list.values())) > 1:
+                return {"error": "Lists must belong to the same board"}, 400
+
+            cur.execute("""
+                SELECT c.id, c.list_id, l.board_id
+                FROM cards c
+                JOIN lists l ON l.id = c.list_id
+                WHERE c.id = ANY(%s)
+            """, (card_ids,))
+            current = {row["id"]: row for row in cur.fetchall()}
+            board_id = next(iter(board_of_list.values()))
+            missing = [card_id for card_id in card_ids
+                       if card_id not in current or current[card_id]["board_id"] != board_id]
+            if missing:
+                return {"error": "Card not found on this board", "card_ids": missing}, 404
+            elsewhere = [card_id for card_id in card_ids if current[card_id]["list_id"] not in board_of_list]
+            if elsewhere:
+                return {"error": "Cards are not in any of the given lists", "card_ids": elsewhere}, 400
+
+            record_board_change(cur, "card", card_ids, list_ids=list_ids, event="cards.reordered")
+            lock_siblings(cur, "cards", *list_ids)
+            # page_size keeps it to a single statement.
+            psycopg2.extras.execute_values(cur, """
+                UPDATE cards AS c SET
+                    list_id = v.list_id,
+                    rank = v.rank
+                FROM (VALUES %s) AS v(id, list_id, rank)
+                WHERE c.id = v.id
+            """, values, page_size=len(values))
+
+            return {
+                "message": "List updated successfully",
+                "updated": cur.rowcount
+            }, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {
             "error": f"Database error: {e.pgerror or str(e)}"
         }, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
-def update_single_card_list(card_id: int, new_list_id: int, new_position: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        cur.execute("""
-            UPDATE cards
-            SET position = position + 1
-            WHERE list_id = %s AND position >= %s
-        """, (new_list_id, new_position))
+def update_card_positions_by_list(list_id: int, cards: list):
+    return update_card_positions([{"list_id": list_id, "cards": cards}])
 
-        cur.execute("""
-            UPDATE cards
-            SET list_id = %s,
-                position = %s
-            WHERE id = %s
-            RETURNING id, list_id, position
-        """, (new_list_id, new_position, card_id))
 
-        updated_card = cur.fetchone()
+def update_single_card_list(card_id: int, new_list_id: int, new_position: int):
+    try:
+        with db_transaction() as cur:
+            record_board_change(cur, "card", [card_id], list_ids=[new_list_id], card_ids=[card_id], event="card.moved")
+            # Only the moved card is written; its neighbours keep their ranks.
+            lock_siblings(cur, "cards", new_list_id)
+            new_rank, crowded = find_rank_at(cur, "cards", "list_id", new_list_id, new_position, exclude_id=card_id)
 
-        conn.commit()
+            cur.execute("""
+                UPDATE cards
+                SET list_id = %s,
+                    rank = %s
+                WHERE id = %s
+                RETURNING
+                    id, list_id,
+                    (
+                        SELECT COUNT(*) FROM cards AS c2
+                        WHERE c2.list_id = cards.list_id
+                          AND c2.id <> cards.id
+                          AND (c2.rank, c2.id) < (cards.rank, cards.id)
+                    ) AS position
+            """, (new_list_id, new_rank, card_id))
+
+            updated_card = cur.fetchone()
+
+        if crowded:
+            schedule_rebalance("cards", new_list_id)
 
         return {
             "message": "Card moved & positions updated successfully",
@@ -112,17 +156,11 @@ def update_single_card_list(card_id: int, new_list_id: int, new_position: int):
         }, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 def update_card_details(card_id: int, new_title: str = None, new_priority: str = None):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     update_fields = []
     update_values = []
     updated = [] 
@@ -146,33 +184,37 @@ def update_card_details(card_id: int, new_title: str = None, new_priority: str =
         UPDATE cards
         SET {', '.join(update_fields)}
         WHERE id = %s
-        RETURNING id, title, priority, list_id, position, created_by, created_at;
+        RETURNING 
+            id, title, priority, list_id,
+            (
+                SELECT COUNT(*) FROM cards AS c2
+                WHERE c2.list_id = cards.list_id
+                  AND (c2.rank, c2.id) < (cards.rank, cards.id)
+            ) AS position,
+            created_by, created_at;
     """
 
     try:
-        cur.execute(query, update_values)
-        updated_card = cur.fetchone()
-
-        if not updated_card:
-            return {"error": "Card not found"}, 404
-
-        conn.commit()
-        if updated == ["title"]:
-            msg = "Title updated successfully"
-        elif updated == ["priority"]:
-            msg = "Priority updated successfully"
-        else:
-            msg = "Title and priority updated successfully"
-
-        return {
-            "message": msg,
-            "card": updated_card
-        }, 200
+        with db_transaction() as cur:
+            record_board_change(cur, "card", [card_id], card_ids=[card_id], event="card.updated")
+            cur.execute(query, update_values)
+            updated_card = cur.fetchone()
+
+            if not updated_card:
+                return {"error": "Card not found"}, 404
+
+            if updated == ["title"]:
+                msg = "Title updated successfully"
+            elif updated == ["priority"]:
+                msg = "Priority updated successfully"
+            else:
+                msg = "Title and priority updated successfully"
+
+            return {
+                "message": msg,
+                "card": updated_card
+            }, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
@@ -2,60 +2,447 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from psycopg2 import pool
 from dotenv import load_dotenv
-import os
+import contextvars, os, sys, threading, time
 
 if os.getenv("APP_ENV", "").lower() == "local":
     load_dotenv()
 
 _db_pool = None
+_db_pool_lock = threading.Lock()
+
+# Connection of the shared_snapshot() block the current request is in, if any.
+_shared_conn = contextvars.ContextVar("shared_conn", default=None)
+
+
+class PoolMetrics:
+    """
+    Counters for the connection pool, used to size DB_POOL_MAXCONN from data.
+
+    Hold times are grouped by call site (the database function that checked
+    the connection out), so slow holders are easy to spot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.exhaustion_events = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.hold_by_site = {}
+            self._held = {}
+
+    def record_checkout(self, conn, site: str, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._held[id(conn)] = (site, time.monotonic())
+
+    def record_release(self, conn):
+        with self._lock:
+            held = self._held.pop(id(conn), None)
+            if held is None:
+                return
+            self.in_use -= 1
+            site, checked_out_at = held
+            duration = time.monotonic() - checked_out_at
+            stats = self.hold_by_site.setdefault(site, {"count": 0, "total": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+
+    def record_exhausted(self):
+        with self._lock:
+            self.exhaustion_events += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "exhaustion_events": self.exhaustion_events,
+                "wait_avg_ms": (self.wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+                "hold_by_site": {
+                    site: {
+                        "count": stats["count"],
+                        "avg_ms": stats["total"] / stats["count"] * 1000,
+                        "max_ms": stats["max"] * 1000,
+                    }
+                    for site, stats in self.hold_by_site.items()
+                },
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class BlockingConnectionPool:
+    """
+    Thread-safe connection pool that queues callers instead of failing.
+
+    psycopg2's ThreadedConnectionPool raises PoolError the moment every
+    connection is checked out. This pool waits up to `timeout` seconds for
+    one to come back, checks connections on checkout (pinging ones that sat
+    idle longer than `ping_after`), and retires connections older than
+    `max_age` so dropped SSL sessions and server-side resets get recycled.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float = 5.0,
+                 max_age: float = 1800.0, ping_after: float = 30.0, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_age = max_age
+        self.ping_after = ping_after
+        self._connect_kwargs = connect_kwargs
+        self._cond = threading.Condition()
+        self._idle = []
+        self._created_at = {}
+        self._size = 0
+        self.waiting = 0
+        self.closed = False
+
+        for _ in range(minconn):
+            conn = self._connect()
+            with self._cond:
+                self._size += 1
+                self._idle.append((conn, time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._connect_kwargs)
+        self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        """Close a connection and free its slot. Caller must hold the lock."""
+        self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._size -= 1
+        self._cond.notify()
+
+    def _expired(self, conn) -> bool:
+        created_at = self._created_at.get(id(conn), 0)
+        return time.monotonic() - created_at > self.max_age
+
+    def _is_usable(self, conn, idle_since: float) -> bool:
+        if conn.closed or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - idle_since < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                if self.closed:
+                    raise pool.PoolError("connection pool is closed")
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise pool.PoolError(
+                            f"connection pool exhausted ({self.maxconn} in use, waited {self.timeout}s)"
+                        )
+                    self.waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self.waiting -= 1
+
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    if self._expired(conn):
+                        self._discard(conn)
+                        continue
+                else:
+                    self._size += 1
+                    conn = None
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._is_usable(conn, idle_since):
+                return conn
+
+            with self._cond:
+                self._discard(conn)
+
+    def putconn(self, conn, close: bool = False):
+        with self._cond:
+            if self.closed or close or conn.closed or self._expired(conn):
+                self._discard(conn)
+                return
+
+        status = conn.info.transaction_status
+        if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            with self._cond:
+                self._discard(conn)
+            return
+        if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                with self._cond:
+                    self._discard(conn)
+                return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self.closed = True
+            for conn, _ in self._idle:
+                self._created_at.pop(id(conn), None)
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._size -= len(self._idle)
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "maxconn": self.maxconn,
+                "waiting": self.waiting,
+            }
+
+
+def _pool_settings(default_maxconn: int) -> dict:
+    return {
+        "minconn": int(os.getenv("DB_POOL_MINCONN", "1")),
+        "maxconn": int(os.getenv("DB_POOL_MAXCONN", str(default_maxconn))),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "5")),
+        "max_age": float(os.getenv("DB_POOL_MAX_AGE", "1800")),
+        "ping_after": float(os.getenv("DB_POOL_PING_AFTER", "30")),
+    }
+
+def db_connect_kwargs() -> dict:
+    """psycopg2.connect() arguments for the current APP_ENV."""
+    if os.getenv("APP_ENV", "").lower() == "local":
+        return {
+            "dbname": os.getenv("DB_NAME_LOCAL"),
+            "user": os.getenv("DB_USER_LOCAL"),
+            "password": os.getenv("DB_PASSWORD_LOCAL"),
+            "host": os.getenv("DB_HOST_LOCAL"),
+            "port": os.getenv("DB_PORT_LOCAL"),
+        }
+    return {
+        "dbname": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "host": os.getenv("DB_HOST"),
+        "port": os.getenv("DB_PORT"),
+        "sslmode": "require",
+    }
 
 def get_db_pool():
     global _db_pool
-    if _db_pool is None:
-        env = os.getenv("APP_ENV", "").lower()
-        if env == "local":
-            _db_pool = pool.ThreadedConnectionPool(
-                minconn=1,
-                maxconn=10,
-                dbname=os.getenv("DB_NAME_LOCAL"),
-                user=os.getenv("DB_USER_LOCAL"),
-                password=os.getenv("DB_PASSWORD_LOCAL"),
-                host=os.getenv("DB_HOST_LOCAL"),
-                port=os.getenv("DB_PORT_LOCAL"),
-            )
-            print("✅ LOCAL database connection pool initialized!")
-        else:
-            _db_pool = pool.ThreadedConnectionPool(
-                minconn=1,
-                maxconn=20,
-                dbname=os.getenv("DB_NAME"),
-                user=os.getenv("DB_USER"),
-                password=os.getenv("DB_PASSWORD"),
-                host=os.getenv("DB_HOST"),
-                port=os.getenv("DB_PORT"),
-                sslmode="require"
-            )
-            print("✅ PRODUCTION database connection pool initialized!")
+    with _db_pool_lock:
+        if _db_pool is None:
+            env = os.getenv("APP_ENV", "").lower()
+            if env == "local":
+                _db_pool = BlockingConnectionPool(
+                    **_pool_settings(default_maxconn=10),
+                    **db_connect_kwargs()
+                )
+                print("✅ LOCAL database connection pool initialized!")
+            else:
+                _db_pool = BlockingConnectionPool(
+                    **_pool_settings(default_maxconn=20),
+                    **db_connect_kwargs()
+                )
+                print("✅ PRODUCTION database connection pool initialized!")
     return _db_pool
 
-def get_db_connection():
+def get_db_connection(site: str = None):
     """Get a connection from the pool."""
+    site = site or sys._getframe(1).f_code.co_name
+    started = time.monotonic()
     try:
         pool = get_db_pool()
         conn = pool.getconn()
-        return conn
+    except psycopg2.pool.PoolError as e:
+        pool_metrics.record_exhausted()
+        print(f"❌ Connection pool exhausted ({site}): {e}")
+        raise
     except psycopg2.Error as e:
         print(f"❌ Failed to get connection from pool: {e}")
         raise
+    pool_metrics.record_checkout(conn, site, time.monotonic() - started)
+    return conn
 
 def release_db_connection(conn):
     """Release a connection back to the pool."""
+    pool_metrics.record_release(conn)
     try:
         pool = get_db_pool()
         pool.putconn(conn)
     except Exception as e:
         print(f"❌ Failed to release connection: {e}")
 
+
+class _Transaction:
+    def __init__(self, readonly: bool, cursor_factory, site: str):
+        self.readonly = readonly
+        self.cursor_factory = cursor_factory
+        self.site = site
+        self.conn = None
+        self.cur = None
+
+    def __enter__(self):
+        self.conn = get_db_connection(self.site)
+        try:
+            # psycopg2 sends this with the BEGIN, so it costs no extra round trip.
+            self.conn.readonly = self.readonly
+            self.cur = self.conn.cursor(cursor_factory=self.cursor_factory)
+        except Exception:
+            release_db_connection(self.conn)
+            raise
+        return self.cur
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.cur.close()
+            try:
+                if not self.conn.closed:
+                    self.conn.readonly = None
+            except psycopg2.Error:
+                # Never hand a read-only connection to the next writer.
+                self.conn.close()
+            release_db_connection(self.conn)
+        return False
+
+
+class _Savepoint:
+    """A db_transaction() inside shared_snapshot(): a savepoint on the shared connection."""
+
+    def __init__(self, conn, cursor_factory):
+        self.conn = conn
+        self.cursor_factory = cursor_factory
+        self.cur = None
+
+    def __enter__(self):
+        self.cur = self.conn.cursor(cursor_factory=self.cursor_factory)
+        self.cur.execute("SAVEPOINT shared_op")
+        return self.cur
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.cur.execute("RELEASE SAVEPOINT shared_op")
+            else:
+                self.cur.execute("ROLLBACK TO SAVEPOINT shared_op")
+        finally:
+            self.cur.close()
+        return False
+
+
+class _SharedSnapshot:
+    def __init__(self, site: str):
+        self.site = site
+        self.conn = None
+        self.token = None
+
+    def __enter__(self):
+        self.conn = get_db_connection(self.site)
+        try:
+            # Like readonly, sent with the BEGIN.
+            self.conn.set_session(
+                isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ,
+                readonly=True,
+            )
+        except Exception:
+            release_db_connection(self.conn)
+            raise
+        self.token = _shared_conn.set(self.conn)
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        _shared_conn.reset(self.token)
+        try:
+            self.conn.rollback()
+            self.conn.set_session(isolation_level="DEFAULT", readonly="DEFAULT")
+        except psycopg2.Error:
+            self.conn.close()
+        finally:
+            release_db_connection(self.conn)
+        return False
+
+
+def shared_snapshot(site: str = None):
+    """
+    Run every db_transaction() in the block on one connection, inside one
+    REPEATABLE READ read-only transaction, so they all see the same snapshot.
+
+        with shared_snapshot():
+            boards, _ = get_boards_for_project(...)
+            lists, _ = get_lists_by_board_id(...)
+
+    Each db_transaction() becomes a savepoint; one that raises is rolled back
+    without aborting the others. Writes fail, as in any read-only transaction.
+    """
+    return _SharedSnapshot(site or sys._getframe(1).f_code.co_name)
+
+
+def db_transaction(readonly: bool = False, cursor_factory=RealDictCursor, site: str = None):
+    """
+    Check out a connection and run one transaction on it.
+
+        with db_transaction(readonly=True) as cur:
+            cur.execute(...)
+
+    The transaction commits when the block exits normally and rolls back when
+    it raises; either way the connection goes back to the pool idle. Read-only
+    transactions let Postgres reject accidental writes on read paths.
+    """
+    shared = _shared_conn.get()
+    if shared is not None:
+        return _Savepoint(shared, cursor_factory)
+    return _Transaction(readonly, cursor_factory, site or sys._getframe(1).f_code.co_name)
+
+
+def get_pool_metrics() -> dict:
+    metrics = pool_metrics.snapshot()
+    if _db_pool is not None:
+        metrics["pool"] = _db_pool.stats()
+    return metrics
+
 def close_db_pool():
     """Close all connections in the pool."""
     global _db_pool
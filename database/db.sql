@@ -26,6 +26,7 @@ CREATE TABLE projects (
   description TEXT,
   category TEXT,
   owner_id INTEGER REFERENCES users(id) ON DELETE RESTRICT,
+  version BIGINT NOT NULL DEFAULT 0,
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -37,6 +38,7 @@ CREATE TABLE boards (
   name VARCHAR(120) NOT NULL,
   position INTEGER DEFAULT 0,
   category VARCHAR(120) DEFAULT 'General',
+  version BIGINT NOT NULL DEFAULT 0,
   created_at TIMESTAMP DEFAULT NOW()
 );
 
@@ -77,24 +79,24 @@ CREATE TABLE lists (
   id SERIAL PRIMARY KEY,
   board_id INTEGER REFERENCES boards(id) ON DELETE CASCADE,
   name VARCHAR(120) NOT NULL,
-  position INTEGER DEFAULT 0
+  rank DOUBLE PRECISION NOT NULL
 );
 
 CREATE INDEX idx_lists_board_id ON lists(board_id);
-CREATE INDEX idx_lists_position ON lists(position);
+CREATE INDEX idx_lists_board_rank ON lists(board_id, rank);
 
 CREATE TABLE cards (
   id SERIAL PRIMARY KEY,
   list_id INTEGER REFERENCES lists(id) ON DELETE CASCADE,
   title VARCHAR(200) NOT NULL,
-  position INTEGER DEFAULT 0,
+  rank DOUBLE PRECISION NOT NULL,
   created_by INTEGER REFERENCES users(id) ON DELETE RESTRICT,
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   priority VARCHAR(20) DEFAULT 'low' 
 );
 
 CREATE INDEX idx_cards_list_id ON cards(list_id);
-CREATE INDEX idx_cards_position ON cards(position);
+CREATE INDEX idx_cards_list_rank ON cards(list_id, rank);
 CREATE INDEX idx_cards_created_by ON cards(created_by);
 
 CREATE TABLE card_contents (
@@ -119,10 +121,31 @@ CREATE TABLE card_comments (
   card_id INTEGER NOT NULL REFERENCES cards(id) ON DELETE CASCADE,
   user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
   comment TEXT NOT NULL,
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_card_comments_card_id ON card_comments(card_id);
+CREATE INDEX idx_card_comments_card_created ON card_comments(card_id, created_at, id);
 CREATE INDEX idx_card_comments_user_id ON card_comments(user_id);
 CREATE INDEX idx_card_comments_created_at ON card_comments(created_at);
 
+
+CREATE TABLE board_changes (
+  id BIGSERIAL PRIMARY KEY,
+  board_id INTEGER NOT NULL REFERENCES boards(id) ON DELETE CASCADE,
+  version BIGINT NOT NULL,
+  entity VARCHAR(20) NOT NULL,
+  entity_id INTEGER NULL,
+  op VARCHAR(10) NOT NULL DEFAULT 'upsert',
+  created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_board_changes_board_version ON board_changes(board_id, version);
+
+
+CREATE UNLOGGED TABLE srp_sessions (
+  id UUID PRIMARY KEY,
+  state TEXT NOT NULL,
+  expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX idx_srp_sessions_expires_at ON srp_sessions(expires_at);
@@ -0,0 +1,150 @@
+from database.config import db_connect_kwargs
+import psycopg2, psycopg2.extensions
+import json, os, queue, select, threading, time
+
+# Board mutations are published with pg_notify on BOARD_EVENTS_CHANNEL from
+# inside the writing transaction, so they are only delivered once it commits
+# and reach every gunicorn worker. Each worker holds one LISTEN connection
+# and fans the notifications out to its SSE subscribers in memory.
+BOARD_EVENTS_CHANNEL = "board_events"
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SSE_SUBSCRIBER_QUEUE_SIZE", "100"))
+
+# Streams one worker serves at once. On a threaded server every open stream
+# pins a thread, so beyond the cap /boards/<id>/events answers 503 with
+# Retry-After instead of starving other requests. gunicorn.conf.py sizes it
+# from the worker class.
+SSE_MAX_STREAMS = int(os.getenv("SSE_MAX_STREAMS", "16"))
+SSE_RETRY_AFTER_SECONDS = int(os.getenv("SSE_RETRY_AFTER_SECONDS", "5"))
+
+# NOTIFY payloads are capped at 8000 bytes; bulk writes send no ids and the
+# client falls back to a delta read.
+MAX_NOTIFY_IDS = 100
+
+# Sent to a subscriber that missed events (slow consumer or lost listener);
+# it should catch up with /get-board-lists using its last cursor.
+RESYNC = {"event": "resync"}
+
+
+def notify_ids(entity_ids) -> list:
+    ids = [i for i in entity_ids if i is not None]
+    return ids if len(ids) <= MAX_NOTIFY_IDS else None
+
+
+def notify_card_event(cur, event: str, card_id: int, **extra):
+    """Publish an event about a card that does not change the board version (e.g. comments)."""
+    cur.execute("""
+        SELECT pg_notify(%s, json_build_object(
+            'board_id', l.board_id,
+            'version', NULL,
+            'event', %s,
+            'card_id', c.id,
+            'data', %s::json
+        )::text)
+        FROM cards c
+        JOIN lists l ON l.id = c.list_id
+        WHERE c.id = %s
+    """, (BOARD_EVENTS_CHANNEL, event, json.dumps(extra, default=str), card_id))
+
+
+class BoardEventHub:
+    """Per-worker LISTEN connection that fans board events out to subscriber queues."""
+
+    def __init__(self, channel: str = BOARD_EVENTS_CHANNEL):
+        self.channel = channel
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._count = 0
+        self._thread = None
+
+    def subscribe(self, board_id: int, limit: int = None) -> queue.Queue:
+        """Register a subscriber queue; None when `limit` subscribers are already open."""
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            if limit is not None and self._count >= limit:
+                return None
+            self._count += 1
+            self._subscribers.setdefault(int(board_id), set()).add(subscriber)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name="board-events", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, board_id: int, subscriber: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(int(board_id))
+            if subscribers is not None and subscriber in subscribers:
+                subscribers.discard(subscriber)
+                self._count -= 1
+                if not subscribers:
+                    del self._subscribers[int(board_id)]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return self._count
+
+    def publish(self, board_id: int, message: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(int(board_id), ()))
+        for subscriber in subscribers:
+            self._offer(subscriber, message)
+
+    def _broadcast(self, message: dict):
+        with self._lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+        for subscriber in subscribers:
+            self._offer(subscriber, message)
+
+    @staticmethod
+    def _offer(subscriber: queue.Queue, message: dict):
+        try:
+            subscriber.put_nowait(message)
+        except queue.Full:
+            # Drop the backlog of a slow client and tell it to resync instead.
+            try:
+                while True:
+                    subscriber.get_nowait()
+            except queue.Empty:
+                pass
+            subscriber.put_nowait(RESYNC)
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**db_connect_kwargs())
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                print(f"✅ Listening for board events on '{self.channel}'")
+                backoff = 1
+
+                while True:
+                    if select.select([conn], [], [], SSE_HEARTBEAT_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            message = json.loads(notify.payload)
+                        except ValueError:
+                            continue
+                        if message.get("board_id") is not None:
+                            self.publish(message["board_id"], message)
+
+            except Exception as e:
+                print(f"❌ Board event listener failed, reconnecting in {backoff}s: {e}")
+                # Anything published while we were down is lost.
+                self._broadcast(RESYNC)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+board_events = BoardEventHub()
@@ -1,25 +1,64 @@
-
-from database.config import get_db_connection, release_db_connection
-from psycopg2.extras import RealDictCursor
+from database.config import db_transaction
 import psycopg2
+import os, threading, time
 
-def get_all_roles_db():
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    try:
+# The roles table is effectively static, so each worker keeps a copy and only
+# re-reads it every ROLES_REFRESH_SECONDS or after invalidate_roles_registry().
+ROLES_REFRESH_SECONDS = float(os.getenv("ROLES_REFRESH_SECONDS", "300"))
+
+_roles_lock = threading.Lock()
+_roles_by_id = {}
+_role_ids_by_name = {}
+_roles_loaded_at = None
+
+
+def _fetch_roles():
+    with db_transaction(readonly=True) as cur:
         cur.execute("""
-            SELECT id, name, permissions, is_app_role 
+            SELECT id, name, permissions, is_app_role
             FROM roles
             ORDER BY id ASC
         """)
-        
-        rows = cur.fetchall()
-        roles = [dict(row) for row in rows]
+        return [dict(row) for row in cur.fetchall()]
+
+
+def _load_roles():
+    """Return roles by id, reloading them from the database when stale."""
+    global _roles_by_id, _role_ids_by_name, _roles_loaded_at
+    with _roles_lock:
+        stale = (
+            _roles_loaded_at is None
+            or time.monotonic() - _roles_loaded_at > ROLES_REFRESH_SECONDS
+        )
+        if stale:
+            roles = _fetch_roles()
+            _roles_by_id = {role["id"]: role for role in roles}
+            _role_ids_by_name = {role["name"]: role["id"] for role in roles}
+            _roles_loaded_at = time.monotonic()
+        return _roles_by_id
+
+
+def invalidate_roles_registry():
+    """Force the next lookup to reload the roles table."""
+    global _roles_loaded_at
+    with _roles_lock:
+        _roles_loaded_at = None
+
+
+def get_role_id(name: str):
+    _load_roles()
+    return _role_ids_by_name.get(name)
+
+
+def get_role(role_id: int):
+    role = _load_roles().get(role_id)
+    return dict(role) if role else None
+
+
+def get_all_roles_db():
+    try:
+        roles = [dict(role) for role in _load_roles().values()]
         return roles, 200
 
     except psycopg2.Error as e:
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
-    
-    finally:
-        cur.close()
-        release_db_connection(conn)
@@ -1,10 +1,7 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from database.config import get_db_connection, release_db_connection
+from database.config import db_transaction
 
 def get_user_role_name_db(user_id: int, project_id: int) -> str:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
         sql = """
         SELECT 
@@ -35,16 +32,11 @@ def get_user_role_name_db(user_id: int, project_id: int) -> str:
         LIMIT 1;
         """
 
-        cur.execute(sql, (user_id, user_id, user_id, project_id))
-        row = cur.fetchone()
-        conn.commit()
+        with db_transaction(readonly=True) as cur:
+            cur.execute(sql, (user_id, user_id, user_id, project_id))
+            row = cur.fetchone()
 
         return (row["role_name"] if row and row.get("role_name") else "No Role")
 
     except psycopg2.Error:
-        conn.rollback()
         return "No Role"
-
-    finally:
-        cur.close()
-        release_db_connection(conn)
@@ -0,0 +1,37 @@
+-- Replace dense integer positions on lists and cards with floating-point
+-- rank keys. Existing order is kept: rows are numbered by their old
+-- (position, created_at/id) order and spaced 1024 apart.
+
+BEGIN;
+
+ALTER TABLE lists ADD COLUMN rank DOUBLE PRECISION;
+ALTER TABLE cards ADD COLUMN rank DOUBLE PRECISION;
+
+UPDATE lists AS l SET
+  rank = r.new_rank
+FROM (
+  SELECT id, ROW_NUMBER() OVER (PARTITION BY board_id ORDER BY position ASC, id ASC) * 1024 AS new_rank
+  FROM lists
+) AS r
+WHERE l.id = r.id;
+
+UPDATE cards AS c SET
+  rank = r.new_rank
+FROM (
+  SELECT id, ROW_NUMBER() OVER (PARTITION BY list_id ORDER BY position ASC, created_at ASC, id ASC) * 1024 AS new_rank
+  FROM cards
+) AS r
+WHERE c.id = r.id;
+
+ALTER TABLE lists ALTER COLUMN rank SET NOT NULL;
+ALTER TABLE cards ALTER COLUMN rank SET NOT NULL;
+
+DROP INDEX IF EXISTS idx_lists_position;
+DROP INDEX IF EXISTS idx_cards_position;
+ALTER TABLE lists DROP COLUMN position;
+ALTER TABLE cards DROP COLUMN position;
+
+CREATE INDEX idx_lists_board_rank ON lists(board_id, rank);
+CREATE INDEX idx_cards_list_rank ON cards(list_id, rank);
+
+COMMIT;
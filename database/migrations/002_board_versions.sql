@@ -0,0 +1,4 @@
+-- Version counter bumped by every write that changes what a board shows;
+-- board snapshot caches are keyed on (board id, version).
+
+ALTER TABLE boards ADD COLUMN version BIGINT NOT NULL DEFAULT 0;
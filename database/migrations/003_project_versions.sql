@@ -0,0 +1,4 @@
+-- Version counter bumped by every write that changes what /get-projects
+-- shows for a project; used to build its ETag.
+
+ALTER TABLE projects ADD COLUMN version BIGINT NOT NULL DEFAULT 0;
@@ -0,0 +1,15 @@
+-- Change log behind delta sync on /get-board-lists. Each write that bumps a
+-- board's version logs the entities it touched at that version; deletes are
+-- kept as tombstones until they age out.
+
+CREATE TABLE board_changes (
+  id BIGSERIAL PRIMARY KEY,
+  board_id INTEGER NOT NULL REFERENCES boards(id) ON DELETE CASCADE,
+  version BIGINT NOT NULL,
+  entity VARCHAR(20) NOT NULL,
+  entity_id INTEGER NULL,
+  op VARCHAR(10) NOT NULL DEFAULT 'upsert',
+  created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_board_changes_board_version ON board_changes(board_id, version);
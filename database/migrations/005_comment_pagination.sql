@@ -0,0 +1,5 @@
+-- Keyset pagination of a card's comments on (created_at, id). The composite
+-- index also serves plain card_id lookups, so the single-column one goes.
+
+CREATE INDEX idx_card_comments_card_created ON card_comments(card_id, created_at, id);
+DROP INDEX IF EXISTS idx_card_comments_card_id;
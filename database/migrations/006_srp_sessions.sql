@@ -0,0 +1,11 @@
+-- SRP handshake state shared by all workers (SRP_SESSION_BACKEND=postgres).
+-- UNLOGGED: rows live for minutes and losing them on a crash only means the
+-- affected logins start over.
+
+CREATE UNLOGGED TABLE srp_sessions (
+  id UUID PRIMARY KEY,
+  state TEXT NOT NULL,
+  expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX idx_srp_sessions_expires_at ON srp_sessions(expires_at);
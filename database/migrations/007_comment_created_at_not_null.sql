@@ -0,0 +1,7 @@
+-- Comment pages are keyed on (created_at, id), so created_at can no longer
+-- be NULL. Legacy rows without one used to sort after every other comment
+-- (ORDER BY created_at ASC puts NULLs last); stamping them with the
+-- migration time keeps them there.
+
+UPDATE card_comments SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+ALTER TABLE card_comments ALTER COLUMN created_at SET NOT NULL;
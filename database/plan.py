@@ -0,0 +1,39 @@
+# Read paths that are served by both the sync (psycopg2) and the async
+# (psycopg 3) stack are written once as "plans": generators that yield the
+# queries they need and get the rows sent back.
+#
+#     def board_plan(board_id):
+#         board = yield query_one("SELECT ... WHERE id = %s", (board_id,))
+#         lists = yield query("SELECT ... WHERE board_id = %s", (board_id,))
+#         return {...}, 200
+#
+# run_plan() drives one on a psycopg2 cursor; database.aio.run_plan_async()
+# drives the same plan on an async cursor.
+
+
+class Query:
+    __slots__ = ("sql", "params", "one")
+
+    def __init__(self, sql: str, params=None, one: bool = False):
+        self.sql = sql
+        self.params = params
+        self.one = one
+
+
+def query(sql: str, params=None) -> Query:
+    return Query(sql, params)
+
+
+def query_one(sql: str, params=None) -> Query:
+    return Query(sql, params, one=True)
+
+
+def run_plan(cur, plan):
+    """Run a plan on a psycopg2 cursor and return its result."""
+    try:
+        step = next(plan)
+        while True:
+            cur.execute(step.sql, step.params)
+            step = plan.send(cur.fetchone() if step.one else cur.fetchall())
+    except StopIteration as done:
+        return done.value
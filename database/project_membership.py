@@ -1,95 +1,94 @@
-from database.config import get_db_connection, release_db_connection
-from psycopg2.extras import RealDictCursor
+from database.config import db_transaction
 import psycopg2
+from database.versions import bump_project_version, lock_boards, record_board_change
+from utils.role_cache import invalidate_roles
 
 def add_project_membership_db(project_id: int, role_id: int, email: str, added_by: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("SELECT id FROM users WHERE email = %s", (email,))
-        user = cur.fetchone()
-
-        if not user:
-            return {"error": "User does not exist or is not registered"}, 404
-
-        user_id = user["id"]
-        cur.execute("""
-            INSERT INTO project_memberships (project_id, user_id, role_id, added_by)
-            VALUES (%s, %s, %s, %s)
-            RETURNING *;
-        """, (project_id, user_id, role_id, added_by))
-
-        row = cur.fetchone()
-        conn.commit()
+        with db_transaction() as cur:
+            lock_boards(cur, project_id=project_id)
+            cur.execute("SELECT id FROM users WHERE email = %s", (email,))
+            user = cur.fetchone()
+
+            if not user:
+                return {"error": "User does not exist or is not registered"}, 404
+
+            user_id = user["id"]
+            cur.execute("""
+                INSERT INTO project_memberships (project_id, user_id, role_id, added_by)
+                VALUES (%s, %s, %s, %s)
+                RETURNING *;
+            """, (project_id, user_id, role_id, added_by))
+
+            row = cur.fetchone()
+            record_board_change(cur, "members", project_id=project_id, event="members.changed")
+            bump_project_version(cur, project_id=project_id)
+
+        invalidate_roles(user_id, project_id)
         return {
             "message": "New owner added successfully!",
             "data": row
         }, 201
 
     except psycopg2.errors.UniqueViolation:
-        conn.rollback()
         return {"error": "User already added to this project"}, 409
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 
 def delete_project_membership_db(project_id: int, user_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            DELETE FROM project_memberships
-            WHERE project_id = %s AND user_id = %s
-            RETURNING *;
-        """, (project_id, user_id))
-
-        deleted_row = cur.fetchone()
-
-        if not deleted_row:
-            return {"error": "No membership found for this project and role"}, 404
-
-        conn.commit()
+        with db_transaction() as cur:
+            lock_boards(cur, project_id=project_id)
+            cur.execute("""
+                DELETE FROM project_memberships
+                WHERE project_id = %s AND user_id = %s
+                RETURNING *;
+            """, (project_id, user_id))
+
+            deleted_row = cur.fetchone()
+
+            if not deleted_row:
+                return {"error": "No membership found for this project and role"}, 404
+            record_board_change(cur, "members", project_id=project_id, event="members.changed")
+            bump_project_version(cur, project_id=project_id)
+
+        invalidate_roles(user_id, project_id)
         return {"message": "Membership deleted successfully", "deleted": deleted_row}, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 def update_project_membership_role_db(project_id: int, user_id: int, new_role_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
     try:
-        cur.execute("""
-            SELECT * FROM project_memberships
-            WHERE project_id = %s AND user_id = %s
-        """, (project_id, user_id))
+        with db_transaction() as cur:
+            lock_boards(cur, project_id=project_id)
+            cur.execute("""
+                SELECT * FROM project_memberships
+                WHERE project_id = %s AND user_id = %s
+            """, (project_id, user_id))
+
+            member = cur.fetchone()
 
-        member = cur.fetchone()
+            if not member:
+                return {"error": "Membership not found for this user and project"}, 404
 
-        if not member:
-            return {"error": "Membership not found for this user and project"}, 404
+            cur.execute("""
+                UPDATE project_memberships
+                SET role_id = %s
+                WHERE project_id = %s AND user_id = %s
+                RETURNING *;
+            """, (new_role_id, project_id, user_id))
 
-        cur.execute("""
-            UPDATE project_memberships
-            SET role_id = %s
-            WHERE project_id = %s AND user_id = %s
-            RETURNING *;
-        """, (new_role_id, project_id, user_id))
+            updated = cur.fetchone()
+            record_board_change(cur, "members", project_id=project_id, event="members.changed")
+            bump_project_version(cur, project_id=project_id)
 
-        updated = cur.fetchone()
-        conn.commit()
+        invalidate_roles(user_id, project_id)
 
         return {
             "message": "Role updated successfully",
@@ -97,9 +96,5 @@ def update_project_membership_role_db(project_id: int, user_id: int, new_role_id
         }, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
@@ -1,19 +1,21 @@
-from database.config import get_db_connection, release_db_connection
-from psycopg2.extras import RealDictCursor
+from database.config import db_transaction
+from database.plan import query, run_plan
 import psycopg2
+from utils.role_cache import invalidate_roles
+from database.versions import VISIBLE_PROJECTS_CTE
 
 def add_new_project(name: str, description: str, owner_id: int, category:str):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            INSERT INTO projects (name, description, owner_id, category)
-            VALUES (%s, %s, %s, %s)
-            RETURNING id
-        """, (name, description, owner_id, category ))
+        with db_transaction() as cur:
+            cur.execute("""
+                INSERT INTO projects (name, description, owner_id, category)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id
+            """, (name, description, owner_id, category ))
+
+            new_project = cur.fetchone()
 
-        new_project = cur.fetchone()
-        conn.commit()
+        invalidate_roles(owner_id, new_project["id"])
 
         return {
             "message": "New project added successfully",
@@ -21,202 +23,189 @@ def add_new_project(name: str, description: str, owner_id: int, category:str):
         }, 201
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 def get_all_project_for_user(user_id: str):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        sql = """
-        SELECT 
-            p.*,
-            u.full_name AS owner_name,
-            u.email AS owner_email,
-
-            COUNT(DISTINCT b.id) AS boards_count,
-
-            (COUNT(DISTINCT pm_all.user_id) + 1) AS members_count,
-
-            -- UPDATED: use project role > board role > owner role
-            CASE
-                WHEN p.owner_id = %s THEN ro.id                    
-                WHEN pm_user.role_id IS NOT NULL THEN pm_user.role_id    
-                WHEN bm_user.role_id IS NOT NULL THEN bm_user.role_id    
-                ELSE NULL
-            END AS project_role_id,
-
-            CASE
-                WHEN p.owner_id = %s THEN ro.name                   
-                WHEN pm_user.role_id IS NOT NULL THEN r.name       
-                WHEN bm_user.role_id IS NOT NULL THEN br.name      
-                ELSE NULL
-            END AS role_name
-
-        FROM projects p
-
-        JOIN users u 
-            ON u.id = p.owner_id
-
-        LEFT JOIN boards b 
-            ON b.project_id = p.id
-
-        LEFT JOIN project_memberships pm_all
-            ON pm_all.project_id = p.id
-
-        LEFT JOIN project_memberships pm_user
-            ON pm_user.project_id = p.id
-           AND pm_user.user_id = %s
-
-        LEFT JOIN roles r
-            ON r.id = pm_user.role_id
-
-        LEFT JOIN roles ro
-            ON ro.name = 'project_owner'
-
-        LEFT JOIN board_memberships bm_user
-            ON bm_user.user_id = %s
-
-        LEFT JOIN boards b2
-            ON b2.id = bm_user.board_id
-           AND b2.project_id = p.id
-
-        LEFT JOIN roles br
-            ON br.id = bm_user.role_id      
-
-        WHERE 
-            p.owner_id = %s
-            OR pm_user.user_id = %s
-            OR b2.id IS NOT NULL
-
-        GROUP BY 
-            p.id, 
-            u.full_name, 
-            u.email, 
-            pm_user.role_id, 
-            r.name, 
-            ro.id, 
-            ro.name,
-            bm_user.role_id,     
-            br.name             
-
-        ORDER BY p.created_at DESC;
-        """
-        cur.execute(sql, (user_id, user_id, user_id, user_id, user_id, user_id))
-        rows = cur.fetchall()
-        conn.commit()
-
-        cleaned_rows = []
-        for row in rows:
-            row = dict(row)
-            cleaned_rows.append(row)
+        with db_transaction(readonly=True) as cur:
+            return run_plan(cur, projects_for_user_plan(user_id))
 
-        for project in cleaned_rows:
-            project_id = project["id"]
-            cur.execute("""
-                SELECT 
-                    u.id AS user_id,
-                    u.email,
-                    u.full_name,
-                    pm.role_id,
-                    r.name AS role_name
-                FROM project_memberships pm
-                JOIN users u ON u.id = pm.user_id
-                LEFT JOIN roles r ON r.id = pm.role_id
-                WHERE pm.project_id = %s;
-            """, (project_id,))
-
-            members = cur.fetchall()
-            cur.execute("""
-                SELECT 
-                    u.id AS user_id,
-                    u.email,
-                    u.full_name,
-                    ro.id AS role_id,
-                    ro.name AS role_name
-                FROM users u
-                LEFT JOIN roles ro ON ro.name = 'project_owner'
-                WHERE u.id = %s;
-            """, (project["owner_id"],))
-
-            owner = cur.fetchone()
-            if owner and owner["user_id"] not in [m["user_id"] for m in members]:
-                members.insert(0, owner)  
+    except psycopg2.Error as e:
+        return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-            project["members"] = members
 
-        return cleaned_rows, 200
+def projects_for_user_plan(user_id: str):
+    sql = VISIBLE_PROJECTS_CTE + """
+    SELECT 
+        p.id,
+        p.name,
+        p.description,
+        p.category,
+        p.owner_id,
+        p.created_at,
+        u.full_name AS owner_name,
+        u.email AS owner_email,
+
+        (
+            SELECT COUNT(*) FROM boards b WHERE b.project_id = p.id
+        ) AS boards_count,
+
+        (
+            SELECT COUNT(*) FROM project_memberships pm_all WHERE pm_all.project_id = p.id
+        ) + 1 AS members_count,
+
+        -- project role > board role > owner role
+        CASE
+            WHEN p.owner_id = %(user_id)s THEN ro.id                    
+            WHEN pm_user.role_id IS NOT NULL THEN pm_user.role_id    
+            ELSE bm_user.role_id
+        END AS project_role_id,
+
+        CASE
+            WHEN p.owner_id = %(user_id)s THEN ro.name                   
+            WHEN pm_user.role_id IS NOT NULL THEN r.name       
+            ELSE bm_user.role_name
+        END AS role_name
+
+    FROM visible_projects vp
+
+    JOIN projects p 
+        ON p.id = vp.id
+
+    JOIN users u 
+        ON u.id = p.owner_id
+
+    LEFT JOIN project_memberships pm_user
+        ON pm_user.project_id = p.id
+       AND pm_user.user_id = %(user_id)s
+
+    LEFT JOIN roles r
+        ON r.id = pm_user.role_id
+
+    LEFT JOIN roles ro
+        ON ro.name = 'project_owner'
+
+    -- Board role only counts for boards that belong to this project
+    LEFT JOIN LATERAL (
+        SELECT bm.role_id, br.name AS role_name
+        FROM board_memberships bm
+        JOIN boards b2 ON b2.id = bm.board_id
+        LEFT JOIN roles br ON br.id = bm.role_id
+        WHERE bm.user_id = %(user_id)s
+          AND b2.project_id = p.id
+        ORDER BY bm.role_id
+        LIMIT 1
+    ) bm_user ON TRUE
+
+    ORDER BY p.created_at DESC;
+    """
+    projects = [dict(row) for row in (yield query(sql, {"user_id": user_id}))]
+
+    members_by_project = {project["id"]: [] for project in projects}
+    if members_by_project:
+        # Owner rows sort first so they keep their place at the head of
+        # the members list, matching the per-project loader this replaced.
+        rows = yield query("""
+            SELECT 
+                p.id AS project_id,
+                u.id AS user_id,
+                u.email,
+                u.full_name,
+                ro.id AS role_id,
+                ro.name AS role_name,
+                TRUE AS is_owner
+            FROM projects p
+            JOIN users u ON u.id = p.owner_id
+            LEFT JOIN roles ro ON ro.name = 'project_owner'
+            WHERE p.id = ANY(%(project_ids)s)
+
+            UNION ALL
+
+            SELECT 
+                pm.project_id,
+                u.id AS user_id,
+                u.email,
+                u.full_name,
+                pm.role_id,
+                r.name AS role_name,
+                FALSE AS is_owner
+            FROM project_memberships pm
+            JOIN users u ON u.id = pm.user_id
+            LEFT JOIN roles r ON r.id = pm.role_id
+            WHERE pm.project_id = ANY(%(project_ids)s)
+
+            ORDER BY project_id, is_owner DESC
+        """, {"project_ids": list(members_by_project)})
+
+        owners = {}
+        for row in rows:
+            member = dict(row)
+            project_id = member.pop("project_id")
+            if member.pop("is_owner"):
+                owners[project_id] = member
+            else:
+                members_by_project[project_id].append(member)
+
+        for project_id, members in members_by_project.items():
+            owner = owners.get(project_id)
+            if owner and owner["user_id"] not in [m["user_id"] for m in members]:
+                members.insert(0, owner)
 
-    except psycopg2.Error as e:
-        conn.rollback()
-        return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
+    for project in projects:
+        project["members"] = members_by_project[project["id"]]
+
+    return projects, 200
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 
 
 def delete_project(project_id: int, owner_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            DELETE FROM projects
-            WHERE id = %s AND owner_id = %s
-            RETURNING id
-        """, (project_id, owner_id))
+        with db_transaction() as cur:
+            cur.execute("""
+                DELETE FROM projects
+                WHERE id = %s AND owner_id = %s
+                RETURNING id
+            """, (project_id, owner_id))
 
-        deleted = cur.fetchone()
+            deleted = cur.fetchone()
 
-        if not deleted:
-            return {"error": "Project not found or not authorized"}, 404
+            if not deleted:
+                return {"error": "Project not found or not authorized"}, 404
 
-        conn.commit()
+        invalidate_roles(project_id=project_id)
         return {"message": "Project deleted successfully"}, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
 
 
 def update_project(project_id: int, owner_id: int, name: str, description: str, category: str):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            UPDATE projects
-            SET name = %s,
-                description = %s,
-                category = %s
-            WHERE id = %s AND owner_id = %s
-            RETURNING id, name, description, category, created_at
-        """, (name, description, category, project_id, owner_id))
-
-        updated_project = cur.fetchone()
-
-        if not updated_project:
-            return {"error": "Project not found or not authorized"}, 404
-        conn.commit()
-        return {
-            "message": "Project updated successfully",
-            "project": dict(updated_project)
-        }, 200
+        with db_transaction() as cur:
+            cur.execute("""
+                UPDATE projects
+                SET name = %s,
+                    description = %s,
+                    category = %s,
+                    version = version + 1
+                WHERE id = %s AND owner_id = %s
+                RETURNING id, name, description, category, created_at
+            """, (name, description, category, project_id, owner_id))
+
+            updated_project = cur.fetchone()
+
+            if not updated_project:
+                return {"error": "Project not found or not authorized"}, 404
+            return {
+                "message": "Project updated successfully",
+                "project": dict(updated_project)
+            }, 200
 
     except psycopg2.Error as e:
-        conn.rollback()
         return {"error": f"Database error: {e.pgerror or str(e)}"}, 400
 
-    finally:
-        cur.close()
-        release_db_connection(conn)
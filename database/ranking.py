@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+from database.config import db_transaction
+import psycopg2, threading
+
+# Cards and lists are ordered by a floating-point rank instead of a dense
+# integer position. A move writes a rank halfway between its new neighbours,
+# so only the moved row changes. Once two neighbours get closer than
+# MIN_RANK_GAP the list is renumbered in the background.
+RANK_STEP = 1024.0
+MIN_RANK_GAP = 1e-6
+
+# First key of the transaction-level advisory locks that serialise writers
+# appending to, moving within, or renumbering the same list/board.
+CARDS_LOCK = 1
+LISTS_LOCK = 2
+
+_rebalance_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rank-rebalance")
+_pending_rebalances = set()
+_pending_lock = threading.Lock()
+
+
+def rank_between(prev_rank: float = None, next_rank: float = None) -> float:
+    if prev_rank is None and next_rank is None:
+        return RANK_STEP
+    if prev_rank is None:
+        return next_rank - RANK_STEP
+    if next_rank is None:
+        return prev_rank + RANK_STEP
+    return (prev_rank + next_rank) / 2
+
+
+def needs_rebalance(prev_rank: float = None, next_rank: float = None) -> bool:
+    return prev_rank is not None and next_rank is not None and next_rank - prev_rank < MIN_RANK_GAP
+
+
+def lock_siblings_sql(kind: str) -> str:
+    """SQL taking the sibling lock for a list's cards or a board's lists; binds the parent id."""
+    return f"SELECT pg_advisory_xact_lock({CARDS_LOCK if kind == 'cards' else LISTS_LOCK}, %s);"
+
+
+def lock_siblings(cur, kind: str, *parent_ids: int):
+    # Sorted so two transactions locking the same parents can't deadlock.
+    for parent_id in sorted(set(parent_ids)):
+        cur.execute(lock_siblings_sql(kind), (parent_id,))
+
+
+def find_rank_at(cur, table: str, parent_column: str, parent_id: int, index: int, exclude_id: int = None):
+    """
+    Work out the rank for a row dropped at `index` among its siblings.
+
+    Returns (rank, crowded) where crowded means the neighbours are so close
+    together that the siblings should be renumbered.
+    """
+    index = max(index, 0)
+    cur.execute(f"""
+        SELECT rank
+        FROM {table}
+        WHERE {parent_column} = %s AND id IS DISTINCT FROM %s
+        ORDER BY rank ASC, id ASC
+        OFFSET %s
+        LIMIT 2
+    """, (parent_id, exclude_id, max(index - 1, 0)))
+    ranks = [row["rank"] for row in cur.fetchall()]
+
+    if index == 0:
+        prev_rank, next_rank = None, (ranks[0] if ranks else None)
+    elif ranks:
+        prev_rank, next_rank = ranks[0], (ranks[1] if len(ranks) > 1 else None)
+    else:
+        # Dropped past the end of the list.
+        cur.execute(f"""
+            SELECT MAX(rank) AS max_rank
+            FROM {table}
+            WHERE {parent_column} = %s AND id IS DISTINCT FROM %s
+        """, (parent_id, exclude_id))
+        prev_rank, next_rank = cur.fetchone()["max_rank"], None
+
+    return rank_between(prev_rank, next_rank), needs_rebalance(prev_rank, next_rank)
+
+
+def rebalance_cards(list_id: int):
+    with db_transaction() as cur:
+        cur.execute(lock_siblings_sql("cards") + """
+            UPDATE cards AS c SET
+                rank = r.new_rank
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY rank ASC, id ASC) * %s AS new_rank
+                FROM cards
+                WHERE list_id = %s
+            ) AS r
+            WHERE c.id = r.id
+        """, (list_id, RANK_STEP, list_id))
+
+
+def rebalance_lists(board_id: int):
+    with db_transaction() as cur:
+        cur.execute(lock_siblings_sql("lists") + """
+            UPDATE lists AS l SET
+                rank = r.new_rank
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY rank ASC, id ASC) * %s AS new_rank
+                FROM lists
+                WHERE board_id = %s
+            ) AS r
+            WHERE l.id = r.id
+        """, (board_id, RANK_STEP, board_id))
+
+
+def _run_rebalance(kind: str, parent_id: int):
+    with _pending_lock:
+        _pending_rebalances.discard((kind, parent_id))
+    try:
+        if kind == "cards":
+            rebalance_cards(parent_id)
+        else:
+            rebalance_lists(parent_id)
+    except psycopg2.Error as e:
+        print(f"❌ Failed to rebalance {kind} for {parent_id}: {e}")
+
+
+def schedule_rebalance(kind: str, parent_id: int):
+    """Queue a background renumbering of the cards in a list or the lists on a board."""
+    key = (kind, parent_id)
+    with _pending_lock:
+        if key in _pending_rebalances:
+            return
+        _pending_rebalances.add(key)
+    _rebalance_executor.submit(_run_rebalance, kind, parent_id)
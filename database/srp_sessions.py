@@ -0,0 +1,73 @@
+from database.config import db_transaction
+import json, uuid
+
+# Expired rows are purged by each insert, at most PURGE_BATCH at a time, so
+# a login never pays for a large cleanup. The expires_at index finds them.
+PURGE_BATCH = 100
+
+
+def _encode(state: dict) -> str:
+    # Handshake state holds big ints (fine in JSON) and the salt as bytes.
+    return json.dumps(state, default=lambda o: {"__bytes__": o.hex()})
+
+
+def _valid_id(sid) -> bool:
+    try:
+        uuid.UUID(str(sid))
+        return True
+    except ValueError:
+        return False
+
+
+def _decode(raw: str) -> dict:
+    return json.loads(raw, object_hook=lambda d: bytes.fromhex(d["__bytes__"]) if "__bytes__" in d else d)
+
+
+class PostgresSessionStore:
+    """SRP handshake state in the srp_sessions UNLOGGED table, shared by every worker."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+
+    def add(self, sid: str, state: dict):
+        with db_transaction() as cur:
+            cur.execute("""
+                WITH purged AS (
+                    DELETE FROM srp_sessions
+                    WHERE id IN (
+                        SELECT id FROM srp_sessions
+                        WHERE expires_at < NOW()
+                        LIMIT %s
+                    )
+                )
+                INSERT INTO srp_sessions (id, state, expires_at)
+                VALUES (%s, %s, NOW() + make_interval(secs => %s))
+            """, (PURGE_BATCH, sid, _encode(state), self.timeout))
+
+    def get(self, sid: str):
+        if not _valid_id(sid):
+            return None
+        with db_transaction(readonly=True) as cur:
+            cur.execute("""
+                SELECT state FROM srp_sessions
+                WHERE id = %s AND expires_at > NOW()
+            """, (sid,))
+            row = cur.fetchone()
+        return _decode(row["state"]) if row else None
+
+    def pop(self, sid: str):
+        # DELETE ... RETURNING makes each handshake single-use across workers.
+        if not _valid_id(sid):
+            return None
+        with db_transaction() as cur:
+            cur.execute("""
+                DELETE FROM srp_sessions
+                WHERE id = %s
+                RETURNING state, expires_at > NOW() AS live
+            """, (sid,))
+            row = cur.fetchone()
+        return _decode(row["state"]) if row and row["live"] else None
+
+    def purge_expired(self):
+        with db_transaction() as cur:
+            cur.execute("DELETE FROM srp_sessions WHERE expires_at < NOW()")
@@ -0,0 +1,194 @@
+from database.config import db_transaction
+from database.plan import query_one, run_plan
+from database.events import BOARD_EVENTS_CHANNEL, notify_ids
+import psycopg2, os, json
+
+# Every board carries a version counter that moves whenever anything shown by
+# /get-board-lists changes, and each bump is logged in board_changes so
+# clients can ask for just what changed since a version. Readers key their
+# snapshot caches on it, so the bump must run inside the same transaction as
+# the write it describes.
+# Projects carry the same kind of counter for what /get-projects shows.
+
+# Projects a user can see: owned, joined, or reached through a board.
+VISIBLE_PROJECTS_CTE = """
+    WITH visible_projects AS (
+        SELECT p.id
+        FROM projects p
+        WHERE p.owner_id = %(user_id)s
+
+        UNION
+
+        SELECT pm.project_id
+        FROM project_memberships pm
+        WHERE pm.user_id = %(user_id)s
+
+        UNION
+
+        SELECT b.project_id
+        FROM board_memberships bm
+        JOIN boards b ON b.id = bm.board_id
+        WHERE bm.user_id = %(user_id)s
+    )
+"""
+
+
+# Old change-log rows are pruned every BOARD_CHANGES_PRUNE_EVERY versions of
+# a board; clients whose cursor predates the kept history get a full board.
+BOARD_CHANGES_RETENTION_DAYS = int(os.getenv("BOARD_CHANGES_RETENTION_DAYS", "7"))
+BOARD_CHANGES_PRUNE_EVERY = 100
+
+
+# Boards a write touches: named directly, through lists or cards on them, or
+# through their project. Locked in id order so multi-board writes (a card
+# moved across boards, a project-wide membership change) can't deadlock.
+_LOCK_BOARDS = """
+    SELECT id
+    FROM boards
+    WHERE id = %s
+       OR project_id = %s
+       OR id IN (SELECT board_id FROM lists WHERE id = ANY(%s))
+       OR id IN (
+            SELECT l.board_id
+            FROM cards c
+            JOIN lists l ON l.id = c.list_id
+            WHERE c.id = ANY(%s)
+       )
+    ORDER BY id
+    FOR NO KEY UPDATE
+"""
+
+
+def lock_boards(cur, board_id: int = None, list_ids: list = (), card_ids: list = (), project_id: int = None):
+    """
+    Take the board row locks record_board_change needs, ahead of time.
+
+    Writers lock their boards before any card, list or membership row and
+    before the sibling advisory locks, so two writes on one board queue on
+    the board row instead of deadlocking on each other's rows. Call this
+    first when record_board_change can only run after the write (inserts,
+    whose new id is not known yet).
+    """
+    cur.execute(_LOCK_BOARDS, (board_id, project_id, list(list_ids), list(card_ids)))
+
+
+def record_board_change(cur, entity: str, entity_ids: list = (None,), op: str = "upsert",
+                        board_id: int = None, list_ids: list = (), card_ids: list = (), project_id: int = None,
+                        event: str = None):
+    """
+    Bump the version of every board touched by a write, log what changed and
+    publish it to live subscribers.
+
+    `entity` is "list", "card", "members" or "board"; `op` is "upsert" or
+    "delete"; `event` names the mutation for subscribers (e.g. "card.moved").
+    Boards can be named directly, through lists or cards on them, or through
+    their project.
+
+    Call it first in the transaction, before touching any other row: it
+    locks the boards (see lock_boards), and before a delete or move it still
+    finds the board the card/list is leaving.
+    """
+    cur.execute("""
+        WITH locked AS (""" + _LOCK_BOARDS + """
+        ), bumped AS (
+            UPDATE boards SET version = version + 1
+            FROM locked
+            WHERE boards.id = locked.id
+            RETURNING boards.id, boards.version
+        ), logged AS (
+            INSERT INTO board_changes (board_id, version, entity, entity_id, op)
+            SELECT b.id, b.version, %s, e.id, %s
+            FROM bumped b, unnest(%s::int[]) AS e(id)
+        ), pruned AS (
+            DELETE FROM board_changes bc
+            USING bumped b
+            WHERE bc.board_id = b.id
+              AND b.version %% %s = 0
+              AND bc.created_at < NOW() - make_interval(days => %s)
+        )
+        SELECT id, version, pg_notify(%s, json_build_object(
+            'board_id', id,
+            'version', version,
+            'event', %s,
+            'entity', %s,
+            'op', %s,
+            'ids', %s::json
+        )::text)
+        FROM bumped
+    """, (board_id, project_id, list(list_ids), list(card_ids), entity, op, list(entity_ids),
+          BOARD_CHANGES_PRUNE_EVERY, BOARD_CHANGES_RETENTION_DAYS,
+          BOARD_EVENTS_CHANNEL, event or f"{entity}.{op}", entity, op, json.dumps(notify_ids(entity_ids))))
+
+
+def bump_project_version(cur, project_id: int = None, board_id: int = None):
+    """Increment a project's version; pass board_id to find it through one of its boards."""
+    cur.execute("""
+        UPDATE projects SET version = version + 1
+        WHERE id = %s
+           OR id = (SELECT project_id FROM boards WHERE id = %s)
+    """, (project_id, board_id))
+
+
+# Cheap probes used to answer conditional reads before the real query runs.
+# A probe that fails returns None so the caller simply does the full read.
+
+def _probe(plan):
+    try:
+        with db_transaction(readonly=True, site=plan.__name__) as cur:
+            return run_plan(cur, plan)
+    except psycopg2.Error as e:
+        print(f"❌ Version probe {plan.__name__} failed: {e}")
+        return None
+
+
+def board_version_plan(board_id: int):
+    row = yield query_one("SELECT version FROM boards WHERE id = %s", (board_id,))
+    return row["version"] if row else None
+
+
+def project_boards_version_plan(project_id: int):
+    row = yield query_one("""
+        SELECT
+            (SELECT version FROM projects WHERE id = %s) AS project_version,
+            string_agg(id || ':' || version, ',' ORDER BY id) AS boards
+        FROM boards
+        WHERE project_id = %s
+    """, (project_id, project_id))
+    return (row["project_version"], row["boards"])
+
+
+def user_projects_version_plan(user_id: int):
+    row = yield query_one(VISIBLE_PROJECTS_CTE + """
+        SELECT string_agg(p.id || ':' || p.version, ',' ORDER BY p.id) AS projects
+        FROM visible_projects vp
+        JOIN projects p ON p.id = vp.id
+    """, {"user_id": user_id})
+    return row["projects"]
+
+
+def card_content_version_plan(card_id: int):
+    row = yield query_one("""
+        SELECT
+            (SELECT updated_at FROM card_contents WHERE card_id = %s) AS content_updated_at,
+            COUNT(*) AS comments_count,
+            MAX(id) AS last_comment_id
+        FROM card_comments
+        WHERE card_id = %s
+    """, (card_id, card_id))
+    return (row["content_updated_at"], row["comments_count"], row["last_comment_id"])
+
+
+def get_board_version(board_id: int):
+    return _probe(board_version_plan(board_id))
+
+
+def get_project_boards_version(project_id: int):
+    return _probe(project_boards_version_plan(project_id))
+
+
+def get_user_projects_version(user_id: int):
+    return _probe(user_projects_version_plan(user_id))
+
+
+def get_card_content_version(card_id: int):
+    return _probe(card_content_version_plan(card_id))
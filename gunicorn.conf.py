@@ -0,0 +1,31 @@
+# Loaded automatically by `gunicorn main:app` from this directory. The bind
+# address is left to gunicorn (-b / GUNICORN_CMD_ARGS, default 127.0.0.1:8000).
+#
+# /boards/<id>/events keeps its response open for as long as the client is
+# subscribed. The default sync worker would be pinned by the first stream,
+# so default to gthread, where each open stream holds one of `threads`.
+# SSE_MAX_STREAMS caps them at half the threads so the rest keep serving
+# normal requests; extra subscribers get 503 + Retry-After. For thousands of
+# streams per worker use the gevent worker (pip3 install gevent psycogreen)
+# or run asgi:app under uvicorn.
+import os
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "32"))
+
+
+def post_fork(server, worker):
+    # Runs in the worker before the app is imported; reads the effective
+    # settings, so -k / --threads on the command line are honoured.
+    cfg = server.cfg
+    if cfg.worker_class_str == "gevent":
+        os.environ.setdefault("SSE_MAX_STREAMS", str(max(1, cfg.worker_connections - 100)))
+        try:
+            # Let psycopg2 yield to other greenlets while it waits on Postgres.
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen is not installed; database calls block the gevent worker")
+    else:
+        os.environ.setdefault("SSE_MAX_STREAMS", str(max(1, cfg.threads // 2)))
@@ -1,6 +1,7 @@
 from flask import Flask, jsonify, request
 from dotenv import load_dotenv
-from database.config import  close_db_pool
+from database.config import  close_db_pool, get_pool_metrics
+from middleware.auth_middleware import token_required
 from flask_cors import CORS
 import  os, atexit
 from routes.get_roles import get_roles_bp
@@ -13,21 +14,36 @@ from routes.project_membership import bp as project_membership_bp
 from routes.card_membership import  bp as  card_membership_bp
 from routes.board_list import bp as board_list_bp
 from routes.projects import bp as projects_bp
+from routes.board_events import bp as board_events_bp
+from routes.batch import bp as batch_bp
+from utils.json_provider import install_json_provider
+from utils.compression import init_compression
 load_dotenv()
 
 app = Flask(__name__)
+install_json_provider(app)
+init_compression(app)
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "").split(",")
 
 CORS(
     app,
     supports_credentials=True,
-    origins=allowed_origins
+    origins=allowed_origins,
+    expose_headers=["ETag"]
 )
 
 @app.route('/')
 def home():
     return "Hello from Flask!"
 
+# Pool internals are for operators only: the route is off unless
+# POOL_METRICS_ENABLED is set, e.g. on an instance not exposed to users.
+if os.getenv("POOL_METRICS_ENABLED", "").lower() in ("1", "true", "yes"):
+    @app.route('/pool-metrics')
+    @token_required
+    def pool_metrics():
+        return jsonify(get_pool_metrics()), 200
+
 
 app.register_blueprint(board_list_bp)
 app.register_blueprint(auth_bp)
@@ -39,6 +55,8 @@ app.register_blueprint(cards_bp)
 app.register_blueprint(project_membership_bp)
 app.register_blueprint(projects_bp)
 app.register_blueprint(get_roles_bp)
+app.register_blueprint(board_events_bp)
+app.register_blueprint(batch_bp)
 
 if __name__ == '__main__':
     print("✅ Flask is starting...")
@@ -2,7 +2,8 @@ from functools import wraps
 from flask import request, jsonify
 import jwt
 from database.get_user_role_name import get_user_role_name_db
-from utils.jwt_helper import SECRET_KEY
+from utils.jwt_helper import decode_jwt_token
+from utils.role_cache import get_cached_role, cache_role, role_generation
 
 
 def require_roles(allowed_roles):
@@ -15,12 +16,14 @@ def require_roles(allowed_roles):
             access_token = request.cookies.get("access_token")
             refresh_token = request.cookies.get("refresh_token")
 
-            user_id = None
+            # token_required has usually decoded the token already
+            decoded_token = getattr(request, "decoded_token", None) or {}
+            user_id = decoded_token.get("id")
 
             # 1️⃣ Try access token first (if exists)
-            if access_token:
+            if not user_id and access_token:
                 try:
-                    decoded = jwt.decode(access_token, SECRET_KEY, algorithms=["HS256"])
+                    decoded = decode_jwt_token(access_token)
                     user_id = decoded.get("id")
                 except jwt.ExpiredSignatureError:
                     # expired, will try refresh token next
@@ -31,7 +34,7 @@ def require_roles(allowed_roles):
             # 2️⃣ If no access token or it’s expired, try refresh token
             if not user_id and refresh_token:
                 try:
-                    refresh_decoded = jwt.decode(refresh_token, SECRET_KEY, algorithms=["HS256"])
+                    refresh_decoded = decode_jwt_token(refresh_token)
                     user_id = refresh_decoded.get("id")
                 except jwt.ExpiredSignatureError:
                     return jsonify({"error": "Refresh token has expired"}), 401
@@ -52,8 +55,18 @@ def require_roles(allowed_roles):
             if not project_id:
                 return jsonify({"error": "Missing project_id"}), 400
 
-            # 5️⃣ Get role for this project
-            role_name = get_user_role_name_db(user_id, project_id)
+            try:
+                project_id = int(project_id)
+            except (TypeError, ValueError):
+                return jsonify({"error": "Invalid project_id"}), 400
+
+            # 5️⃣ Get role for this project (cached per worker)
+            role_name = get_cached_role(user_id, project_id)
+            if role_name is None:
+                generation = role_generation()
+                role_name = get_user_role_name_db(user_id, project_id)
+                if role_name != "No Role":
+                    cache_role(user_id, project_id, role_name, generation)
 
             # 6️⃣ Check if user’s role is allowed
             if role_name not in allowed_roles:
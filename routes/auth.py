@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, make_response
-from database.auth import register_srp_user, get_user_salt_verifier, get_user_email
-from utils.srpUtils import N, g, H, hex64_from_int,  new_session, clean_expired_sessions,get_session, pop_session, randbits_256
+from database.auth import register_srp_user, get_user_auth_record
+from utils.srpUtils import N, H, hex64_from_int, server_public_B, server_session_key,  new_session, pop_session, randbits_256
+from utils.srp_pool import run_srp
 from utils.jwt_helper import create_jwt_token, verify_jwt_token
 import jwt 
 import os
@@ -74,11 +75,6 @@ def srp_register():
     if not all([full_name, email, salt_hex, verifier_hex]):
         return jsonify({"error": "Missing fields"}), 400
 
-    # Check if email already exists
-    existing_user = get_user_email(email)
-    if existing_user:
-        return jsonify({"error": "That email is already in use. Try logging in instead."}), 400
-
     try:
         # Persist as BYTEA (psycopg2 wants bytes)
         salt_bytes = bytes.fromhex(salt_hex)
@@ -86,7 +82,7 @@ def srp_register():
     except ValueError:
         return jsonify({"error": "Bad hex for salt/verifier"}), 400
 
-    # Insert via DB helper.
+    # Insert via DB helper; it reports an email that is already in use.
     result, status = register_srp_user(full_name, email, salt_bytes, verifier_bytes)
     return jsonify(result), status
 
@@ -116,9 +112,6 @@ def srp_login_start():
       - u: scrambler that prevents offline dictionary attacks against v.
       - session_id: binds this "start" step to the "verify" step (HTTP is stateless).
     """
-    # Clean old sessions to reduce replay windows & memory growth
-    clean_expired_sessions()
-
     data = request.get_json() or {}
     email = (data.get("email") or "").strip().lower()
     A_hex = (data.get("A") or "").strip().lower()
@@ -136,8 +129,9 @@ def srp_login_start():
     if A % N == 0:
         return jsonify({"error": "Invalid A (mod N == 0)"}), 400
 
-    # Pull (salt, verifier) from DB. Both stored as BYTEA.
-    user = get_user_salt_verifier(email)
+    # Pull (salt, verifier) from DB, both stored as BYTEA, along with the fields
+    # step 2 puts in the tokens, so verify needs no lookup of its own.
+    user = get_user_auth_record(email)
     if not user:
         return jsonify({"error": "No account found with the provided information."}), 404
 
@@ -150,12 +144,13 @@ def srp_login_start():
     # Convert verifier (bytes) → int (needed for modular exponentiation)
     v = int.from_bytes(verifier_bytes, "big")
 
-    # k mixes N and g; part of SRP-6a hardening. Prevents chosen-subgroup tricks.
-    k = H(N, g)
+    # k = H(N, g) mixes N and g; part of SRP-6a hardening. Prevents chosen-subgroup
+    # tricks. It only depends on the group, so srpUtils computes it once.
 
     # Server picks fresh b (>=256-bit) and publishes B based on both g^b and v.
+    # The exponentiation runs in the SRP process pool when one is configured.
     b = randbits_256()
-    B = (k * v + pow(g, b, N)) % N
+    B = run_srp(server_public_B, v, b)
 
     # Safety: B must also be a valid group element.
     if B % N == 0:
@@ -174,6 +169,9 @@ def srp_login_start():
         "v": v,
         "u": u,
         "salt": salt_bytes,
+        "user_id": user["id"],
+        "app_role_id": user["app_role_id"],
+        "full_name": user["full_name"],
     })
 
     # Client needs salt (to recompute x), B (to compute S), and session_id (to bind step 2).
@@ -224,8 +222,10 @@ def srp_login_verify():
     email = (data.get("email") or "").strip().lower()
     client_M1_hex = (data.get("M1") or "").strip().lower()
 
-    # Retrieve the ephemeral state from step 1 (bound by session_id).
-    session = get_session(session_id)
+    # Retrieve the ephemeral state from step 1 (bound by session_id) and consume
+    # it: one verify attempt per handshake, whatever the outcome, which also
+    # blocks replays and concurrent attempts on another worker.
+    session = pop_session(session_id)
     if not session:
         return jsonify({"error": "Session expired or invalid"}), 400
 
@@ -240,11 +240,8 @@ def srp_login_verify():
     # Server-side S formula (different from client's but yields same value):
     #   Avu = (A * v^u) mod N
     #   S   = (Avu)^b      mod N
-    Avu = (A * pow(v, u, N)) % N
-    S = pow(Avu, b, N)
-
-    # Derive K (int form via H); never transmitted.
-    K_int = H(S)
+    # and K = H(S) (int form via H); never transmitted.
+    K_int = run_srp(server_session_key, A, v, u, b)
 
     # Expected client proof M1 must match client's M1 if passwords match.
     expected_M1_int = H(email, salt_bytes, A, B, K_int)
@@ -253,32 +250,25 @@ def srp_login_verify():
     try:
         client_M1_int = int(client_M1_hex, 16)
     except Exception:
-        # Bad input: ditch the session to prevent reuse.
-        pop_session(session_id)
         return jsonify({"error": "Bad M1"}), 400
 
     # If proofs mismatch, either password is wrong or tampering occurred.
     if expected_M1_int != client_M1_int:
-        pop_session(session_id)
         return jsonify({"error": "Invalid email or password."}), 403
 
     # Server proof lets the client verify the server also computed K (mutual auth).
     M2_int = H(A, client_M1_int, K_int)
     M2_hex = hex64_from_int(M2_int)
 
-    # One-time handshake: destroy the session to block replays.
-    pop_session(session_id)
-
-    get_user_id = get_user_email(email)
-
+    # The user's fields were loaded with the verifier in step 1.
     access_token = create_jwt_token(
-        {"email": email, "id": get_user_id["id"], "app_role_id" : get_user_id["app_role_id"], "full_name": get_user_id["full_name"], "type": "access"},
+        {"email": email, "id": session["user_id"], "app_role_id" : session["app_role_id"], "full_name": session["full_name"], "type": "access"},
         expires_in_seconds=20
  
     )
 
     refresh_token = create_jwt_token(
-        {"email": email, "id": get_user_id["id"],"full_name": get_user_id["full_name"],  "type": "refresh"},
+        {"email": email, "id": session["user_id"],"full_name": session["full_name"],  "type": "refresh"},
         expires_in_seconds=3 * 60 * 60
     )
 
@@ -0,0 +1,117 @@
+from flask import Blueprint, request, jsonify
+from database.board_list import get_lists_by_board_id
+from database.boards import get_boards_for_project
+from database.card_content import get_card_content
+from database.config import shared_snapshot
+from database.get_roles import get_all_roles_db
+from database.projects import get_all_project_for_user
+from middleware.auth_middleware import token_required
+import os, psycopg2
+
+bp = Blueprint("batch", __name__)
+
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+
+
+# Read endpoints that can be batched. Each takes the body the standalone
+# route takes and returns (payload, status) the same way.
+
+def _protected(data):
+    roles, status = get_all_roles_db()
+    return {
+        "authenticated": True,
+        "user": request.decoded_token,
+        "app-roles": roles if status == 200 else []
+    }, 200
+
+
+def _get_roles(data):
+    return get_all_roles_db()
+
+
+def _get_boards(data):
+    project_id = data.get("project_id")
+    user_id = data.get("user_id")
+    if not project_id and not user_id:
+        return {"error": "project_id is required"}, 400
+    return get_boards_for_project(project_id, user_id)
+
+
+def _get_board_lists(data):
+    if "board_id" not in data:
+        return {"error": "board_id is required"}, 400
+    since = data.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except (TypeError, ValueError):
+            return {"error": "since must be an integer cursor"}, 400
+    return get_lists_by_board_id(data["board_id"], since)
+
+
+def _get_projects(data):
+    user_id = data.get("owner_id")
+    if not user_id:
+        return {"error": "Missing owner_id"}, 400
+    projects, status = get_all_project_for_user(user_id)
+    if isinstance(projects, dict) and "error" in projects:
+        return projects, 400
+    return projects, status
+
+
+def _get_card_content(data):
+    card_id = data.get("card_id")
+    if card_id is None:
+        return {"error": "card_id is required"}, 400
+    return get_card_content(card_id, data.get("limit"), data.get("cursor"))
+
+
+BATCH_OPERATIONS = {
+    "/protected": _protected,
+    "/get-roles": _get_roles,
+    "/get-boards": _get_boards,
+    "/get-board-lists": _get_board_lists,
+    "/get-projects": _get_projects,
+    "/get-card-content": _get_card_content,
+}
+
+
+@bp.route("/batch", methods=["POST"])
+@token_required
+def batch():
+    """
+    Run several read requests in one round trip.
+
+        {"requests": [{"path": "/get-boards", "body": {"project_id": 1}},
+                      {"path": "/get-board-lists", "body": {"board_id": 4}}]}
+
+    Answers {"responses": [{"status": ..., "body": ...}, ...]} in the same
+    order. The token is checked once and every request reads from the same
+    database snapshot over one pooled connection.
+    """
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get("requests")
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({"error": "requests must be a non-empty list"}), 400
+    if len(sub_requests) > BATCH_MAX_REQUESTS:
+        return jsonify({"error": f"At most {BATCH_MAX_REQUESTS} requests per batch"}), 400
+
+    responses = []
+    try:
+        with shared_snapshot():
+            for sub in sub_requests:
+                sub = sub if isinstance(sub, dict) else {}
+                operation = BATCH_OPERATIONS.get(sub.get("path"))
+                if operation is None:
+                    responses.append({"status": 400, "body": {"error": f"Unsupported batch path: {sub.get('path')}"}})
+                    continue
+                try:
+                    body, status = operation(sub.get("body") or {})
+                except Exception as e:
+                    body, status = {"error": str(e)}, 500
+                responses.append({"status": status, "body": body})
+
+    except psycopg2.Error as e:
+        return jsonify({"error": f"Database error: {e.pgerror or str(e)}"}), 400
+
+    return jsonify({"responses": responses}), 200
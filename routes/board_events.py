@@ -0,0 +1,63 @@
+from flask import Blueprint, Response, jsonify, request
+from database.boards import board_in_project
+from database.events import SSE_HEARTBEAT_SECONDS, SSE_MAX_STREAMS, SSE_RETRY_AFTER_SECONDS, board_events
+from database.versions import get_board_version
+from middleware.auth_middleware import token_required
+from middleware.role_middleware import require_roles
+import json, queue
+
+bp = Blueprint("board_events", __name__)
+
+
+def _sse(event: str, data: dict, event_id=None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@bp.route("/boards/<int:board_id>/events", methods=["GET"])
+@token_required
+@require_roles(["project_owner","project_admin","project_member","board_admin","board_member"])
+def board_events_stream(board_id):
+    """
+    Server-Sent Events stream of mutations on a board.
+
+    Call as /boards/<id>/events?project_id=<id>. Each event's id is the board
+    version it produced, usable as `since` on /get-board-lists; on "resync"
+    the client should catch up that way. Each worker holds at most
+    SSE_MAX_STREAMS streams; past that it answers 503 with Retry-After.
+    """
+    project_id = request.args.get("project_id", type=int)
+    if not board_in_project(board_id, project_id):
+        return jsonify({"error": "Board not found"}), 404
+
+    subscriber = board_events.subscribe(board_id, limit=SSE_MAX_STREAMS)
+    if subscriber is None:
+        return jsonify({"error": "Too many open event streams, try again later"}), 503, {
+            "Retry-After": str(SSE_RETRY_AFTER_SECONDS)
+        }
+    cursor = get_board_version(board_id)
+
+    def stream():
+        try:
+            yield _sse("ready", {"board_id": board_id, "cursor": cursor}, cursor)
+            while True:
+                try:
+                    message = subscriber.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(message["event"], message, message.get("version"))
+        finally:
+            board_events.unsubscribe(board_id, subscriber)
+
+    response = Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    # The generator's finally never runs if the client leaves before the
+    # first chunk; closing the response always frees the slot.
+    response.call_on_close(lambda: board_events.unsubscribe(board_id, subscriber))
+    return response
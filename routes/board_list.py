@@ -4,10 +4,13 @@ from database.board_list import (
     add_board_list,
     delete_list,
     get_lists_by_board_id,
+    move_list,
     update_list_name as update_list_name_db,
     update_list_positions,
 )
+from database.versions import get_board_version
 from middleware.auth_middleware import token_required
+from utils.etag import conditional_json, make_etag
 from middleware.role_middleware import require_roles
 bp = Blueprint("board_list", __name__)  
 
@@ -42,8 +45,18 @@ def get_board_lists():
     if not data or "board_id" not in data:
         return jsonify({"error": "board_id is required"}), 400
 
-    result, status = get_lists_by_board_id(data["board_id"])
-    return jsonify(result), status
+    board_id = data["board_id"]
+    # Pass back the "cursor" from the previous response to get only changes.
+    since = data.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except (TypeError, ValueError):
+            return jsonify({"error": "since must be an integer cursor"}), 400
+
+    version = get_board_version(board_id)
+    etag = make_etag("board", board_id, since, version) if version is not None else None
+    return conditional_json(etag, lambda: get_lists_by_board_id(board_id, since))
 
 
 @bp.route("/update-board-list-positions", methods=["POST"])
@@ -57,6 +70,22 @@ def update_board_list_positions():
     return jsonify(result), status
 
 
+@bp.route("/move-board-list", methods=["POST"])
+@token_required
+def move_board_list():
+    data = request.get_json()
+    if not data or "list_id" not in data or "new_position" not in data:
+        return jsonify({"error": "Missing 'list_id' or 'new_position'"}), 400
+    try:
+        list_id = int(data["list_id"])
+        new_position = int(data["new_position"])
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid integer fields"}), 400
+
+    result, status = move_list(list_id, new_position)
+    return jsonify(result), status
+
+
 @bp.route("/update-list-name", methods=["POST"])
 @token_required
 @require_roles(["project_owner","project_admin","board_admin"])
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from database.boards import add_new_board , get_boards_for_project,delete_board,update_board
-from database.board_list import add_board_list
+from database.boards import BOARD_TEMPLATES, add_new_board , get_boards_for_project,delete_board,update_board
+from database.versions import get_project_boards_version
 from middleware.auth_middleware import token_required
+from utils.etag import conditional_json, make_etag
 from middleware.role_middleware import require_roles
 
 bp = Blueprint("boards", __name__) 
@@ -25,18 +26,20 @@ def create_board():
         return jsonify({"error": "Board name is required"}), 400
     if not category:
         return jsonify({"error": "category name is required"}), 400
-    result, status = add_new_board(project_id, name, position, category)
+
+    # Either an explicit list of list names or the name of a template.
+    lists = data.get("lists")
+    if lists is None:
+        template = data.get("template", "default")
+        if template not in BOARD_TEMPLATES:
+            return jsonify({"error": f"Unknown board template '{template}'"}), 400
+        lists = BOARD_TEMPLATES[template]
+    elif not isinstance(lists, list) or not all(isinstance(l, str) and l for l in lists):
+        return jsonify({"error": "lists must be a list of list names"}), 400
+
+    result, status = add_new_board(project_id, name, position, category, lists)
     if status != 201:
         return jsonify(result), status
-    board_id = result["board"]["id"]   
-    default_lists = [
-        {"name": "To Do", "position": 0},
-        {"name": "In Progress", "position": 1},
-        {"name": "Done", "position": 2}
-    ]
-
-    for lst in default_lists:
-        add_board_list(board_id, lst["name"], lst["position"])
 
     return jsonify({
         "message": "Board created successfully",
@@ -55,8 +58,10 @@ def get_boards():
     user_id = data.get("user_id")
     if not project_id and not user_id:
         return jsonify({"error": "project_id is required"}), 400
-    result, status = get_boards_for_project(project_id, user_id)
-    return jsonify(result), status
+
+    version = get_project_boards_version(project_id)
+    etag = make_etag("boards", project_id, user_id, version) if version is not None else None
+    return conditional_json(etag, lambda: get_boards_for_project(project_id, user_id))
 
 @bp.route('/delete-board', methods=['POST'])
 @token_required
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from database.card_content import add_card_content, add_comment, delete_comment, get_card_content, get_comments
+from database.versions import get_card_content_version
 from middleware.auth_middleware import token_required
+from utils.etag import conditional_json, make_etag
 
 bp = Blueprint("card_content", __name__)
 
@@ -52,8 +54,11 @@ def get_card_content_route():
         if card_id is None:
             return jsonify({"error": "card_id is required"}), 400
 
-        result, status_code = get_card_content(card_id)
-        return jsonify(result), status_code
+        # Comments come newest page first; pass "next_cursor" back as "cursor" for older ones.
+        limit, cursor = data.get("limit"), data.get("cursor")
+        version = get_card_content_version(card_id)
+        etag = make_etag("card-content", card_id, limit, cursor, version) if version is not None else None
+        return conditional_json(etag, lambda: get_card_content(card_id, limit, cursor))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -101,5 +106,5 @@ def get_comments_route():
     if not card_id:
         return jsonify({"error": "card_id is required"}), 400
 
-    response, status = get_comments(card_id)
+    response, status = get_comments(card_id, data.get("limit"), data.get("cursor"))
     return jsonify(response), status
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from database.cards import add_card_to_list, delete_card, update_card_details, update_card_positions_by_list, update_single_card_list
+from database.cards import add_card_to_list, delete_card, update_card_details, update_card_positions, update_card_positions_by_list, update_single_card_list
 from middleware.auth_middleware import token_required
 from middleware.role_middleware import require_roles
 
@@ -37,6 +37,23 @@ def reorder_cards():
     if not data:
         return jsonify({"error": "Missing JSON body"}), 400
 
+    # Cross-list reorders send {"lists": [{"list_id": ..., "cards": [...]}, ...]}
+    lists = data.get("lists")
+    if lists is not None:
+        if not isinstance(lists, list) or not all(
+            isinstance(entry, dict) and entry.get("list_id") is not None and isinstance(entry.get("cards"), list)
+            for entry in lists
+        ):
+            return jsonify({"error": "'lists' must be a list of {list_id, cards}"}), 400
+        try:
+            lists = [
+                {"list_id": int(entry["list_id"]), "cards": [{"id": int(card["id"])} for card in entry["cards"]]}
+                for entry in lists
+            ]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": "Invalid integer fields"}), 400
+        return update_card_positions(lists)
+
     list_id = data.get("list_id")
     cards = data.get("cards")
 
@@ -44,6 +61,11 @@ def reorder_cards():
         return jsonify({"error": "Missing 'list_id'"}), 400
     if not isinstance(cards, list):
         return jsonify({"error": "'cards' must be a list"}), 400
+    try:
+        list_id = int(list_id)
+        cards = [{"id": int(card["id"])} for card in cards]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Invalid integer fields"}), 400
     return update_card_positions_by_list(list_id, cards)
 
 @bp.route('/move-card-to-new-list', methods=['POST'])
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from database.projects import add_new_project, get_all_project_for_user,delete_project ,update_project
+from database.versions import get_user_projects_version
 from middleware.auth_middleware import token_required
+from utils.etag import conditional_json, make_etag
 from time import sleep
 from middleware.role_middleware import require_roles
 
@@ -40,12 +42,15 @@ def get_projects():
     if not user_id:
         return jsonify({"error": "Missing owner_id"}), 400
 
-    projects, status = get_all_project_for_user(user_id)
+    def read():
+        projects, status = get_all_project_for_user(user_id)
+        if isinstance(projects, dict) and "error" in projects:
+            return projects, 400
+        return projects, status
 
-    if isinstance(projects, dict) and "error" in projects:
-        return jsonify(projects), 400
-
-    return jsonify(projects), status
+    version = get_user_projects_version(user_id)
+    etag = make_etag("projects", user_id, version) if version is not None else None
+    return conditional_json(etag, read)
 
 @bp.route('/update-project', methods=['PUT'])
 @require_roles(["project_owner"])
@@ -0,0 +1,24 @@
+import routes.board_events
+from main import app
+from utils.jwt_helper import create_jwt_token
+
+
+def test_streams_past_the_cap_get_503(monkeypatch, user, project, board):
+    monkeypatch.setattr(routes.board_events, "SSE_MAX_STREAMS", 1)
+    token = create_jwt_token({"id": user, "email": "test@example.com", "type": "access"}, 60)
+    client = app.test_client()
+    client.set_cookie("access_token", token)
+    path = f"/boards/{board}/events?project_id={project}"
+
+    first = client.get(path, buffered=False)
+    assert first.status_code == 200
+    assert next(first.response).startswith(b"event: ready")
+
+    second = client.get(path)
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == str(routes.board_events.SSE_RETRY_AFTER_SECONDS)
+
+    first.close()
+    third = client.get(path, buffered=False)
+    assert third.status_code == 200
+    third.close()
@@ -0,0 +1,17 @@
+from database.boards import DEFAULT_BOARD_TEMPLATES, load_board_templates
+
+
+def test_extra_templates_are_added():
+    templates = load_board_templates('{"bugs": ["Reported", "Fixing", "Fixed"]}')
+    assert templates == {**DEFAULT_BOARD_TEMPLATES, "bugs": ["Reported", "Fixing", "Fixed"]}
+
+
+def test_unset_value_gives_the_built_in_templates():
+    assert load_board_templates(None) == DEFAULT_BOARD_TEMPLATES
+    assert load_board_templates("") == DEFAULT_BOARD_TEMPLATES
+
+
+def test_invalid_values_fall_back_to_the_built_in_templates(capsys):
+    for raw in ('{"bugs": [', '["a", "b"]', '{"bugs": "Reported"}', '{"bugs": [1, 2]}', "null"):
+        assert load_board_templates(raw) == DEFAULT_BOARD_TEMPLATES
+        assert "BOARD_TEMPLATES" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+import pytest
+
+from database import board_list, cards
+from database.config import db_transaction
+from main import app
+from utils.jwt_helper import create_jwt_token
+
+
+@pytest.fixture
+def lists(board, user):
+    """Three lists on the board with two cards each: {list_id: [card_id, card_id]}."""
+    created = {}
+    for name in ("a", "b", "c"):
+        list_id = board_list.add_board_list(board, name)[0]["list"]["id"]
+        created[list_id] = [cards.add_card_to_list(list_id, f"{name}{i}", user, "low")[0]["card"]["id"] for i in range(2)]
+    return created
+
+
+def _layout(list_ids):
+    with db_transaction(readonly=True) as cur:
+        cur.execute("SELECT id, list_id FROM cards WHERE list_id = ANY(%s) ORDER BY list_id, rank, id", (list_ids,))
+        return [(row["list_id"], row["id"]) for row in cur.fetchall()]
+
+
+def test_reorder_moves_cards_between_the_given_lists(lists):
+    (a, a_cards), (b, b_cards), _ = lists.items()
+    body, status = cards.update_card_positions([
+        {"list_id": a, "cards": [{"id": a_cards[1]}, {"id": b_cards[0]}, {"id": a_cards[0]}]},
+        {"list_id": b, "cards": [{"id": b_cards[1]}]},
+    ])
+    assert status == 200 and body["updated"] == 4
+    assert _layout([a, b]) == [(a, a_cards[1]), (a, b_cards[0]), (a, a_cards[0]), (b, b_cards[1])]
+
+
+def test_cards_outside_the_given_lists_are_rejected(lists):
+    (a, a_cards), _, (c, c_cards) = lists.items()
+    before = _layout(list(lists))
+
+    body, status = cards.update_card_positions([{"list_id": a, "cards": [{"id": c_cards[0]}, {"id": a_cards[0]}]}])
+    assert status == 400 and body["card_ids"] == [c_cards[0]]
+
+    body, status = cards.update_card_positions([{"list_id": a, "cards": [{"id": a_cards[0]}, {"id": -1}]}])
+    assert status == 404 and body["card_ids"] == [-1]
+
+    body, status = cards.update_card_positions([{"list_id": -1, "cards": [{"id": a_cards[0]}]}])
+    assert status == 404 and body["list_ids"] == [-1]
+
+    assert _layout(list(lists)) == before
+
+
+def test_cards_on_another_board_are_rejected(lists, project, user):
+    with db_transaction() as cur:
+        cur.execute("INSERT INTO boards (project_id, name) VALUES (%s, 'Other board') RETURNING id", (project,))
+        other_board = cur.fetchone()["id"]
+    other_list = board_list.add_board_list(other_board, "x")[0]["list"]["id"]
+    other_card = cards.add_card_to_list(other_list, "x", user, "low")[0]["card"]["id"]
+    a, a_cards = next(iter(lists.items()))
+
+    body, status = cards.update_card_positions([{"list_id": a, "cards": [{"id": other_card}]}])
+    assert status == 404 and body["card_ids"] == [other_card]
+
+    body, status = cards.update_card_positions([{"list_id": a, "cards": [{"id": a_cards[0]}]},
+                                                {"list_id": other_list, "cards": []}])
+    assert status == 400
+
+
+def test_route_casts_ids(lists, user):
+    (a, a_cards), *_ = lists.items()
+    client = app.test_client()
+    client.set_cookie("access_token", create_jwt_token({"id": user, "email": "test@example.com", "type": "access"}, 60))
+
+    response = client.post("/update-cards-list", json={"list_id": str(a), "cards": [{"id": str(a_cards[1])}, {"id": a_cards[0]}]})
+    assert response.status_code == 200
+    assert _layout([a]) == [(a, a_cards[1]), (a, a_cards[0])]
+
+    response = client.post("/update-cards-list", json={"lists": [{"list_id": a, "cards": [{"id": "x"}]}]})
+    assert response.status_code == 400
@@ -0,0 +1,57 @@
+import pytest
+import psycopg2
+
+from database import board_list, cards
+from database.card_content import get_card_content, get_comments
+from database.config import db_transaction
+
+
+@pytest.fixture
+def card(board, user):
+    created, _ = board_list.add_board_list(board, "List")
+    created, _ = cards.add_card_to_list(created["list"]["id"], "Card", user, "low")
+    return created["card"]["id"]
+
+
+def _add_comments(card_id, user_id, count):
+    # Same timestamp for all of them, so pages have to break ties on id.
+    with db_transaction() as cur:
+        cur.execute("""
+            INSERT INTO card_comments (card_id, user_id, comment, created_at)
+            SELECT %s, %s, 'comment ' || i, '2026-01-01 12:00'
+            FROM generate_series(1, %s) AS i
+            RETURNING id
+        """, (card_id, user_id, count))
+        return [row["id"] for row in cur.fetchall()]
+
+
+def test_walking_pages_returns_every_comment_once(card, user):
+    ids = _add_comments(card, user, 7)
+
+    pages, cursor = [], None
+    while True:
+        body, status = get_comments(card, limit=3, cursor=cursor)
+        assert status == 200 and body["total"] == 7
+        pages.append([c["id"] for c in body["comments"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == [ids[4:], ids[1:4], ids[:1]]
+
+
+def test_comment_fields(card, user):
+    _add_comments(card, user, 1)
+
+    body, _ = get_comments(card)
+    assert set(body["comments"][0]) == {"id", "card_id", "user_id", "comment", "created_at"}
+
+    body, _ = get_card_content(card)
+    assert body["comments"][0]["user_name"] == "Test User"
+
+
+def test_comments_always_have_a_created_at(card, user):
+    with pytest.raises(psycopg2.IntegrityError):
+        with db_transaction() as cur:
+            cur.execute("INSERT INTO card_comments (card_id, user_id, comment, created_at) VALUES (%s, %s, 'x', NULL)",
+                        (card, user))
@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
+
+from database import board_list, cards
+from database.config import db_transaction
+
+WORKERS = 8
+
+
+def _ranks(table, parent_column, parent_id):
+    with db_transaction(readonly=True) as cur:
+        cur.execute(f"SELECT id, rank FROM {table} WHERE {parent_column} = %s ORDER BY rank, id", (parent_id,))
+        return cur.fetchall()
+
+
+def _run_parallel(calls):
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        results = [f.result() for f in [executor.submit(fn, *args) for fn, *args in calls]]
+    for body, status in results:
+        assert status in (200, 201), body
+    return results
+
+
+def test_parallel_list_appends_and_moves(board):
+    for i in range(5):
+        board_list.add_board_list(board, f"seed {i}")
+    seeded = [row["id"] for row in _ranks("lists", "board_id", board)]
+
+    rng = random.Random(1)
+    appends = [(board_list.add_board_list, board, f"list {i}") for i in range(40)]
+    moves = [(board_list.move_list, rng.choice(seeded), rng.randrange(0, 10)) for _ in range(40)]
+    reorders = [(board_list.update_list_positions, [{"id": list_id, "position": rng.randrange(0, 50)}]) for list_id in seeded[:2]]
+    calls = appends + moves + reorders
+    rng.shuffle(calls)
+
+    results = _run_parallel(calls)
+
+    appended = sorted(body["list"]["position"] for body, status in results if status == 201)
+    assert appended == list(range(5, 45))
+
+    ranks = [row["rank"] for row in _ranks("lists", "board_id", board)]
+    assert len(ranks) == 45
+    assert len(set(ranks)) == len(ranks)
+
+    body, _ = board_list.get_lists_by_board_id(board)
+    assert [l["position"] for l in body["lists"]] == list(range(45))
+
+
+def test_parallel_card_appends_and_moves(board, user):
+    (first, _), (second, _) = board_list.add_board_list(board, "a"), board_list.add_board_list(board, "b")
+    list_ids = [first["list"]["id"], second["list"]["id"]]
+    for i in range(5):
+        cards.add_card_to_list(list_ids[0], f"seed {i}", user, "low")
+    seeded = [row["id"] for row in _ranks("cards", "list_id", list_ids[0])]
+
+    rng = random.Random(2)
+    appends = [(cards.add_card_to_list, list_ids[1], f"card {i}", user, "low") for i in range(40)]
+    moves = [(cards.update_single_card_list, card_id, list_ids[1], rng.randrange(0, 10)) for card_id in seeded]
+    calls = appends + moves
+    rng.shuffle(calls)
+
+    _run_parallel(calls)
+
+    ranks = [row["rank"] for row in _ranks("cards", "list_id", list_ids[1])]
+    assert len(ranks) == 45
+    assert len(set(ranks)) == len(ranks)
+
+    body, _ = board_list.get_lists_by_board_id(board)
+    target = next(l for l in body["lists"] if l["id"] == list_ids[1])
+    assert sorted(c["position"] for c in target["cards"]) == list(range(45))
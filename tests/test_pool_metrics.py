@@ -0,0 +1,20 @@
+import importlib, sys
+
+
+def _app(monkeypatch, enabled):
+    if enabled is None:
+        monkeypatch.delenv("POOL_METRICS_ENABLED", raising=False)
+    else:
+        monkeypatch.setenv("POOL_METRICS_ENABLED", enabled)
+    sys.modules.pop("main", None)
+    return importlib.import_module("main").app
+
+
+def test_pool_metrics_route_is_off_by_default(monkeypatch):
+    app = _app(monkeypatch, None)
+    assert app.test_client().get("/pool-metrics").status_code == 404
+
+
+def test_pool_metrics_route_needs_the_flag_and_a_token(monkeypatch):
+    app = _app(monkeypatch, "1")
+    assert app.test_client().get("/pool-metrics").status_code == 401
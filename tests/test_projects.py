@@ -0,0 +1,109 @@
+from database.config import db_transaction
+from database.projects import get_all_project_for_user
+
+
+def _baseline_projects_for_user(user_id):
+    """The per-project loader get_all_project_for_user replaced, kept as the reference output."""
+    with db_transaction(readonly=True) as cur:
+        cur.execute("""
+        SELECT 
+            p.id, p.name, p.description, p.category, p.owner_id, p.created_at,
+            u.full_name AS owner_name,
+            u.email AS owner_email,
+            COUNT(DISTINCT b.id) AS boards_count,
+            (COUNT(DISTINCT pm_all.user_id) + 1) AS members_count,
+            CASE
+                WHEN p.owner_id = %s THEN ro.id
+                WHEN pm_user.role_id IS NOT NULL THEN pm_user.role_id
+                WHEN bm_user.role_id IS NOT NULL THEN bm_user.role_id
+                ELSE NULL
+            END AS project_role_id,
+            CASE
+                WHEN p.owner_id = %s THEN ro.name
+                WHEN pm_user.role_id IS NOT NULL THEN r.name
+                WHEN bm_user.role_id IS NOT NULL THEN br.name
+                ELSE NULL
+            END AS role_name
+        FROM projects p
+        JOIN users u ON u.id = p.owner_id
+        LEFT JOIN boards b ON b.project_id = p.id
+        LEFT JOIN project_memberships pm_all ON pm_all.project_id = p.id
+        LEFT JOIN project_memberships pm_user ON pm_user.project_id = p.id AND pm_user.user_id = %s
+        LEFT JOIN roles r ON r.id = pm_user.role_id
+        LEFT JOIN roles ro ON ro.name = 'project_owner'
+        LEFT JOIN board_memberships bm_user ON bm_user.user_id = %s
+        LEFT JOIN boards b2 ON b2.id = bm_user.board_id AND b2.project_id = p.id
+        LEFT JOIN roles br ON br.id = bm_user.role_id
+        WHERE p.owner_id = %s OR pm_user.user_id = %s OR b2.id IS NOT NULL
+        GROUP BY p.id, u.full_name, u.email, pm_user.role_id, r.name, ro.id, ro.name, bm_user.role_id, br.name
+        ORDER BY p.created_at DESC;
+        """, (user_id,) * 6)
+        projects = [dict(row) for row in cur.fetchall()]
+
+        for project in projects:
+            cur.execute("""
+                SELECT u.id AS user_id, u.email, u.full_name, pm.role_id, r.name AS role_name
+                FROM project_memberships pm
+                JOIN users u ON u.id = pm.user_id
+                LEFT JOIN roles r ON r.id = pm.role_id
+                WHERE pm.project_id = %s;
+            """, (project["id"],))
+            members = cur.fetchall()
+            cur.execute("""
+                SELECT u.id AS user_id, u.email, u.full_name, ro.id AS role_id, ro.name AS role_name
+                FROM users u
+                LEFT JOIN roles ro ON ro.name = 'project_owner'
+                WHERE u.id = %s;
+            """, (project["owner_id"],))
+            owner = cur.fetchone()
+            if owner and owner["user_id"] not in [m["user_id"] for m in members]:
+                members.insert(0, owner)
+            project["members"] = members
+
+    return projects
+
+
+def _normalise(projects):
+    return [{**p, "members": [dict(m) for m in p["members"]]} for p in projects]
+
+
+def _role_id(name):
+    with db_transaction(readonly=True) as cur:
+        cur.execute("SELECT id FROM roles WHERE name = %s", (name,))
+        return cur.fetchone()["id"]
+
+
+def test_projects_match_baseline_loader(make_user):
+    owner, member, board_member, outsider = (make_user(f"User {i}") for i in range(4))
+    with db_transaction() as cur:
+        project_ids = []
+        for name in ("First", "Second", "Third"):
+            cur.execute("""
+                INSERT INTO projects (name, description, category, owner_id, created_at)
+                VALUES (%s, 'd', 'c', %s, now() - %s * interval '1 minute')
+                RETURNING id
+            """, (name, owner, len(project_ids)))
+            project_ids.append(cur.fetchone()["id"])
+        board_ids = []
+        for project_id in project_ids[:2]:
+            for i in range(2):
+                cur.execute("INSERT INTO boards (project_id, name, position) VALUES (%s, %s, %s) RETURNING id",
+                            (project_id, f"B{i}", i))
+                board_ids.append(cur.fetchone()["id"])
+        cur.execute("INSERT INTO project_memberships (project_id, user_id, role_id) VALUES (%s, %s, %s), (%s, %s, %s)",
+                    (project_ids[0], member, _role_id("project_admin"),
+                     project_ids[2], member, _role_id("project_member")))
+        cur.execute("INSERT INTO board_memberships (board_id, user_id, role_id) VALUES (%s, %s, %s)",
+                    (board_ids[2], board_member, _role_id("board_member")))
+
+    for user_id in (owner, member, board_member, outsider):
+        projects, status = get_all_project_for_user(user_id)
+        assert status == 200
+        assert _normalise(projects) == _normalise(_baseline_projects_for_user(user_id))
+
+    projects, _ = get_all_project_for_user(owner)
+    assert [p["id"] for p in projects] == project_ids
+    assert set(projects[0]) == {
+        "id", "name", "description", "category", "owner_id", "created_at", "owner_name", "owner_email",
+        "boards_count", "members_count", "project_role_id", "role_name", "members",
+    }
@@ -0,0 +1,51 @@
+import json, time
+
+from database.config import db_transaction
+from utils import role_cache
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_invalidation_from_another_worker_reaches_this_one(db):
+    role_cache.get_cached_role(1, 1)
+    assert _wait_for(lambda: role_cache.role_invalidations.connected)
+
+    role_cache.cache_role(101, 201, "project_admin", role_cache.role_generation())
+    role_cache.cache_role(101, 202, "project_admin", role_cache.role_generation())
+    role_cache.cache_role(102, 201, "project_member", role_cache.role_generation())
+    assert role_cache.get_cached_role(101, 201) == "project_admin"
+
+    # What invalidate_roles() in another process sends; nothing is dropped locally.
+    with db_transaction() as cur:
+        cur.execute("SELECT pg_notify(%s, %s)", (role_cache.ROLE_INVALIDATION_CHANNEL,
+                                                 json.dumps({"user_id": 101, "project_id": None})))
+
+    assert _wait_for(lambda: role_cache.get_cached_role(101, 201) is None)
+    assert role_cache.get_cached_role(101, 202) is None
+    assert role_cache.get_cached_role(102, 201) == "project_member"
+
+
+def test_cache_is_bypassed_while_the_listener_is_down(db, monkeypatch):
+    role_cache.cache_role(103, 203, "project_owner", role_cache.role_generation())
+    monkeypatch.setattr(role_cache.role_invalidations, "connected", False)
+    assert role_cache.get_cached_role(103, 203) is None
+
+
+def test_a_read_that_raced_an_invalidation_is_not_cached(db, monkeypatch):
+    monkeypatch.setattr(role_cache.role_invalidations, "connected", True)
+    generation = role_cache.role_generation()
+    # The revoke commits and invalidates while the old role is being read...
+    role_cache.invalidate_roles(104, 204)
+    # ...so the stale read must not land in the cache afterwards.
+    role_cache.cache_role(104, 204, "project_admin", generation)
+    assert role_cache.get_cached_role(104, 204) is None
+
+    role_cache.cache_role(104, 204, "project_member", role_cache.role_generation())
+    assert role_cache.get_cached_role(104, 204) == "project_member"
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
+
+from database import board_list, card_content, card_membership, cards
+
+WORKERS = 8
+
+
+def _run_parallel(calls):
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        return [f.result() for f in [executor.submit(fn, *args) for fn, *args in calls]]
+
+
+def _deadlocks(results):
+    return [body for body, _ in results if "deadlock" in str(body.get("error", ""))]
+
+
+def test_parallel_edits_of_one_card(board, user):
+    (first, _), (second, _) = board_list.add_board_list(board, "a"), board_list.add_board_list(board, "b")
+    list_ids = [first["list"]["id"], second["list"]["id"]]
+    created, _ = cards.add_card_to_list(list_ids[0], "card", user, "low")
+    card_id = created["card"]["id"]
+
+    rng = random.Random(3)
+    calls = []
+    for i in range(60):
+        calls += [
+            (cards.update_card_details, card_id, f"title {i}"),
+            (cards.update_single_card_list, card_id, rng.choice(list_ids), rng.randrange(0, 3)),
+            (cards.update_card_positions, [{"list_id": list_ids[0], "cards": [{"id": card_id}]},
+                                           {"list_id": list_ids[1], "cards": []}]),
+            (card_content.add_card_content, card_id, f"<p>{i}</p>"),
+            (board_list.update_list_name, rng.choice(list_ids), f"list {i}"),
+            (board_list.move_list, rng.choice(list_ids), rng.randrange(0, 2)),
+        ]
+    rng.shuffle(calls)
+
+    results = _run_parallel(calls)
+
+    assert _deadlocks(results) == []
+    for body, status in results:
+        assert status in (200, 201), body
+
+
+def test_edits_racing_deletes(board, user, make_user):
+    assignees = [make_user() for _ in range(4)]
+    rng = random.Random(4)
+    results = []
+    for round in range(10):
+        created, _ = board_list.add_board_list(board, f"doomed {round}")
+        list_id = created["list"]["id"]
+        card_ids = [cards.add_card_to_list(list_id, f"card {i}", user, "low")[0]["card"]["id"] for i in range(3)]
+
+        calls = [(board_list.update_list_name, list_id, f"renamed {i}") for i in range(6)]
+        calls += [(cards.update_card_details, rng.choice(card_ids), f"title {i}") for i in range(6)]
+        calls += [(card_membership.add_card_membership_db, card_id, assignee)
+                  for card_id in card_ids for assignee in assignees]
+        calls += [(cards.delete_card, card_id) for card_id in card_ids]
+        calls += [(board_list.delete_list, list_id)]
+        rng.shuffle(calls)
+        results += _run_parallel(calls)
+
+    assert _deadlocks(results) == []
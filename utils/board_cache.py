@@ -0,0 +1,64 @@
+import os, pickle
+from utils.cache import TTLCache
+
+# (board_id, version) -> the payload built by get_lists_by_board_id. A new
+# version means a new key, so writes never have to delete anything here; old
+# versions just fall out of the LRU. The TTL only bounds staleness for data
+# that is shown on the board but not versioned (e.g. a user's name).
+board_cache = TTLCache(
+    maxsize=int(os.getenv("BOARD_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("BOARD_CACHE_TTL", "300")),
+)
+
+
+class RedisBoardCache:
+    """Shared backend so every worker can reuse a snapshot built by one of them."""
+
+    def __init__(self, url: str, ttl: float):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+
+    def get(self, key):
+        try:
+            raw = self._client.get(f"board:{key[0]}:{key[1]}")
+        except Exception as e:
+            print(f"❌ Board cache read failed: {e}")
+            return None
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        try:
+            self._client.set(f"board:{key[0]}:{key[1]}", pickle.dumps(value), ex=self.ttl)
+        except Exception as e:
+            print(f"❌ Board cache write failed: {e}")
+
+
+_shared_backend = None
+
+
+def set_shared_backend(backend):
+    """Plug in a shared cache; it needs get(key) and set(key, value)."""
+    global _shared_backend
+    _shared_backend = backend
+
+
+if os.getenv("BOARD_CACHE_REDIS_URL"):
+    set_shared_backend(RedisBoardCache(os.getenv("BOARD_CACHE_REDIS_URL"), board_cache.ttl))
+
+
+def get_board_snapshot(board_id: int, version: int):
+    key = (int(board_id), int(version))
+    snapshot = board_cache.get(key)
+    if snapshot is None and _shared_backend is not None:
+        snapshot = _shared_backend.get(key)
+        if snapshot is not None:
+            board_cache.set(key, snapshot)
+    return snapshot
+
+
+def cache_board_snapshot(board_id: int, version: int, snapshot: dict):
+    key = (int(board_id), int(version))
+    board_cache.set(key, snapshot)
+    if _shared_backend is not None:
+        _shared_backend.set(key, snapshot)
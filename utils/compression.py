@@ -0,0 +1,117 @@
+import gzip, os
+from flask import current_app, request
+from utils.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# gzip / brotli response compression.
+#
+# Responses with an allowlisted content type and at least COMPRESS_MIN_SIZE
+# bytes are compressed with the best encoding the client accepts (br when the
+# brotli package is installed, otherwise gzip). Responses that carry an ETag
+# are versioned, so their compressed bytes are cached per (etag, encoding)
+# and a repeat read of an unchanged board skips both the JSON encoding and
+# the compression.
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_MIMETYPES = set(os.getenv("COMPRESS_MIMETYPES", "application/json,text/html,text/plain").split(","))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+
+# (etag, encoding) -> compressed body; TTL bounded like the board snapshot cache.
+compressed_cache = TTLCache(
+    maxsize=int(os.getenv("COMPRESS_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("COMPRESS_CACHE_TTL", "300")),
+)
+
+
+def choose_encoding(accept_encoding: str):
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    def ok(name):
+        return accepted.get(name, accepted.get("*", 0)) > 0
+
+    if brotli is not None and ok("br"):
+        return "br"
+    if ok("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def weak_etag(etag: str) -> str:
+    # The compressed bytes differ from the identity ones, so the tag becomes
+    # weak; if_none_match() accepts it back for a 304.
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def compressible(mimetype: str, size: int) -> bool:
+    return mimetype in COMPRESS_MIMETYPES and size >= COMPRESS_MIN_SIZE
+
+
+def cached_compressed(etag: str, encoding: str):
+    if etag is None or encoding is None:
+        return None
+    return compressed_cache.get((etag, encoding))
+
+
+def compress_and_cache(body: bytes, encoding: str, etag: str = None) -> bytes:
+    data = compress(body, encoding)
+    if etag is not None:
+        compressed_cache.set((etag, encoding), data)
+    return data
+
+
+def compressed_response_from_cache(etag: str):
+    """A ready response for `etag` if its compressed body is cached, else None."""
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+    data = cached_compressed(etag, encoding)
+    if data is None:
+        return None
+    response = current_app.response_class(data, mimetype="application/json")
+    response.headers["Content-Encoding"] = encoding
+    response.headers["ETag"] = weak_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_compression(app):
+    @app.after_request
+    def compress_response(response):
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if response.mimetype not in COMPRESS_MIMETYPES:
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        if "Content-Encoding" in response.headers or not compressible(response.mimetype, response.content_length or 0):
+            return response
+
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            return response
+
+        etag = response.headers.get("ETag") if response.status_code == 200 else None
+        response.set_data(compress_and_cache(response.get_data(), encoding, etag))
+        response.headers["Content-Encoding"] = encoding
+        if etag is not None:
+            response.headers["ETag"] = weak_etag(etag)
+        return response
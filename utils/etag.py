@@ -0,0 +1,56 @@
+import hashlib, json
+from flask import request, jsonify, make_response
+from utils.compression import compressed_response_from_cache
+
+# Conditional reads for the POST read endpoints.
+#
+# Successful reads carry an ETag header. A client that sends it back in
+# If-None-Match (on the same POST, same body) gets an empty 304 when nothing
+# changed. The tag is derived from a cheap version probe, so the 304 is
+# answered before the full read runs. POST is used only because the read
+# endpoints already take their arguments as JSON bodies.
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the request arguments and the entity's version."""
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(etag: str) -> bool:
+    return if_none_match(request.headers.get("If-None-Match"), etag)
+
+
+def if_none_match(header: str, etag: str) -> bool:
+    """True when an If-None-Match header value covers `etag`."""
+    if not header or etag is None:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def conditional_json(etag, read):
+    """
+    Answer 304 if the client already has `etag`, otherwise run `read()`.
+
+    `read` returns the usual (payload, status) pair; the ETag is only attached
+    to successful responses. Pass etag=None to skip the check (e.g. when the
+    version probe failed).
+    """
+    if etag_matches(etag):
+        response = make_response("", 304)
+        response.headers["ETag"] = etag
+        return response
+
+    # An unchanged entity whose compressed body is cached needs no read at all.
+    cached = compressed_response_from_cache(etag)
+    if cached is not None:
+        return cached
+
+    result, status = read()
+    response = make_response(jsonify(result), status)
+    if etag is not None and status == 200:
+        response.headers["ETag"] = etag
+    return response
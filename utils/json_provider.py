@@ -0,0 +1,86 @@
+import os
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Response encoding for jsonify() and the ASGI routes.
+#
+# JSON_ENCODER: "orjson" (used by default when installed) or "std" for the
+# stdlib encoder Flask ships with. Both produce the same JSON.
+# JSON_DATETIME_FORMAT: "http" keeps Flask's RFC 822 dates
+# ("Sun, 18 Oct 2026 03:47:00 GMT"); "iso" emits ISO 8601, which orjson
+# writes natively and is the cheapest option.
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson" if orjson else "std").lower()
+JSON_DATETIME_FORMAT = os.getenv("JSON_DATETIME_FORMAT", "http").lower()
+
+_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def http_date(value) -> str:
+    """Same output as werkzeug.http.http_date, without its per-call overhead."""
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return (f"{_DAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} "
+            f"{value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT")
+
+
+def _default(o):
+    if isinstance(o, date):
+        return o.isoformat() if JSON_DATETIME_FORMAT == "iso" else http_date(o)
+    if isinstance(o, Decimal):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider with the configurable datetime format."""
+
+    default = staticmethod(_default)
+
+    def encode(self, obj) -> bytes:
+        """Compact response body, byte-for-byte what jsonify(obj) sends."""
+        return (self.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    orjson-backed provider. Rows from RealDictCursor are dict subclasses and
+    are encoded directly, without the copies the stdlib encoder makes.
+    """
+
+    def _options(self) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if JSON_DATETIME_FORMAT != "iso":
+            options |= orjson.OPT_PASSTHROUGH_DATETIME
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def encode(self, obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+
+
+def install_json_provider(app):
+    if JSON_ENCODER == "orjson" and orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = JSONProvider(app)
+    print(f"✅ JSON responses encoded with {type(app.json).__name__}")
@@ -1,11 +1,22 @@
 # utils/jwt_helper.py
 import jwt
 from datetime import datetime, timedelta, timezone
-import os
+from utils.cache import TTLCache
+import hashlib, os, time
 
 SECRET_KEY = os.getenv("JWT_SECRET", "secret")
 ALGORITHM = "HS256"
 
+# sha256(token) -> verified claims, kept until the token's own `exp`, so a
+# token is HMAC-checked and parsed once per worker rather than on every
+# request. Tokens known to be expired are remembered too (for JWT_CACHE_TTL),
+# since clients keep sending a stale 20 s access token next to the refresh one.
+verified_tokens = TTLCache(
+    maxsize=int(os.getenv("JWT_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("JWT_CACHE_TTL", "300")),
+)
+_EXPIRED = object()
+
 def create_jwt_token(payload: dict, expires_in_seconds: int = 15 * 60) -> str:
     now = datetime.now(timezone.utc)
     exp = now + timedelta(seconds=expires_in_seconds)
@@ -15,9 +26,30 @@ def create_jwt_token(payload: dict, expires_in_seconds: int = 15 * 60) -> str:
     token = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
     return token.decode() if isinstance(token, bytes) else token
 
+def decode_jwt_token(token: str) -> dict:
+    """
+    jwt.decode() with the verified-token cache in front of it. Raises the same
+    jwt exceptions; invalid tokens are never cached.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    claims = verified_tokens.get(key)
+    if claims is _EXPIRED:
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    if claims is None:
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            # Only raised once the signature has checked out.
+            verified_tokens.set(key, _EXPIRED)
+            raise
+        ttl = claims["exp"] - time.time() if "exp" in claims else None
+        if ttl is None or ttl > 0:
+            verified_tokens.set(key, claims, ttl=ttl)
+    return dict(claims)
+
 def verify_jwt_token(token, is_refresh=False):
     try:
-        decoded = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        decoded = decode_jwt_token(token)
         if is_refresh and decoded.get("type") != "refresh":
             return {"error": "Invalid refresh token type"}
         return decoded
@@ -25,4 +57,3 @@ def verify_jwt_token(token, is_refresh=False):
         return {"error": "Token expired"}
     except jwt.InvalidTokenError:
         return {"error": "Invalid token"}
-
@@ -0,0 +1,137 @@
+from database.config import db_connect_kwargs, db_transaction
+from utils.cache import TTLCache
+import psycopg2, psycopg2.extensions
+import json, os, select, threading, time
+
+# (user_id, project_id) -> role_name, as resolved by get_user_role_name_db.
+#
+# Every gunicorn worker has its own cache, so invalidate_roles() also sends a
+# NOTIFY on ROLE_INVALIDATION_CHANNEL that each worker's listener applies to
+# its copy. While a worker's listener is not connected it could miss one, so
+# lookups bypass the cache until it is back (and the cache is flushed on
+# reconnect). ROLE_CACHE_TTL only bounds staleness if a NOTIFY is lost in
+# between, e.g. a write committed but its notification failed to send.
+#
+# A lookup that read the database before a revoke committed must not put the
+# old role back after the invalidation ran, so every invalidation bumps a
+# generation counter and cache_role() only stores a role read under the
+# current one.
+ROLE_INVALIDATION_CHANNEL = "role_invalidations"
+
+role_cache = TTLCache(
+    maxsize=int(os.getenv("ROLE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ROLE_CACHE_TTL", "60")),
+)
+
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+class RoleInvalidationListener:
+    """Per-worker LISTEN connection applying other workers' role invalidations."""
+
+    def __init__(self, channel: str = ROLE_INVALIDATION_CHANNEL):
+        self.channel = channel
+        self.connected = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # Started lazily so it runs in the worker process, not the gunicorn master.
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._listen, name="role-invalidations", daemon=True)
+                    self._thread.start()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**db_connect_kwargs())
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                # Anything invalidated while we were not listening is unknown.
+                _drop_local()
+                self.connected = True
+                backoff = 1
+
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            message = json.loads(notify.payload)
+                        except ValueError:
+                            continue
+                        _drop_local(message.get("user_id"), message.get("project_id"))
+
+            except Exception as e:
+                self.connected = False
+                print(f"❌ Role invalidation listener failed, reconnecting in {backoff}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+role_invalidations = RoleInvalidationListener()
+
+
+def get_cached_role(user_id: int, project_id: int):
+    role_invalidations.ensure_started()
+    if not role_invalidations.connected:
+        return None
+    return role_cache.get((int(user_id), int(project_id)))
+
+
+def role_generation() -> int:
+    """Read before looking a role up in the database; pass it to cache_role()."""
+    return _generation
+
+
+def cache_role(user_id: int, project_id: int, role_name: str, generation: int):
+    """Cache a role read from the database, unless an invalidation ran since `generation`."""
+    with _generation_lock:
+        if generation == _generation:
+            role_cache.set((int(user_id), int(project_id)), role_name)
+
+
+def _drop_local(user_id: int = None, project_id: int = None):
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        if user_id is not None and project_id is not None:
+            role_cache.delete((int(user_id), int(project_id)))
+        elif user_id is not None:
+            role_cache.delete_where(lambda key: key[0] == int(user_id))
+        elif project_id is not None:
+            role_cache.delete_where(lambda key: key[1] == int(project_id))
+        else:
+            role_cache.clear()
+
+
+def invalidate_roles(user_id: int = None, project_id: int = None):
+    """
+    Forget cached roles after a membership write, in every worker.
+
+    Pass both ids to drop a single entry, one of them to drop every entry for
+    that user or project, or neither to flush the whole cache.
+    """
+    _drop_local(user_id, project_id)
+    try:
+        with db_transaction() as cur:
+            cur.execute("SELECT pg_notify(%s, %s)", (ROLE_INVALIDATION_CHANNEL, json.dumps({
+                "user_id": None if user_id is None else int(user_id),
+                "project_id": None if project_id is None else int(project_id),
+            })))
+    except psycopg2.Error as e:
+        print(f"❌ Failed to broadcast role invalidation: {e}")
@@ -79,6 +79,102 @@ def H(*parts) -> int:
     return int.from_bytes(sha.digest(), "big")
 
 
+# k = H(N, g) and PAD(N) depend only on the group, so they are computed once
+# per process instead of on every login.
+PAD_N = PAD(N)
+k = H(PAD_N, PAD(g))
+
+# Optional: gmpy2 does modular exponentiation several times faster than
+# Python's built-in pow() for numbers of this size. Pure Python is used when
+# it is not installed.
+try:
+    import gmpy2
+    _mpz = gmpy2.mpz
+    _powmod = gmpy2.powmod
+except ImportError:
+    gmpy2 = None
+    _mpz = int
+    _powmod = pow
+
+_N = _mpz(N)
+
+
+def mod_pow(base: int, exponent: int) -> int:
+    """
+    Compute base^exponent mod N.
+
+    Why: The server's S = (A * v^u)^b has a different base on every login, so it
+    cannot use a precomputed table; this picks the fastest pow available.
+    """
+    return int(_powmod(_mpz(base), exponent, _N))
+
+
+# Fixed-base exponentiation for g. g never changes, so g^(d * 2^(w*i)) for
+# every w-bit digit d and window i can be tabulated once; g^b is then one
+# modular multiplication per window instead of ~256 squarings plus multiplies.
+# With w = 8 and 256-bit exponents that is 32 windows * 256 entries (~1.5 MB).
+G_WINDOW_BITS = 8
+G_EXPONENT_BITS = 256
+_g_table = None
+
+
+def _build_g_table():
+    table = []
+    base = _mpz(g)
+    for _ in range(0, G_EXPONENT_BITS, G_WINDOW_BITS):
+        row = [_mpz(1)] * (1 << G_WINDOW_BITS)
+        for digit in range(1, 1 << G_WINDOW_BITS):
+            row[digit] = (row[digit - 1] * base) % _N
+        table.append(row)
+        base = _powmod(base, 1 << G_WINDOW_BITS, _N)
+    return table
+
+
+def g_pow(exponent: int) -> int:
+    """
+    Compute g^exponent mod N using the precomputed window table.
+
+    Why: Every login computes g^b for a fresh 256-bit b; the table turns that into
+    32 multiplications. Larger exponents fall back to mod_pow.
+    """
+    global _g_table
+    if exponent < 0 or exponent.bit_length() > G_EXPONENT_BITS:
+        return mod_pow(g, exponent)
+    if _g_table is None:
+        # Built on first use (~70 ms); a concurrent first call just builds it twice.
+        _g_table = _build_g_table()
+
+    mask = (1 << G_WINDOW_BITS) - 1
+    result = _mpz(1)
+    for row in _g_table:
+        digit = exponent & mask
+        if digit:
+            result = (result * row[digit]) % _N
+        exponent >>= G_WINDOW_BITS
+    return int(result)
+
+
+def server_public_B(v: int, b: int) -> int:
+    """
+    Compute the server ephemeral B = (k*v + g^b) mod N.
+
+    Why: Kept as a plain module-level function so utils.srp_pool can run it in a
+    worker process.
+    """
+    return (k * v + g_pow(b)) % N
+
+
+def server_session_key(A: int, v: int, u: int, b: int) -> int:
+    """
+    Compute the server's K = H(S) with S = (A * v^u)^b mod N.
+
+    Why: The two exponentiations are the expensive part of verification; like
+    server_public_B this can run in a worker process.
+    """
+    Avu = (A * mod_pow(v, u)) % N
+    return H(mod_pow(Avu, b))
+
+
 def hex64_from_int(x: int) -> str:
     """
     Format an integer as a 64-hex-character lowercase string (256 bits).
@@ -93,9 +189,17 @@ def hex64_from_int(x: int) -> str:
 # Sessions expire after 300 seconds (5 minutes).
 SESSION_TIMEOUT = 300
 
-# active_sessions maps a session_id (UUID string) to a session dict that at least
-# contains 'created_at' (epoch seconds) and any state you choose to store.
-active_sessions: Dict[str, Dict] = {}
+# Handshake state between the two login steps; the backend is chosen by
+# SRP_SESSION_BACKEND (see utils.srp_sessions). Created on first use.
+_session_store = None
+
+
+def session_store():
+    global _session_store
+    if _session_store is None:
+        from utils.srp_sessions import make_session_store
+        _session_store = make_session_store(SESSION_TIMEOUT)
+    return _session_store
 
 
 def new_session(state: Dict) -> str:
@@ -104,32 +208,38 @@ def new_session(state: Dict) -> str:
 
     Why: Short-lived sessions let you carry protocol state (e.g., nonces,
     partial computations) across multiple HTTP requests safely and expire them
-    to limit replay windows and memory usage.
+    to limit replay windows and memory usage. Expired sessions are purged as
+    new ones are added.
     """
     # UUIDv4 provides a sufficiently unique, non-guessable session key for most uses.
     sid = str(uuid.uuid4())
     state["created_at"] = time.time()
-    active_sessions[sid] = state
+    session_store().add(sid, state)
     return sid
 
 
 def get_session(session_id: str) -> Optional[Dict]:
     """
-    Fetch a session by ID without removing it.
+    Fetch a live session by ID without removing it.
 
     Why: Read current state mid-protocol (e.g., to verify a step or continue the flow).
     """
-    return active_sessions.get(session_id)
+    if not session_id:
+        return None
+    return session_store().get(session_id)
 
 
 def pop_session(session_id: str) -> Optional[Dict]:
     """
-    Atomically fetch and remove a session.
+    Atomically fetch and remove a live session.
 
     Why: One-time use sessions (like single-use challenges) should be invalidated
-    as soon as they're consumed to prevent replay.
+    as soon as they're consumed to prevent replay. With a shared backend this is
+    atomic across workers too.
     """
-    return active_sessions.pop(session_id, None)
+    if not session_id:
+        return None
+    return session_store().pop(session_id)
 
 
 def clean_expired_sessions():
@@ -137,14 +247,10 @@ def clean_expired_sessions():
     Remove sessions older than SESSION_TIMEOUT.
 
     Why: Limits memory growth and reduces the attack window for replaying stale
-    protocol messages tied to old sessions.
-    """
-    now = time.time()
-    # Identify sessions whose age exceeds the timeout.
-    expired = [sid for sid, s in active_sessions.items() if now - s["created_at"] > SESSION_TIMEOUT]
-    # Delete them if present (pop with default None is safe even if already removed).
-    for sid in expired:
-        active_sessions.pop(sid, None)
+    protocol messages tied to old sessions. new_session() already does this
+    incrementally; this is a full sweep.
+    """
+    session_store().purge_expired()
 
 
 def randbits_256() -> int:
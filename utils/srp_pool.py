@@ -0,0 +1,86 @@
+import atexit, os, threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from utils.srpUtils import g_pow, gmpy2
+
+# SRP's big-int math holds the GIL for milliseconds per login, stalling every
+# other thread of the worker (board reads included) during a login burst.
+# With SRP_PROCESS_WORKERS > 0 it runs in a per-worker process pool instead;
+# with 0, or if the pool breaks or times out, it runs inline.
+#
+# The pool only pays off for pure-Python math. In bench/srp_mixed_load.py
+# (6 login clients, board read p99 during the burst) it took pure Python
+# from 100 to 45 ms, but with gmpy2 the IPC cost outweighs the GIL time
+# saved: 50 -> 62 ms. So "auto" (the default) uses no pool with gmpy2
+# and 2 processes without it.
+SRP_POOL_AUTO_WORKERS = 2
+
+
+def _pool_size(value: str) -> int:
+    if value.strip().lower() == "auto":
+        return 0 if gmpy2 is not None else SRP_POOL_AUTO_WORKERS
+    return int(value)
+
+
+SRP_PROCESS_WORKERS = _pool_size(os.getenv("SRP_PROCESS_WORKERS", "auto"))
+SRP_POOL_TIMEOUT = float(os.getenv("SRP_POOL_TIMEOUT", "5"))
+# "spawn" avoids forking a multi-threaded worker.
+SRP_POOL_START_METHOD = os.getenv("SRP_POOL_START_METHOD", "spawn")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _warm_up():
+    # Build the g^b table once per pool process, not on its first login.
+    g_pow(1)
+
+
+def get_srp_executor():
+    global _executor
+    if SRP_PROCESS_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=SRP_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context(SRP_POOL_START_METHOD),
+                initializer=_warm_up,
+            )
+            print(f"✅ SRP process pool started ({SRP_PROCESS_WORKERS} workers)")
+    return _executor
+
+
+def close_srp_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _discard_executor(executor):
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_srp(fn, *args):
+    """Run fn(*args) in the SRP process pool when enabled, otherwise inline."""
+    executor = get_srp_executor()
+    if executor is None:
+        return fn(*args)
+    try:
+        return executor.submit(fn, *args).result(timeout=SRP_POOL_TIMEOUT)
+    except BrokenProcessPool as e:
+        print(f"❌ SRP process pool broke, computing inline: {e}")
+        _discard_executor(executor)
+    except (TimeoutError, RuntimeError, OSError) as e:
+        print(f"❌ SRP process pool unavailable, computing inline: {e}")
+    return fn(*args)
+
+
+atexit.register(close_srp_pool)
@@ -0,0 +1,71 @@
+import os, threading, time
+from collections import OrderedDict
+
+# Where SRP handshake state lives between /srp-login/start and /verify.
+#
+# SRP_SESSION_BACKEND=memory (default) keeps it in the worker process, which
+# only works when one worker serves both steps. "postgres" keeps it in the
+# srp_sessions UNLOGGED table so any worker can finish the handshake.
+SRP_SESSION_BACKEND = os.getenv("SRP_SESSION_BACKEND", "memory").lower()
+SRP_SESSION_CAPACITY = int(os.getenv("SRP_SESSION_CAPACITY", "10000"))
+
+
+class MemorySessionStore:
+    """
+    Bounded in-process store.
+
+    Every session gets the same timeout, so insertion order is expiry order:
+    expired sessions are popped from the front of an OrderedDict, O(1)
+    amortized, instead of scanning every session. When `capacity` live
+    sessions exist the oldest is evicted.
+    """
+
+    def __init__(self, timeout: float, capacity: int = SRP_SESSION_CAPACITY):
+        self.timeout = timeout
+        self.capacity = capacity
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        while self._sessions:
+            sid, state = next(iter(self._sessions.items()))
+            if now - state["created_at"] <= self.timeout:
+                break
+            del self._sessions[sid]
+
+    def add(self, sid: str, state: dict):
+        with self._lock:
+            self._purge(state["created_at"])
+            self._sessions[sid] = state
+            while len(self._sessions) > self.capacity:
+                self._sessions.popitem(last=False)
+
+    def _live(self, sid: str, state):
+        if state is not None and time.time() - state["created_at"] > self.timeout:
+            self._sessions.pop(sid, None)
+            return None
+        return state
+
+    def get(self, sid: str):
+        with self._lock:
+            return self._live(sid, self._sessions.get(sid))
+
+    def pop(self, sid: str):
+        with self._lock:
+            return self._live(sid, self._sessions.pop(sid, None))
+
+    def purge_expired(self):
+        with self._lock:
+            self._purge(time.time())
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+def make_session_store(timeout: float):
+    if SRP_SESSION_BACKEND == "postgres":
+        from database.srp_sessions import PostgresSessionStore
+        return PostgresSessionStore(timeout)
+    if SRP_SESSION_BACKEND != "memory":
+        raise ValueError(f"Unknown SRP_SESSION_BACKEND: {SRP_SESSION_BACKEND}")
+    return MemorySessionStore(timeout)